@@ -47,7 +47,16 @@ export default function VADTranscriberApp() {
     useAutoScroll(transcriptionResults);
 
   const handleTranscriptionResult = (result: TranscriptionResult) => {
-    setTranscriptionResults((prev) => [...prev, result]);
+    // 同じIDの途中結果があれば置き換える
+    setTranscriptionResults((prev) => {
+      const index = prev.findIndex((r) => r.id === result.id);
+      if (index === -1) {
+        return [...prev, result];
+      }
+      const next = [...prev];
+      next[index] = result;
+      return next;
+    });
   };
 
   const handleVADResult = (result: VADResult) => {
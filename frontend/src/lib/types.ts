@@ -49,12 +49,19 @@ export type WebSocketMessageType =
   | 'audio_received'
   | 'statistics'
   | 'error'
-  | 'segment_merge_error';
+  | 'segment_merge_error'
+  | 'ping'
+  | 'pong'
+  | 'session_resumed'
+  | 'server_draining'
+  | 'connection_rejected'
+  | 'session_redirect';
 
 // WebSocketメッセージの基底型
 export interface BaseWebSocketMessage {
   type: WebSocketMessageType;
   timestamp: number;
+  seq?: number; // サーバーが付ける通し番号（再接続時に受信済みの位置を伝える）
 }
 
 // クライアント → サーバー
@@ -69,6 +76,53 @@ export interface ConnectionEstablishedMessage extends BaseWebSocketMessage {
   client_id: string;
   message: string;
   model: TranscriptionModel;
+  // 接続直後の通知のみ（model_selection への応答には含まれない）
+  resume_token?: string; // 再接続用のトークン
+  resume_grace_seconds?: number; // 切断後にセッションを保持する秒数（0 は再接続不可）
+}
+
+// 再接続でセッションを再開した（next_audio_seq 番目のパケットから音声を送り直す）
+export interface SessionResumedMessage extends BaseWebSocketMessage {
+  type: 'session_resumed';
+  client_id: string;
+  model: TranscriptionModel;
+  next_audio_seq: number;
+  replayed: number;
+}
+
+// サーバーの停止（受信済みの音声までを処理して 1012 で閉じる）
+export interface ServerDrainingMessage extends BaseWebSocketMessage {
+  type: 'server_draining';
+  next_audio_seq: number;
+}
+
+// 過負荷のため新規セッションを拒否（1013 で閉じる）
+export interface ConnectionRejectedMessage extends BaseWebSocketMessage {
+  type: 'connection_rejected';
+  reason: string;
+  retry_after: number;
+}
+
+// セッションを所有する別のワーカーへの誘導（4302 で閉じる）
+export interface SessionRedirectMessage extends BaseWebSocketMessage {
+  type: 'session_redirect';
+  session_id: string;
+  worker_id: string;
+  worker_url: string;
+}
+
+// サーバー側の処理時間の内訳（?timings=1 で接続した場合のみ、時間はミリ秒）
+export interface ResultTimings {
+  speech_start: number; // ストリーム先頭からの秒
+  speech_end: number;
+  segment_close_ms: number;
+  merge_hold_ms: number;
+  wav_encode_ms: number;
+  queue_ms: number;
+  upload_ms?: number;
+  model_ms?: number;
+  api_ms?: number;
+  server_ms: number; // 最後の発話フレーム受信から結果送信まで
 }
 
 export interface TranscriptionResultMessage extends BaseWebSocketMessage {
@@ -79,6 +133,7 @@ export interface TranscriptionResultMessage extends BaseWebSocketMessage {
   is_final: boolean;
   segment_id: number;
   model_used: TranscriptionModel;
+  timings?: ResultTimings;
 }
 
 export interface VADResultMessage extends BaseWebSocketMessage {
@@ -104,6 +159,10 @@ export type ClientMessage = ModelSelectionMessage;
 
 export type ServerMessage =
   | ConnectionEstablishedMessage
+  | SessionResumedMessage
+  | ServerDrainingMessage
+  | ConnectionRejectedMessage
+  | SessionRedirectMessage
   | TranscriptionResultMessage
   | VADResultMessage
   | TranscriptionErrorMessage
@@ -6,8 +6,34 @@ import type {
   WebSocketMessage,
   ModelSelectionMessage,
   ConnectionEstablishedMessage,
+  ConnectionRejectedMessage,
+  ServerDrainingMessage,
+  SessionRedirectMessage,
+  SessionResumedMessage,
 } from './types';
 
+// 再接続を待つ間に送り直せるよう保持する音声パケット数（512サンプル = 32ms、約30秒分）
+const MAX_BACKLOG_PACKETS = 940;
+// 再接続の待ち時間（ミリ秒、試行毎）
+const RECONNECT_DELAYS_MS = [500, 1000, 2000, 4000, 8000];
+// 再接続しないクローズコード（正常終了・別の接続にセッションを引き継いだ場合）
+const FINAL_CLOSE_CODES = new Set([1000, 1001, 1005, 4001]);
+const CLOSE_CODE_SERVICE_RESTART = 1012;
+const CLOSE_CODE_SESSION_REDIRECT = 4302;
+
+// 再接続でセッションを再開するための情報
+interface ResumableSession {
+  id: string;
+  token: string;
+  graceSeconds: number;
+  lastSeq: number; // 受信済みのメッセージの通し番号
+}
+
+interface AudioPacket {
+  seq: number; // セッション内の音声パケット番号（1始まり、サーバーの packet_count と対応）
+  buffer: ArrayBuffer;
+}
+
 interface AudioRecorderOptions {
   websocketUrl?: string;
   onTranscriptionResult?: (result: TranscriptionResult) => void;
@@ -55,6 +81,19 @@ export const useAudioRecorder = (
   const workletNodeRef = useRef<AudioWorkletNode | null>(null);
   const streamRef = useRef<MediaStream | null>(null);
 
+  // 再接続・セッション再開
+  const sessionRef = useRef<ResumableSession | null>(null);
+  const audioSeqRef = useRef(0); // 送信（予定）した最後の音声パケット番号
+  const ackedSeqRef = useRef(0); // サーバーが受信を確認した最後の音声パケット番号
+  const backlogRef = useRef<AudioPacket[]>([]); // 未確認の音声パケット
+  const drainingRef = useRef(false); // server_draining 受信後は音声を送らずに保持する
+  const retryAfterRef = useRef<number | null>(null);
+  const redirectUrlRef = useRef<string | null>(null);
+  const reconnectAttemptRef = useRef(0);
+  const reconnectTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null);
+  const intentionalCloseRef = useRef(false);
+  const openSocketRef = useRef<() => void>(() => {});
+
   // AudioWorkletProcessorのコード（インライン）
   const workletProcessorCode = `
     class PCMWorkletProcessor extends AudioWorkletProcessor {
@@ -92,12 +131,63 @@ export const useAudioRecorder = (
     registerProcessor('pcm-worklet-processor', PCMWorkletProcessor);
   `;
 
+  // 音声パケットを送信（接続していない間・ドレイン中は送り直し用に保持するだけ）
+  const sendAudio = useCallback((buffer: ArrayBuffer) => {
+    audioSeqRef.current += 1;
+    const backlog = backlogRef.current;
+    backlog.push({ seq: audioSeqRef.current, buffer });
+    if (backlog.length > MAX_BACKLOG_PACKETS) {
+      backlog.splice(0, backlog.length - MAX_BACKLOG_PACKETS);
+    }
+    const websocket = websocketRef.current;
+    if (websocket?.readyState === WebSocket.OPEN && !drainingRef.current) {
+      websocket.send(buffer);
+    }
+  }, []);
+
+  // サーバーが受信を確認したパケットを保持対象から外す
+  const acknowledgeAudio = useCallback((seq: number) => {
+    ackedSeqRef.current = Math.max(ackedSeqRef.current, seq);
+    const backlog = backlogRef.current;
+    let index = 0;
+    while (
+      index < backlog.length &&
+      backlog[index].seq <= ackedSeqRef.current
+    ) {
+      index += 1;
+    }
+    backlog.splice(0, index);
+  }, []);
+
+  // 新しいセッションが始まった: 前のセッションで未確認だった音声を番号を振り直して送る
+  const startNewSession = useCallback(() => {
+    const pending = backlogRef.current.filter(
+      (packet) => packet.seq > ackedSeqRef.current,
+    );
+    backlogRef.current = [];
+    audioSeqRef.current = 0;
+    ackedSeqRef.current = 0;
+    drainingRef.current = false;
+    for (const packet of pending) {
+      sendAudio(packet.buffer);
+    }
+    if (pending.length > 0) {
+      console.log(`[Resume] Resent ${pending.length} audio packets`);
+    }
+  }, [sendAudio]);
+
   // WebSocketメッセージハンドラー
   const handleWebSocketMessage = useCallback(
     (event: MessageEvent) => {
       try {
         const data = JSON.parse(event.data);
         console.log('[WebSocket] Received message:', data);
+        if (sessionRef.current && typeof data.seq === 'number') {
+          sessionRef.current.lastSeq = Math.max(
+            sessionRef.current.lastSeq,
+            data.seq,
+          );
+        }
 
         // 上位コンポーネントにメッセージを通知
         if (onMessage) {
@@ -115,6 +205,66 @@ export const useAudioRecorder = (
                 establishedMessage.model,
               );
             }
+            // モデル設定の完了通知にはトークンがない（新しいセッションの開始ではない）
+            if (establishedMessage.resume_token === undefined) break;
+            sessionRef.current = {
+              id: establishedMessage.client_id,
+              token: establishedMessage.resume_token,
+              graceSeconds: establishedMessage.resume_grace_seconds ?? 0,
+              lastSeq: establishedMessage.seq ?? 0,
+            };
+            reconnectAttemptRef.current = 0;
+            startNewSession();
+            break;
+          }
+
+          case 'session_resumed': {
+            const resumedMessage = data as SessionResumedMessage;
+            console.log(
+              '[Resume] Session resumed:',
+              resumedMessage.client_id,
+              'from audio packet',
+              resumedMessage.next_audio_seq,
+            );
+            reconnectAttemptRef.current = 0;
+            drainingRef.current = false;
+            acknowledgeAudio(resumedMessage.next_audio_seq - 1);
+            // サーバーに届かなかった音声を順に送り直す（番号は切断前から続く）
+            for (const packet of backlogRef.current) {
+              websocketRef.current?.send(packet.buffer);
+            }
+            break;
+          }
+
+          case 'server_draining': {
+            // 受信済みの音声までが処理される。続きは再接続先に送り直す
+            const drainingMessage = data as ServerDrainingMessage;
+            console.warn('[WebSocket] Server is draining, will reconnect');
+            drainingRef.current = true;
+            acknowledgeAudio(drainingMessage.next_audio_seq - 1);
+            break;
+          }
+
+          case 'connection_rejected': {
+            const rejectedMessage = data as ConnectionRejectedMessage;
+            console.warn(
+              '[WebSocket] Connection rejected:',
+              rejectedMessage.reason,
+            );
+            retryAfterRef.current = rejectedMessage.retry_after;
+            setError(
+              `サーバーが混雑しています（${rejectedMessage.retry_after}秒後に再接続します）`,
+            );
+            break;
+          }
+
+          case 'session_redirect': {
+            const redirectMessage = data as SessionRedirectMessage;
+            console.log(
+              '[WebSocket] Session is owned by:',
+              redirectMessage.worker_url,
+            );
+            redirectUrlRef.current = redirectMessage.worker_url || null;
             break;
           }
 
@@ -152,9 +302,21 @@ export const useAudioRecorder = (
             console.warn('[WebSocket] Transcription skipped:', data.reason);
             break;
 
+          case 'ping':
+            // 死活監視: 応答がないと接続が回収される
+            websocketRef.current?.send(
+              JSON.stringify({
+                type: 'pong',
+                nonce: data.nonce,
+                timestamp: Date.now() / 1000,
+              }),
+            );
+            break;
+
           case 'audio_received':
             // 音声受信確認（デバッグ用、通常は非表示）
             // console.log('[WebSocket] Audio received:', data.data_size);
+            acknowledgeAudio(data.packet_count);
             break;
 
           case 'statistics':
@@ -178,45 +340,99 @@ export const useAudioRecorder = (
         console.error('[WebSocket] Failed to parse message:', err);
       }
     },
-    [onTranscriptionResult, onVADResult, onMessage],
+    [
+      onTranscriptionResult,
+      onVADResult,
+      onMessage,
+      acknowledgeAudio,
+      startNewSession,
+    ],
   );
 
-  // WebSocket接続
-  const connect = useCallback(() => {
-    if (websocketRef.current?.readyState === WebSocket.OPEN) return;
+  // 接続先のURL（再開できるセッションがあればクエリで伝える）
+  const buildUrl = useCallback(() => {
+    const base = redirectUrlRef.current ?? websocketUrl;
+    redirectUrlRef.current = null;
+    const session = sessionRef.current;
+    if (!session || session.graceSeconds <= 0) {
+      return base;
+    }
+    const url = new URL(base);
+    url.searchParams.set('session_id', session.id);
+    url.searchParams.set('resume_token', session.token);
+    url.searchParams.set('last_seq', String(session.lastSeq));
+    return url.toString();
+  }, [websocketUrl]);
+
+  // 意図しない切断の後に再接続する（拒否された場合は retry_after に従う）
+  const scheduleReconnect = useCallback((code: number) => {
+    const attempt = reconnectAttemptRef.current;
+    if (attempt >= RECONNECT_DELAYS_MS.length) {
+      setError('サーバーに再接続できませんでした');
+      return;
+    }
+    reconnectAttemptRef.current = attempt + 1;
+    let delay = RECONNECT_DELAYS_MS[attempt];
+    if (code === CLOSE_CODE_SESSION_REDIRECT) {
+      delay = 0;
+    } else if (retryAfterRef.current !== null) {
+      delay = retryAfterRef.current * 1000;
+    }
+    retryAfterRef.current = null;
+    console.log(`[WebSocket] Reconnecting in ${delay}ms (code ${code})`);
+    reconnectTimerRef.current = setTimeout(() => {
+      reconnectTimerRef.current = null;
+      openSocketRef.current();
+    }, delay);
+  }, []);
+
+  const openSocket = useCallback(() => {
+    const url = buildUrl();
     try {
-      console.log('[WebSocket] Connecting to:', websocketUrl);
-      websocketRef.current = new WebSocket(websocketUrl);
-      websocketRef.current.binaryType = 'arraybuffer';
+      console.log('[WebSocket] Connecting to:', url);
+      const websocket = new WebSocket(url);
+      websocketRef.current = websocket;
+      websocket.binaryType = 'arraybuffer';
 
-      websocketRef.current.onopen = () => {
+      websocket.onopen = () => {
         console.log('[WebSocket] Connected successfully');
         setIsConnected(true);
         setError(null);
 
-        // 接続時にモデル情報を送信
+        // 接続時にモデル情報を送信（再開できずに新しいセッションになった場合も同じモデルにする）
         setTimeout(() => {
-          if (websocketRef.current?.readyState === WebSocket.OPEN) {
+          if (websocket.readyState === WebSocket.OPEN) {
             const message: ModelSelectionMessage = {
               type: 'model_selection',
               model: currentModel,
               timestamp: Date.now(),
             };
 
-            websocketRef.current.send(JSON.stringify(message));
+            websocket.send(JSON.stringify(message));
             console.log('[Model] Initial model selection sent:', message);
           }
         }, 100); // 少し遅延させて確実に送信
       };
 
-      websocketRef.current.onmessage = handleWebSocketMessage;
+      websocket.onmessage = handleWebSocketMessage;
 
-      websocketRef.current.onclose = (event) => {
+      websocket.onclose = (event) => {
         console.log('[WebSocket] Connection closed:', event.code, event.reason);
+        if (websocketRef.current !== websocket) return; // 置き換え済みの接続
+        websocketRef.current = null;
         setIsConnected(false);
+        if (intentionalCloseRef.current || FINAL_CLOSE_CODES.has(event.code)) {
+          sessionRef.current = null;
+          return;
+        }
+        if (event.code === CLOSE_CODE_SERVICE_RESTART) {
+          // ドレインしたサーバーのセッションは再開できない（新しいセッションで続きを送る）
+          sessionRef.current = null;
+        }
+        scheduleReconnect(event.code);
       };
 
-      websocketRef.current.onerror = (event) => {
+      websocket.onerror = (event) => {
         console.error('[WebSocket] Connection error:', event);
         setError('WebSocket接続に失敗しました');
         setIsConnected(false);
@@ -225,15 +441,42 @@ export const useAudioRecorder = (
       console.error('[WebSocket] Failed to create connection:', err);
       setError('WebSocket接続の作成に失敗しました');
     }
-  }, [websocketUrl, handleWebSocketMessage, currentModel]);
+  }, [buildUrl, handleWebSocketMessage, currentModel, scheduleReconnect]);
+
+  useEffect(() => {
+    openSocketRef.current = openSocket;
+  }, [openSocket]);
+
+  // WebSocket接続
+  const connect = useCallback(() => {
+    const state = websocketRef.current?.readyState;
+    if (state === WebSocket.OPEN || state === WebSocket.CONNECTING) return;
+    intentionalCloseRef.current = false;
+    reconnectAttemptRef.current = 0;
+    if (reconnectTimerRef.current) {
+      clearTimeout(reconnectTimerRef.current);
+      reconnectTimerRef.current = null;
+    }
+    openSocket();
+  }, [openSocket]);
 
   // WebSocket切断
   const disconnect = useCallback(() => {
+    intentionalCloseRef.current = true;
+    if (reconnectTimerRef.current) {
+      clearTimeout(reconnectTimerRef.current);
+      reconnectTimerRef.current = null;
+    }
     if (websocketRef.current) {
       console.log('[WebSocket] Disconnecting...');
       websocketRef.current.close();
       websocketRef.current = null;
     }
+    sessionRef.current = null;
+    backlogRef.current = [];
+    audioSeqRef.current = 0;
+    ackedSeqRef.current = 0;
+    drainingRef.current = false;
     setIsConnected(false);
   }, []);
 
@@ -282,9 +525,8 @@ export const useAudioRecorder = (
         if (data && data.type === 'level') {
           setAudioLevel(Math.min(100, data.rms * 100));
         } else if (data && data.type === 'pcm') {
-          if (websocketRef.current?.readyState === WebSocket.OPEN) {
-            websocketRef.current.send(data.buffer);
-          }
+          // 再接続中の音声も保持しておき、再開後に送り直す
+          sendAudio(data.buffer);
         }
       };
 
@@ -299,7 +541,7 @@ export const useAudioRecorder = (
       console.error('[Audio] Failed to start recording:', err);
       setError('録音の開始に失敗しました');
     }
-  }, [isConnected, connect]);
+  }, [isConnected, connect, sendAudio]);
 
   // 録音停止
   const stopRecording = useCallback(() => {
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Optional, Union, Callable, Awaitable
 
@@ -23,6 +24,12 @@ class BaseAdapter(ABC):
         """
         pass
 
+    async def warm_up(self):
+        """
+        最初のリクエストが遅くならないよう事前に準備する（既定では何もしない）
+        """
+        pass
+
 
 class TranscriptionAdapter(BaseAdapter):
     """
@@ -38,6 +45,7 @@ class TranscriptionAdapter(BaseAdapter):
         callback: Optional[
             Union[Callable[[str], None], Callable[[str], Awaitable[None]]]
         ] = None,
+        timings: Optional[dict] = None,
     ) -> str:
         """
         音声データを文字起こし
@@ -45,6 +53,8 @@ class TranscriptionAdapter(BaseAdapter):
         :param model: 使用するモデル名
         :param language: 言語コード
         :param callback: 結果を受け取るコールバック関数
+        :param timings: 指定した場合は処理時間（queue_seconds, api_seconds,
+            分かる場合は upload_seconds, model_seconds）を書き込む
         :return: 文字起こし結果
         """
         pass
@@ -86,3 +96,31 @@ class VADAdapter(BaseAdapter):
         :return: チャンクサイズ（バイト）
         """
         pass
+
+    async def warm_up(self, frames: int = 8):
+        """
+        無音フレームで推論を数回実行し、初回推論の遅延（初期化・JIT）を済ませる
+        （推論はイベントループ外で実行する）
+        """
+        silence = bytes(self.get_optimal_chunk_size())
+
+        def run():
+            for _ in range(frames):
+                self.predict(silence)
+
+        await asyncio.to_thread(run)
+
+    async def predict_frames(
+        self,
+        frames: list[bytes],
+        sample_rate: int = 16000,
+        key: str = "",
+    ) -> list[float]:
+        """
+        複数フレームの音声確率をまとめて取得（既定では predict を順に呼ぶ）
+        :param frames: フレーム毎のPCMバイト列
+        :param sample_rate: サンプリングレート
+        :param key: 同じキーのフレームを同じ推論器で処理するためのキー（セッションID）
+        :return: フレーム毎の音声確率
+        """
+        return [self.predict(frame, sample_rate)[1] for frame in frames]
@@ -1,9 +1,11 @@
 import tempfile
+import threading
+import time
 import asyncio
 import logging
 import inspect
 from typing import Optional, Union, Callable, Awaitable
-from openai import OpenAI
+from openai import DefaultHttpxClient, OpenAI
 from .base import TranscriptionAdapter
 
 
@@ -15,9 +17,21 @@ class OpenAITranscriptionAdapter(TranscriptionAdapter):
     OpenAI API を使用した音声文字起こしアダプター
     """
 
-    def __init__(self, api_key: str, **kwargs):
+    def __init__(self, api_key: str, base_url: Optional[str] = None, **kwargs):
+        """
+        :param base_url: OpenAI 互換 API の URL（例: ローカルの fake_openai.py
+            http://127.0.0.1:9000/v1）。None の場合は OpenAI の API
+        """
         super().__init__(**kwargs)
-        self.client = OpenAI(api_key=api_key)
+        # 送信完了・応答ヘッダー受信の時刻を記録し、アップロードとモデル処理の時間を分ける
+        self._trace = threading.local()
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=DefaultHttpxClient(
+                event_hooks={"request": [self._attach_trace]}
+            ),
+        )
         self.supported_models = [
             "gpt-4o-transcribe",
             "whisper-1",
@@ -28,9 +42,12 @@ class OpenAITranscriptionAdapter(TranscriptionAdapter):
         OpenAI APIの健康状態をチェック
         """
         try:
-            # モデル一覧を取得してAPIが正常に動作しているかチェック
-            models = await asyncio.to_thread(self.client.models.list)
-            return len(models.data) > 0
+            # 使用するモデル1件だけを取得してAPIが正常に動作しているかチェック
+            # （全モデルの一覧は大きく、定期的な確認には重い）
+            model = await asyncio.to_thread(
+                self.client.models.retrieve, self.supported_models[0]
+            )
+            return model.id == self.supported_models[0]
         except Exception as e:
             logger.error(f"OpenAI API health check failed: {e}")
             return False
@@ -48,6 +65,33 @@ class OpenAITranscriptionAdapter(TranscriptionAdapter):
                 )
         return transcript.text
 
+    def _attach_trace(self, request):
+        """HTTP リクエスト毎に httpcore のトレースを設定（文字起こし中のスレッドのみ）"""
+        events = getattr(self._trace, "events", None)
+        if events is None:
+            return
+
+        def trace(name: str, info: dict):
+            # 例: http11.send_request_body.complete（リトライ時は最後の試行で上書き）
+            if name.endswith(
+                ("send_request_body.complete", "receive_response_headers.complete")
+            ):
+                events[name.rsplit(".", 2)[-2]] = time.perf_counter()
+
+        request.extensions["trace"] = trace
+
+    def _timed_transcribe(
+        self, audio_bytes: bytes, model: str, language: str
+    ) -> tuple[str, float, float, dict]:
+        """文字起こしの開始・終了時刻と HTTP の各段階の時刻も返す（ワーカースレッドで実行）"""
+        self._trace.events = events = {}
+        started = time.perf_counter()
+        try:
+            text = self._transcribe_sync(audio_bytes, model, language)
+        finally:
+            self._trace.events = None
+        return text, started, time.perf_counter(), events
+
     async def transcribe(
         self,
         audio_bytes: bytes,
@@ -56,6 +100,7 @@ class OpenAITranscriptionAdapter(TranscriptionAdapter):
         callback: Optional[
             Union[Callable[[str], None], Callable[[str], Awaitable[None]]]
         ] = None,
+        timings: Optional[dict] = None,
     ) -> str:
         """
         音声データを文字起こし
@@ -69,9 +114,19 @@ class OpenAITranscriptionAdapter(TranscriptionAdapter):
             f"[OpenAI Transcription] Starting transcription with model: {model}"
         )
 
-        text = await asyncio.to_thread(
-            self._transcribe_sync, audio_bytes, model, language
+        submitted = time.perf_counter()
+        text, started, finished, events = await asyncio.to_thread(
+            self._timed_transcribe, audio_bytes, model, language
         )
+        if timings is not None:
+            # スレッドプールの空き待ちと API の往復時間を分けて記録
+            timings["queue_seconds"] = started - submitted
+            timings["api_seconds"] = finished - started
+            sent = events.get("send_request_body")
+            answered = events.get("receive_response_headers")
+            if sent is not None and answered is not None:
+                timings["upload_seconds"] = sent - started
+                timings["model_seconds"] = answered - sent
 
         logger.info(f"[OpenAI Transcription] Completed with model {model}: {text}")
 
@@ -113,11 +168,15 @@ class MockTranscriptionAdapter(TranscriptionAdapter):
         callback: Optional[
             Union[Callable[[str], None], Callable[[str], Awaitable[None]]]
         ] = None,
+        timings: Optional[dict] = None,
     ) -> str:
         """
         固定の文字起こし結果を返す
         """
         text = "これはテスト用の文字起こし結果です"
+        if timings is not None:
+            timings["queue_seconds"] = 0.0
+            timings["api_seconds"] = 0.0
 
         if callback:
             if inspect.iscoroutinefunction(callback):
@@ -2,8 +2,8 @@ import torch
 import numpy as np
 import os
 import logging
+from typing import Optional
 
-# from typing import Optional
 from .base import VADAdapter
 
 
@@ -19,6 +19,7 @@ class SileroVADAdapter(VADAdapter):
         super().__init__(**kwargs)
         self._model = None
         self._utils = None
+        self._warmed = False
         self._initialize_model()
 
     def _initialize_model(self):
@@ -40,16 +41,16 @@ class SileroVADAdapter(VADAdapter):
     async def health_check(self) -> bool:
         """
         VAD モデルの健康状態をチェック
+        モデルが読み込まれ、ウォームアップ（実際の推論）が済んでいれば正常とする
+        （共有しているモデルの内部状態を変えないよう、ここでは推論しない）
         """
-        try:
-            # テスト用の音声データで動作確認
-            test_audio = np.random.rand(1024).astype(np.float32)
-            test_tensor = torch.from_numpy(test_audio)
-            result = self._model(test_tensor, 16000)
-            return isinstance(result.item(), float)
-        except Exception as e:
-            logger.error(f"VAD health check failed: {e}")
-            return False
+        return self._model is not None and self._warmed
+
+    async def warm_up(self, frames: int = 8):
+        await super().warm_up(frames)
+        # ウォームアップの無音がモデルの内部状態に残らないようにする
+        self._model.reset_states()
+        self._warmed = True
 
     def _pcm_bytes_to_float32(
         self, pcm_bytes: bytes
@@ -88,6 +89,11 @@ class SileroVADAdapter(VADAdapter):
         return 1024  # 512 samples * 2 bytes per sample
 
 
+# > 0 の場合、モック VAD はフレームの RMS（-1.0〜1.0 に正規化）がこの値以上なら発話とみなす
+# （負荷試験で発話・無音のパターンを区切るため。0 なら常に fixed_probability）
+MOCK_VAD_ENERGY_THRESHOLD = float(os.getenv("MOCK_VAD_ENERGY_THRESHOLD", "0"))
+
+
 class MockVADAdapter(VADAdapter):
     """
     テスト用のモック VAD アダプター
@@ -96,6 +102,9 @@ class MockVADAdapter(VADAdapter):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.fixed_probability = kwargs.get("fixed_probability", 0.8)
+        self.energy_threshold = kwargs.get(
+            "energy_threshold", MOCK_VAD_ENERGY_THRESHOLD
+        )
 
     async def health_check(self) -> bool:
         """
@@ -110,11 +119,17 @@ class MockVADAdapter(VADAdapter):
         threshold: float = 0.5,
     ) -> tuple[bool, float]:
         """
-        固定の音声検出結果を返す
+        固定の音声検出結果を返す（energy_threshold 指定時は音量で判定）
         """
         if len(audio_bytes) == 0:
             return False, 0.0
 
+        if self.energy_threshold > 0:
+            audio = np.frombuffer(audio_bytes, dtype=np.int16) / 32768.0
+            rms = float(np.sqrt(np.mean(audio * audio)))
+            speech_prob = 0.9 if rms >= self.energy_threshold else 0.1
+            return speech_prob > threshold, speech_prob
+
         is_speech = self.fixed_probability > threshold
         return is_speech, self.fixed_probability
 
@@ -125,11 +140,38 @@ class MockVADAdapter(VADAdapter):
         return 1024
 
 
+# VAD_WORKERS > 0 の場合は推論を専用プロセスで実行する（プロセス内で1つだけ起動）
+VAD_WORKERS = int(os.getenv("VAD_WORKERS", "0"))
+VAD_WORKER_THREADS = int(os.getenv("VAD_WORKER_THREADS", "1"))
+VAD_RING_FRAMES = int(os.getenv("VAD_RING_FRAMES", "4096"))
+
+_shared_pool: Optional[VADAdapter] = None
+
+
 def create_vad_adapter(testing: bool = False, **kwargs) -> VADAdapter:
     """
     環境に応じて適切な VAD アダプターを生成
     """
-    if testing or os.environ.get("TESTING") == "true":
+    testing = testing or os.environ.get("TESTING") == "true"
+    if VAD_WORKERS > 0:
+        return get_vad_pool(model_kind="mock" if testing else "silero", **kwargs)
+    if testing:
         return MockVADAdapter(**kwargs)
     else:
         return SileroVADAdapter(**kwargs)
+
+
+def get_vad_pool(model_kind: str = "silero", **kwargs) -> VADAdapter:
+    """推論プロセスプールを初回のみ起動して共有する"""
+    global _shared_pool
+    if _shared_pool is None:
+        from .vad_pool import ProcessPoolVADAdapter
+
+        _shared_pool = ProcessPoolVADAdapter(
+            num_workers=VAD_WORKERS,
+            threads_per_worker=VAD_WORKER_THREADS,
+            ring_frames=VAD_RING_FRAMES,
+            model_kind=model_kind,
+            **kwargs,
+        )
+    return _shared_pool
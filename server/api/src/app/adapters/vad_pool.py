@@ -0,0 +1,390 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection, wait
+from typing import Deque, Optional
+
+import numpy as np
+
+from .base import VADAdapter
+
+logger = logging.getLogger(__name__)
+
+
+def _inference_worker(
+    conn: Connection,
+    frames_name: str,
+    probs_name: str,
+    capacity: int,
+    frame_bytes: int,
+    model_kind: str,
+    num_threads: int,
+    adapter_kwargs: dict,
+):
+    """
+    推論プロセス本体
+    共有メモリのリングバッファからフレームを読み、音声確率を共有メモリに書き戻す
+    制御メッセージ（要求ID・位置・フレーム数）だけをパイプでやり取りする
+    """
+    import torch
+
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+
+    from .vad import MockVADAdapter, SileroVADAdapter
+
+    adapter = (
+        MockVADAdapter(**adapter_kwargs)
+        if model_kind == "mock"
+        else SileroVADAdapter(**adapter_kwargs)
+    )
+
+    frames_shm = shared_memory.SharedMemory(name=frames_name)
+    probs_shm = shared_memory.SharedMemory(name=probs_name)
+    frames = np.ndarray((capacity, frame_bytes), dtype=np.uint8, buffer=frames_shm.buf)
+    probs = np.ndarray((capacity,), dtype=np.float32, buffer=probs_shm.buf)
+    conn.send(("ready", None, None))
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message[0] == "stop":
+                break
+
+            _, request_id, start, count, sample_rate = message
+            try:
+                for index in range(start, start + count):
+                    probs[index] = adapter.predict(frames[index], sample_rate)[1]
+                conn.send(("done", request_id, None))
+            except Exception as e:
+                conn.send(("done", request_id, repr(e)))
+    finally:
+        del frames, probs
+        frames_shm.close()
+        probs_shm.close()
+
+
+class _InferenceWorker:
+    """親プロセス側から見た推論プロセスとリングバッファの状態"""
+
+    def __init__(self, index: int, capacity: int, frame_bytes: int):
+        self.index = index
+        self.capacity = capacity
+        self.frames_shm = shared_memory.SharedMemory(
+            create=True, size=capacity * frame_bytes
+        )
+        self.probs_shm = shared_memory.SharedMemory(create=True, size=capacity * 4)
+        self.frames = np.ndarray(
+            (capacity, frame_bytes), dtype=np.uint8, buffer=self.frames_shm.buf
+        )
+        self.probs = np.ndarray(
+            (capacity,), dtype=np.float32, buffer=self.probs_shm.buf
+        )
+        self.process: Optional[multiprocessing.Process] = None
+        self.conn: Optional[Connection] = None
+        self.alive = False
+        # 処理中の要求（推論プロセスは FIFO で処理するので先頭から完了する）
+        self.in_flight: Deque[tuple[int, int, int, Future]] = deque()
+        self.head = 0  # 次に書き込むフレーム位置
+
+    @property
+    def in_flight_frames(self) -> int:
+        return sum(count for _, _, count, _ in self.in_flight)
+
+    def allocate(self, count: int) -> Optional[int]:
+        """count フレーム分の連続領域を確保（空きがなければ None）"""
+        if not self.in_flight:
+            self.head = 0 if self.head + count > self.capacity else self.head
+            return self.head
+        tail = self.in_flight[0][1]
+        if self.head >= tail:
+            if self.head + count <= self.capacity:
+                return self.head
+            if count < tail:
+                return 0
+            return None
+        if self.head + count < tail:
+            return self.head
+        return None
+
+    def release(self):
+        del self.frames, self.probs
+        self.frames_shm.close()
+        self.probs_shm.close()
+        self.frames_shm.unlink()
+        self.probs_shm.unlink()
+
+
+def _set_if_pending(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ProcessPoolVADAdapter(VADAdapter):
+    """
+    VAD 推論を専用プロセスで実行するアダプター
+
+    - 推論プロセス毎にモデルを1つ持ち、torch のスレッド数を固定する
+    - 音声フレームは共有メモリのリングバッファで渡し、パイプには小さな制御メッセージだけを流す
+    - 同じセッション（key）のフレームは常に同じプロセスに送る（到着順に処理される）。
+      モデルの内部状態はそのプロセスに割り当てた全セッションで共有されるため、
+      セッション毎の状態は保たない
+    - API プロセスは推論を待つ間もイベントループをブロックしない（predict_frames）
+    """
+
+    def __init__(
+        self,
+        num_workers: int = 2,
+        threads_per_worker: int = 1,
+        ring_frames: int = 4096,
+        frame_bytes: int = 1024,
+        model_kind: str = "silero",
+        request_timeout: float = 5.0,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.frame_bytes = frame_bytes
+        self.request_timeout = request_timeout
+        self.max_request_frames = max(1, ring_frames // 4)
+        self._lock = threading.Condition()
+        self._request_ids = 0
+        self._closed = False
+        # リングの空きを待っているイベントループ側の Future（読み取りスレッドが起こす）
+        self._space_waiters: list[asyncio.Future] = []
+        self.ring_full_waits = 0
+
+        ctx = multiprocessing.get_context("spawn")
+        self.workers = [
+            _InferenceWorker(i, ring_frames, frame_bytes) for i in range(num_workers)
+        ]
+        for worker in self.workers:
+            parent_conn, child_conn = ctx.Pipe()
+            worker.conn = parent_conn
+            worker.process = ctx.Process(
+                target=_inference_worker,
+                args=(
+                    child_conn,
+                    worker.frames_shm.name,
+                    worker.probs_shm.name,
+                    ring_frames,
+                    frame_bytes,
+                    model_kind,
+                    threads_per_worker,
+                    kwargs,
+                ),
+                name=f"vad-inference-{worker.index}",
+                daemon=True,
+            )
+            worker.process.start()
+            child_conn.close()
+
+        # 全プロセスのモデル読み込みを待つ
+        for worker in self.workers:
+            message = worker.conn.recv()
+            if message[0] != "ready":
+                raise RuntimeError(f"VAD worker {worker.index} failed to start")
+            worker.alive = True
+        logger.info(
+            f"[VADPool] Started {num_workers} inference processes "
+            f"({threads_per_worker} threads each, ring {ring_frames} frames)"
+        )
+
+        self._reader = threading.Thread(
+            target=self._read_replies, name="vad-pool-reader", daemon=True
+        )
+        self._reader.start()
+
+    @property
+    def queue_depth(self) -> int:
+        """推論待ちのフレーム数"""
+        with self._lock:
+            return sum(worker.in_flight_frames for worker in self.workers)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": len(self.workers),
+                "alive_workers": sum(1 for w in self.workers if w.alive),
+                "queue_depth": sum(w.in_flight_frames for w in self.workers),
+                "in_flight_requests": sum(len(w.in_flight) for w in self.workers),
+                "ring_full_waits": self.ring_full_waits,
+            }
+
+    async def health_check(self) -> bool:
+        return not self._closed and all(
+            worker.alive and worker.process.is_alive() for worker in self.workers
+        )
+
+    def get_optimal_chunk_size(self) -> int:
+        return self.frame_bytes
+
+    def predict(
+        self,
+        audio_bytes: bytes,
+        sample_rate: int = 16000,
+        threshold: float = 0.5,
+    ) -> tuple[bool, float]:
+        """1フレームを同期的に推論（イベントループ外からの利用向け）"""
+        if len(audio_bytes) == 0:
+            return False, 0.0
+        future = self.submit([audio_bytes], sample_rate=sample_rate)
+        speech_prob = future.result(timeout=self.request_timeout)[0]
+        return speech_prob > threshold, speech_prob
+
+    async def predict_frames(
+        self,
+        frames: list[bytes],
+        sample_rate: int = 16000,
+        key: str = "",
+    ) -> list[float]:
+        probs: list[float] = []
+        for start in range(0, len(frames), self.max_request_frames):
+            chunk = frames[start : start + self.max_request_frames]
+            future = await self._submit_when_space(chunk, sample_rate, key)
+            probs.extend(await asyncio.wrap_future(future))
+        return probs
+
+    async def _submit_when_space(
+        self, frames: list[bytes], sample_rate: int, key: str
+    ) -> Future:
+        """リングが一杯の場合は、イベントループをブロックせずに空くまで待って依頼する"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.request_timeout
+        while True:
+            space = loop.create_future()
+            future = self.submit(frames, sample_rate, key, on_full=space)
+            if future is not None:
+                return future
+            self.ring_full_waits += 1
+            try:
+                await asyncio.wait_for(space, deadline - loop.time())
+            except asyncio.TimeoutError:
+                raise TimeoutError("VAD inference ring buffer is full") from None
+
+    def submit(
+        self,
+        frames: list[bytes],
+        sample_rate: int = 16000,
+        key: str = "",
+        on_full: Optional[asyncio.Future] = None,
+    ) -> Optional[Future]:
+        """
+        フレームを共有メモリに書き込み、推論プロセスに処理を依頼する
+
+        リングが一杯の場合、on_full を指定していれば待たずに None を返し、
+        空きができたときに on_full を完了させる（イベントループから呼ぶ場合）。
+        指定していなければ空くまでスレッドをブロックして待つ。
+        """
+        future: Future = Future()
+        if not frames:
+            future.set_result([])
+            return future
+        count = len(frames)
+        if count > self.max_request_frames:
+            raise ValueError(f"Too many frames in one request: {count}")
+        if any(len(frame) != self.frame_bytes for frame in frames):
+            raise ValueError(f"Each frame must be {self.frame_bytes} bytes")
+
+        worker = self.workers[zlib.crc32(key.encode()) % len(self.workers)]
+        with self._lock:
+            if self._closed or not worker.alive:
+                raise RuntimeError(f"VAD worker {worker.index} is not available")
+            start = worker.allocate(count)
+            if start is None and on_full is not None:
+                self._space_waiters.append(on_full)
+                return None
+            if start is None:
+                # リングが一杯の場合は空くまで待つ（過負荷時のみ）
+                if not self._lock.wait_for(
+                    lambda: worker.allocate(count) is not None,
+                    timeout=self.request_timeout,
+                ):
+                    raise TimeoutError("VAD inference ring buffer is full")
+                start = worker.allocate(count)
+
+            worker.frames[start : start + count] = np.frombuffer(
+                b"".join(frames), dtype=np.uint8
+            ).reshape(count, self.frame_bytes)
+            self._request_ids += 1
+            request_id = self._request_ids
+            worker.in_flight.append((request_id, start, count, future))
+            worker.head = start + count
+            worker.conn.send(("predict", request_id, start, count, sample_rate))
+        return future
+
+    def _read_replies(self):
+        """推論プロセスからの完了通知を受け取り、結果を Future に渡す"""
+        connections = {worker.conn: worker for worker in self.workers}
+        while connections:
+            for conn in wait(list(connections)):
+                worker = connections[conn]
+                try:
+                    _, request_id, error = conn.recv()
+                except (EOFError, OSError):
+                    del connections[conn]
+                    self._on_worker_exit(worker)
+                    continue
+
+                with self._lock:
+                    expected_id, start, count, future = worker.in_flight.popleft()
+                    if error is None:
+                        probs = worker.probs[start : start + count].tolist()
+                    self._lock.notify_all()
+                    self._wake_space_waiters()
+                if expected_id != request_id:
+                    logger.error(
+                        f"[VADPool] Out of order reply from worker {worker.index}"
+                    )
+                if error is None:
+                    future.set_result(probs)
+                else:
+                    future.set_exception(RuntimeError(error))
+
+    def _on_worker_exit(self, worker: _InferenceWorker):
+        with self._lock:
+            worker.alive = False
+            pending = list(worker.in_flight)
+            worker.in_flight.clear()
+            self._lock.notify_all()
+            self._wake_space_waiters()
+        if not self._closed:
+            logger.error(f"[VADPool] Inference process {worker.index} exited")
+        for _, _, _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("VAD inference process exited"))
+
+    def _wake_space_waiters(self):
+        """空きを待っている呼び出し元を起こす（_lock を取得した状態で呼ぶ）"""
+        waiters, self._space_waiters = self._space_waiters, []
+        for waiter in waiters:
+            try:
+                waiter.get_loop().call_soon_threadsafe(_set_if_pending, waiter)
+            except RuntimeError:  # ループが既に閉じている
+                pass
+
+    def close(self, timeout: float = 5.0):
+        """推論プロセスを停止して共有メモリを解放する"""
+        if self._closed:
+            return
+        self._closed = True
+        for worker in self.workers:
+            try:
+                worker.conn.send(("stop",))
+            except (OSError, ValueError):
+                pass
+        for worker in self.workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        self._reader.join(timeout)
+        for worker in self.workers:
+            worker.conn.close()
+            worker.release()
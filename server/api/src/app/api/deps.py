@@ -1,4 +1,7 @@
-from fastapi import Depends
+import hmac
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
@@ -11,6 +14,11 @@ from app.adapters.vad import create_vad_adapter
 from app.utils.env import settings
 import os
 
+# 管理用エンドポイント（プロファイラ等）のトークン。未設定なら管理用エンドポイントは無効
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+_admin_bearer = HTTPBearer(auto_error=False)
+
 
 def get_health_service(db: Session = Depends(get_db)) -> HealthService:
     """データベースヘルスチェック用HealthServiceの依存性注入"""
@@ -23,13 +31,35 @@ def get_app_health_service() -> HealthService:
 
 
 def get_transcription_adapter() -> OpenAITranscriptionAdapter:
-    """文字起こしアダプターの依存性注入"""
-    if os.environ.get("TESTING") == "true":
+    """
+    文字起こしアダプターの依存性注入
+    （TESTING でも OPENAI_BASE_URL を指定した場合はその API を使う。
+    モックの VAD とローカルの fake_openai.py を組み合わせた負荷試験用）
+    """
+    if os.environ.get("TESTING") == "true" and not settings.OPENAI_BASE_URL:
         return MockTranscriptionAdapter()
-    return OpenAITranscriptionAdapter(api_key=settings.OPENAI_API_KEY)
+    return OpenAITranscriptionAdapter(
+        api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL or None
+    )
 
 
 def get_vad_adapter():
     """VADアダプターの依存性注入"""
     testing = os.environ.get("TESTING") == "true"
     return create_vad_adapter(testing=testing)
+
+
+def require_admin(
+    credentials: HTTPAuthorizationCredentials | None = Depends(_admin_bearer),
+):
+    """Authorization: Bearer <ADMIN_TOKEN> を要求する（未設定時は 404 で存在を隠す）"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if credentials is None or not hmac.compare_digest(
+        credentials.credentials.encode(), ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid admin token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.api.deps import require_admin
+from app.services.profiler import ProfilerBusyError, WorkerProfiler
+from app.websocket.handlers import get_manager
+
+# 1回の計測の上限（秒）。計測中もワーカーは通常通り処理を続ける
+ADMIN_PROFILE_MAX_SECONDS = float(os.getenv("ADMIN_PROFILE_MAX_SECONDS", "60"))
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+profiler = WorkerProfiler()
+
+
+def _session_bytes() -> dict[str, int]:
+    """
+    ConnectionManager のセッション毎に溜まっている音声のバイト数（イベントループ上で呼ぶ）
+    確保済みの容量は発話の有無で変わらないため、増加の比較には使わない
+    """
+    manager = get_manager()
+    if manager is None:
+        return {}
+    return {
+        client_id: manager.session_memory_bytes(client_id)
+        for client_id in list(manager.segmenters)
+    }
+
+
+def _check_duration(seconds: float):
+    if seconds > ADMIN_PROFILE_MAX_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"seconds must be <= {ADMIN_PROFILE_MAX_SECONDS:g}",
+        )
+
+
+@router.post(
+    "/profile",
+    summary="Sampling Profile",
+    description=(
+        "イベントループと executor の全スレッドを指定秒数サンプリングし、"
+        "collapsed stacks 形式（flamegraph.pl / speedscope 用）で返す"
+    ),
+    response_class=PlainTextResponse,
+)
+async def sampling_profile(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+):
+    _check_duration(seconds)
+    try:
+        result = await asyncio.to_thread(profiler.sample, seconds, interval_ms / 1000)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    summary = result.summary()
+    filename = f"profile-{time.strftime('%Y%m%d-%H%M%S')}.folded"
+    return PlainTextResponse(
+        result.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(summary["samples"]),
+            "X-Profile-Overhead-Ratio": str(summary["overhead_ratio"]),
+        },
+    )
+
+
+@router.post(
+    "/memory",
+    summary="Memory Growth",
+    description=(
+        "tracemalloc のスナップショットを指定秒数の間隔で2回取り、"
+        "増加量の多い確保元とセッション毎のバッファの増加を返す"
+    ),
+)
+async def memory_growth(
+    seconds: float = Query(10.0, gt=0),
+    top: int = Query(25, ge=1, le=200),
+    frames: int = Query(10, ge=1, le=100),
+):
+    _check_duration(seconds)
+    before = _session_bytes()
+    try:
+        growth = await asyncio.to_thread(profiler.memory_growth, seconds, top, frames)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    growth.add_session_growth(before, _session_bytes())
+    return growth.to_dict()
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
 
 from app.api.deps import get_health_service, get_app_health_service
 from app.services.health_service import HealthService
@@ -7,7 +8,9 @@ from app.schemas.health import (
     DatabaseHealthErrorResponse,
     ApplicationHealthResponse,
     HealthStatus,
+    ReadinessResponse,
 )
+from app.websocket.handlers import get_manager
 
 router = APIRouter()
 
@@ -50,3 +53,41 @@ async def health_check_application(
     データベース接続は確認せず、FastAPIアプリケーション自体の動作確認のみ
     """
     return await health_service.check_application_health()
+
+
+@router.get(
+    "/health/live",
+    summary="Liveness",
+    description="プロセスが応答できるかの確認（モデル・外部サービスの状態は見ない。再起動の判断用）",
+    response_model=ApplicationHealthResponse,
+)
+async def liveness(
+    health_service: HealthService = Depends(get_app_health_service),
+):
+    return await health_service.check_application_health()
+
+
+@router.get(
+    "/health/ready",
+    summary="Readiness",
+    description=(
+        "新規セッションを振り分けてよいかの確認。モデルのウォームアップ完了・"
+        "バックエンドの正常性（TTL 付きキャッシュ）・VAD と文字起こしの混雑度を見る"
+    ),
+    response_model=ReadinessResponse,
+    responses={
+        503: {
+            "description": "振り分け不可（reasons に理由）",
+            "model": ReadinessResponse,
+        }
+    },
+)
+async def readiness():
+    manager = get_manager()
+    if manager is None:
+        report = ReadinessResponse(ready=False, reasons=["starting"])
+    else:
+        report = ReadinessResponse(**manager.readiness())
+    return JSONResponse(
+        status_code=200 if report.ready else 503, content=report.model_dump()
+    )
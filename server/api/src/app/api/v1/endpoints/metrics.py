@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services import metrics
+from app.services.loop_monitor import get_loop_monitor
+from app.websocket.handlers import get_manager
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LOOP_LAG_QUANTILES = (0.5, 0.95, 0.99)
+
+
+@router.get(
+    "/metrics",
+    summary="Prometheus Metrics",
+    description="処理段階毎の遅延ヒストグラムと件数（Prometheus テキスト形式）",
+    response_class=PlainTextResponse,
+)
+async def prometheus_metrics():
+    loop_monitor = get_loop_monitor()
+    metrics.LOOP_LAG_RECENT_MAX_SECONDS.set(loop_monitor.lag)
+    for quantile in LOOP_LAG_QUANTILES:
+        metrics.LOOP_LAG_QUANTILE_SECONDS.set(
+            loop_monitor.percentile(quantile), quantile=str(quantile)
+        )
+    manager = get_manager()
+    if manager is not None:
+        active = len(manager.active_connections)
+        metrics.ACTIVE_SESSIONS.set(active)
+        metrics.DETACHED_SESSIONS.set(len(manager.segmenters) - active)
+        metrics.TRANSCRIPTIONS_IN_FLIGHT.set(len(manager.transcription_tasks))
+        metrics.VAD_QUEUE_FRAMES.set(getattr(manager.vad_adapter, "queue_depth", 0))
+    return PlainTextResponse(
+        metrics.REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE
+    )
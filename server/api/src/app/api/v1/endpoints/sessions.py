@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+
+from app.services.loop_monitor import get_loop_monitor
+from app.websocket.handlers import get_manager
+
+router = APIRouter()
+
+
+@router.get(
+    "/sessions",
+    summary="WebSocket Sessions",
+    description="接続中のセッション数・受け付け制御・死活監視・イベントループ・受信ログ・セグメント結合の状態（監視用）",
+)
+async def session_stats():
+    manager = get_manager()
+    if manager is None:
+        return {"initialized": False, "event_loop": get_loop_monitor().get_stats()}
+    return {
+        "initialized": True,
+        "active": len(manager.active_connections),
+        "detached": len(manager.segmenters) - len(manager.active_connections),
+        "admission": manager.admission.get_stats(),
+        "liveness": manager.liveness.get_stats(),
+        "event_loop": manager.loop_monitor.get_stats(),
+        "ingest_recorder": manager.ingest_recorder.get_stats(),
+        "segment_merger": (
+            manager.segment_merger.get_stats() if manager.segment_merger else None
+        ),
+    }
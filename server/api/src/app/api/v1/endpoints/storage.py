@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+
+from app.websocket.handlers import AUDIO_RETENTION_ENABLED, get_manager
+
+router = APIRouter()
+
+
+@router.get(
+    "/storage/audio",
+    summary="Audio Storage Usage",
+    description="保存音声のディスク使用量と上限（監視・アラート用）",
+)
+async def audio_storage_usage():
+    manager = get_manager()
+    if manager is None:
+        return {"enabled": AUDIO_RETENTION_ENABLED, "initialized": False}
+    stats = manager.audio_writer.get_stats()
+    stats["initialized"] = True
+    return stats
@@ -1,8 +1,20 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import health
+from app.api.v1.endpoints import admin, health, metrics, sessions, storage
 
 api_router = APIRouter()
 
 # ヘルスチェック関連のエンドポイント
 api_router.include_router(health.router, tags=["health"])
+
+# 保存音声の使用量
+api_router.include_router(storage.router, tags=["storage"])
+
+# WebSocketセッションの状態
+api_router.include_router(sessions.router, tags=["sessions"])
+
+# Prometheus 形式のメトリクス
+api_router.include_router(metrics.router, tags=["metrics"])
+
+# 管理用（プロファイラ。ADMIN_TOKEN 設定時のみ）
+api_router.include_router(admin.router, tags=["admin"])
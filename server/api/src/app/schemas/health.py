@@ -82,3 +82,49 @@ class ApplicationHealthResponse(BaseModel):
         ...,
         description="ヘルスチェックメッセージ",
     )
+
+
+class ReadinessResponse(BaseModel):
+    """readiness（振り分け可否）のレスポンスモデル"""
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "ready": False,
+                "reasons": ["saturated:vad_queue"],
+                "warmed": True,
+                "backends": {
+                    "vad": {
+                        "healthy": True,
+                        "last_result": True,
+                        "age_seconds": 3.2,
+                        "latency_ms": 1.4,
+                        "consecutive_failures": 0,
+                        "error": "",
+                    }
+                },
+                "saturation": {
+                    "utilization": 0.82,
+                    "max_utilization": 0.7,
+                    "signals": {
+                        "vad_queue": {"value": 1680, "limit": 2048, "ratio": 0.82}
+                    },
+                },
+            }
+        }
+    )
+
+    ready: bool = Field(..., description="新規セッションを振り分けてよいか")
+    reasons: list[str] = Field(
+        default_factory=list, description="ready でない理由（ready の場合は空）"
+    )
+    warmed: bool = Field(
+        False, description="モデルの読み込みとウォームアップが完了したか"
+    )
+    backends: dict = Field(
+        default_factory=dict,
+        description="バックエンド毎のキャッシュされたヘルスチェック結果",
+    )
+    saturation: dict = Field(
+        default_factory=dict, description="受け付け制御の上限に対する使用率"
+    )
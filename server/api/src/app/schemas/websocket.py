@@ -16,6 +16,7 @@ class WebSocketMessageType(str, Enum):
 
     # クライアント → サーバー
     MODEL_SELECTION = "model_selection"
+    PONG = "pong"
 
     # サーバー → クライアント
     CONNECTION_ESTABLISHED = "connection_established"
@@ -27,6 +28,11 @@ class WebSocketMessageType(str, Enum):
     STATISTICS = "statistics"
     ERROR = "error"
     SEGMENT_MERGE_ERROR = "segment_merge_error"
+    SESSION_REDIRECT = "session_redirect"
+    CONNECTION_REJECTED = "connection_rejected"
+    SESSION_RESUMED = "session_resumed"
+    SERVER_DRAINING = "server_draining"
+    PING = "ping"
 
 
 class BaseWebSocketMessage(BaseModel):
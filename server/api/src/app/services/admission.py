@@ -0,0 +1,156 @@
+import logging
+from dataclasses import dataclass, asdict
+from enum import IntEnum
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class LoadLevel(IntEnum):
+    """サーバーの負荷状態"""
+
+    NORMAL = 0
+    DEGRADED = 1  # 任意の処理（統計・途中結果）を省く
+    OVERLOADED = 2  # 新規セッションを受け付けない
+
+
+@dataclass
+class LoadSignals:
+    """負荷判定に使う現在値"""
+
+    active_sessions: int = 0
+    loop_lag: float = 0.0  # 秒
+    vad_queue_depth: int = 0  # 推論待ちフレーム数
+    transcription_backlog: int = 0  # 実行中の文字起こし数
+
+
+@dataclass
+class AdmissionDecision:
+    accepted: bool
+    level: LoadLevel
+    reason: str = ""
+    retry_after: float = 0.0
+
+
+@dataclass
+class AdmissionStats:
+    admitted: int = 0
+    rejected: int = 0
+    shed_messages: int = 0  # 負荷軽減のため送らなかったメッセージ数
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class AdmissionController:
+    """
+    新規セッションの受け付けと負荷軽減を判断するコントローラー
+
+    各シグナルを上限で割った使用率の最大値で負荷を判定する（上限 0 のシグナルは無視）
+    - 使用率 >= 1.0         : OVERLOADED（新規セッションを 1013 で拒否）
+    - 使用率 >= shed_ratio  : DEGRADED（既存セッションの任意の処理を省く）
+    一度 DEGRADED 以上になったら、使用率が recover_ratio を下回るまで戻らない（ばたつき防止）
+    """
+
+    def __init__(
+        self,
+        signals: Callable[[], LoadSignals],
+        max_sessions: int = 0,
+        max_loop_lag: float = 0.0,
+        max_vad_queue: int = 0,
+        max_transcription_backlog: int = 0,
+        shed_ratio: float = 0.8,
+        recover_ratio: float = 0.6,
+        retry_after: float = 5.0,
+    ):
+        self.signals = signals
+        self.max_sessions = max_sessions
+        self.max_loop_lag = max_loop_lag
+        self.max_vad_queue = max_vad_queue
+        self.max_transcription_backlog = max_transcription_backlog
+        self.shed_ratio = shed_ratio
+        self.recover_ratio = recover_ratio
+        self.retry_after = retry_after
+        self.level = LoadLevel.NORMAL
+        self.stats = AdmissionStats()
+
+    def _limits(self, signals: LoadSignals) -> list[tuple[float, float, str]]:
+        return [
+            (signals.active_sessions, self.max_sessions, "sessions"),
+            (signals.loop_lag, self.max_loop_lag, "loop_lag"),
+            (signals.vad_queue_depth, self.max_vad_queue, "vad_queue"),
+            (
+                signals.transcription_backlog,
+                self.max_transcription_backlog,
+                "transcription_backlog",
+            ),
+        ]
+
+    def utilization(self, signals: LoadSignals) -> tuple[float, str]:
+        """最も逼迫しているシグナルの使用率と名前"""
+        return max(
+            (
+                (value / limit, name)
+                for value, limit, name in self._limits(signals)
+                if limit > 0
+            ),
+            default=(0.0, ""),
+        )
+
+    def saturation(self, signals: LoadSignals) -> dict:
+        """シグナル毎の現在値・上限・使用率（上限 0 は使用率なし）"""
+        return {
+            name: {
+                "value": round(value, 4),
+                "limit": limit,
+                "ratio": round(value / limit, 3) if limit > 0 else None,
+            }
+            for value, limit, name in self._limits(signals)
+        }
+
+    def evaluate(self) -> tuple[LoadLevel, float, str]:
+        """現在の負荷状態を判定して更新"""
+        ratio, signal = self.utilization(self.signals())
+        if ratio >= 1.0:
+            level = LoadLevel.OVERLOADED
+        elif ratio >= self.shed_ratio:
+            level = LoadLevel.DEGRADED
+        elif self.level > LoadLevel.NORMAL and ratio >= self.recover_ratio:
+            level = LoadLevel.DEGRADED
+        else:
+            level = LoadLevel.NORMAL
+
+        if level != self.level:
+            logger.warning(
+                f"[Admission] Load level {self.level.name} -> {level.name} "
+                f"({signal}={ratio:.2f})"
+            )
+            self.level = level
+        return level, ratio, signal
+
+    def admit(self) -> AdmissionDecision:
+        """新規セッションを受け付けるか判断"""
+        level, ratio, signal = self.evaluate()
+        if level == LoadLevel.OVERLOADED:
+            self.stats.rejected += 1
+            # 逼迫の度合いに応じて再試行までの時間を延ばす
+            return AdmissionDecision(
+                accepted=False,
+                level=level,
+                reason=f"overloaded: {signal}",
+                retry_after=round(self.retry_after * min(ratio, 4.0), 1),
+            )
+        self.stats.admitted += 1
+        return AdmissionDecision(accepted=True, level=level)
+
+    def should_shed(self) -> bool:
+        """任意の処理を省くべきか（呼び出し側は省いた件数を record_shed で記録）"""
+        return self.evaluate()[0] >= LoadLevel.DEGRADED
+
+    def record_shed(self, count: int = 1):
+        self.stats.shed_messages += count
+
+    def get_stats(self) -> dict:
+        stats = self.stats.to_dict()
+        stats["level"] = self.level.name
+        return stats
@@ -0,0 +1,206 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Callable, Optional
+
+from app.services.audio_codecs import LOSSLESS_CODECS, decode_pcm, encode_pcm
+from app.services.segment_store import (
+    SessionAudioReader,
+    archive_path,
+    data_path,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ArchiveResult:
+    """1セッションのアーカイブ結果（ワーカープロセスから返す）"""
+
+    session_path: str
+    codec: str
+    input_bytes: int
+    output_bytes: int
+    cpu_seconds: float
+
+
+@dataclass
+class ArchiverStats:
+    """アーカイブ処理の集計"""
+
+    submitted: int = 0
+    archived: int = 0
+    failed: int = 0
+    input_bytes: int = 0
+    output_bytes: int = 0
+    cpu_seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _lower_priority():
+    """ワーカープロセスの優先度を下げる（ライブ処理の CPU を奪わない）"""
+    try:
+        os.nice(10)
+    except OSError:
+        pass
+    if hasattr(os, "sched_setscheduler") and hasattr(os, "SCHED_IDLE"):
+        try:
+            os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+        except OSError:
+            pass
+
+
+def _fsync_directory(path: str):
+    fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def archive_session(session_path: str, codec: str, level: int = 6) -> ArchiveResult:
+    """
+    書き込みが終わったセッションのデータファイルを圧縮して置き換える（ワーカープロセスで実行）
+
+    一時ファイルに書き出して展開結果を検証してから os.replace で差し替え、
+    その後で元の .pcm を削除する。途中で失敗しても元のデータは残る。
+    """
+    cpu_start = time.process_time()
+    source = data_path(session_path)
+    with open(source, "rb") as f:
+        pcm_bytes = f.read()
+    with SessionAudioReader(session_path) as reader:
+        sample_rate = reader.sample_rate
+
+    encoded = encode_pcm(pcm_bytes, codec, sample_rate=sample_rate, level=level)
+
+    # 展開して検証（可逆なら完全一致、非可逆なら長さのみ）
+    decoded = decode_pcm(encoded, codec)
+    if codec in LOSSLESS_CODECS:
+        if decoded != pcm_bytes:
+            raise ValueError(f"Archive verification failed for {session_path}")
+    elif len(decoded) < len(pcm_bytes):
+        raise ValueError(
+            f"Archive verification failed for {session_path}: "
+            f"{len(decoded)} < {len(pcm_bytes)} bytes"
+        )
+
+    target = archive_path(session_path, codec)
+    tmp_path = target + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encoded)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, target)
+    _fsync_directory(target)
+    os.remove(source)
+
+    return ArchiveResult(
+        session_path=session_path,
+        codec=codec,
+        input_bytes=len(pcm_bytes),
+        output_bytes=len(encoded),
+        cpu_seconds=time.process_time() - cpu_start,
+    )
+
+
+class AudioArchiver:
+    """
+    書き込みが終わったセッションをプロセスプールで圧縮するパイプライン
+
+    - ワーカープロセスは低優先度（nice / SCHED_IDLE）で動かし、ライブ処理の遅延に影響させない
+    - 圧縮結果は検証してから差し替える（archive_session 参照）
+    - 圧縮率と消費した CPU 時間を集計する
+    - on_done はアーカイブの成否にかかわらず呼ばれる（サイズ差分を渡す）
+    """
+
+    def __init__(
+        self,
+        codec: str = "flac",
+        level: int = 6,
+        max_workers: int = 1,
+        on_done: Optional[Callable[[str, int], None]] = None,
+    ):
+        self.codec = codec
+        self.level = level
+        self.on_done = on_done
+        self.stats = ArchiverStats()
+        self._lock = threading.Lock()
+        self._pending = 0
+        # 親プロセスはスレッドを持つので fork ではなく spawn で起動する
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_lower_priority,
+        )
+
+    @property
+    def pending_count(self) -> int:
+        return self._pending
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = self.stats.to_dict()
+            stats["pending"] = self._pending
+        stats["codec"] = self.codec
+        stats["compression_ratio"] = (
+            stats["input_bytes"] / stats["output_bytes"]
+            if stats["output_bytes"]
+            else 0.0
+        )
+        return stats
+
+    def submit(self, session_path: str) -> Future:
+        """セッションのアーカイブを依頼する（どのスレッドからでも呼べる）"""
+        with self._lock:
+            self.stats.submitted += 1
+            self._pending += 1
+        future = self._executor.submit(
+            archive_session, session_path, self.codec, self.level
+        )
+        future.add_done_callback(
+            lambda f, path=session_path: self._on_complete(path, f)
+        )
+        return future
+
+    def close(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _on_complete(self, session_path: str, future: Future):
+        delta = 0
+        try:
+            result = future.result()
+        except Exception as e:
+            with self._lock:
+                self.stats.failed += 1
+            logger.error(f"[Archiver] Failed to archive {session_path}: {e}")
+        else:
+            delta = result.output_bytes - result.input_bytes
+            with self._lock:
+                self.stats.archived += 1
+                self.stats.input_bytes += result.input_bytes
+                self.stats.output_bytes += result.output_bytes
+                self.stats.cpu_seconds += result.cpu_seconds
+            ratio = (
+                result.input_bytes / result.output_bytes if result.output_bytes else 0.0
+            )
+            logger.info(
+                f"[Archiver] Archived {session_path} as {result.codec} "
+                f"({result.input_bytes} -> {result.output_bytes} bytes, "
+                f"ratio {ratio:.2f}, cpu {result.cpu_seconds:.3f}s)"
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+        if self.on_done:
+            try:
+                self.on_done(session_path, delta)
+            except Exception as e:
+                logger.error(f"[Archiver] Completion callback failed: {e}")
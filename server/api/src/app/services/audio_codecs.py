@@ -0,0 +1,96 @@
+"""
+アーカイブ用の音声コーデック
+
+- flac : 可逆圧縮（soundfile / libsndfile が必要。uv sync --extra archive）
+- opus : 非可逆圧縮（soundfile / libsndfile 1.0.29 以降が必要）
+- zlib : 差分符号化 + zlib の可逆圧縮（標準ライブラリのみで動作）
+"""
+
+import io
+import zlib
+
+import numpy as np
+
+CODEC_SUFFIXES = {
+    "flac": ".flac",
+    "opus": ".opus",
+    "zlib": ".pcmz",
+}
+LOSSLESS_CODECS = {"flac", "zlib"}
+# soundfile で書き込む形式（コーデック: (format, subtype)）
+SOUNDFILE_FORMATS = {
+    "flac": ("FLAC", "PCM_16"),
+    "opus": ("OGG", "OPUS"),
+}
+
+
+def _soundfile():
+    try:
+        import soundfile
+    except ImportError as e:
+        raise RuntimeError(
+            "soundfile is required for FLAC/Opus archiving (pip install soundfile)"
+        ) from e
+    return soundfile
+
+
+def check_codec(codec: str):
+    """
+    コーデックがこの環境で使えるか確認する（起動時用）
+
+    Raises:
+        ValueError: 未知のコーデック
+        RuntimeError: soundfile がない、または libsndfile がその形式に対応していない
+    """
+    if codec not in CODEC_SUFFIXES:
+        raise ValueError(f"Unknown codec: {codec}")
+    if codec not in SOUNDFILE_FORMATS:
+        return
+    sf = _soundfile()
+    audio_format, subtype = SOUNDFILE_FORMATS[codec]
+    if subtype not in sf.available_subtypes(audio_format):
+        raise RuntimeError(
+            f"libsndfile {sf.__libsndfile_version__} does not support "
+            f"{audio_format}/{subtype}"
+        )
+
+
+def encode_pcm(
+    pcm_bytes: bytes, codec: str, sample_rate: int = 16000, level: int = 6
+) -> bytes:
+    """16bit モノラル PCM を指定コーデックで圧縮する"""
+    samples = np.frombuffer(pcm_bytes, dtype=np.int16)
+    if codec == "zlib":
+        # 隣接サンプルの差分は0付近に集中するので圧縮が効きやすい（int16 で折り返す）
+        delta = np.diff(samples, prepend=np.int16(0))
+        return zlib.compress(delta.tobytes(), level)
+
+    sf = _soundfile()
+    buffer = io.BytesIO()
+    if codec == "flac":
+        sf.write(
+            buffer,
+            samples,
+            sample_rate,
+            format="FLAC",
+            subtype="PCM_16",
+            compression_level=min(level, 8) / 8,
+        )
+    elif codec == "opus":
+        sf.write(buffer, samples, sample_rate, format="OGG", subtype="OPUS")
+    else:
+        raise ValueError(f"Unknown codec: {codec}")
+    return buffer.getvalue()
+
+
+def decode_pcm(data: bytes, codec: str) -> bytes:
+    """encode_pcm() で圧縮したデータを 16bit PCM に戻す"""
+    if codec == "zlib":
+        delta = np.frombuffer(zlib.decompress(data), dtype=np.int16)
+        return np.cumsum(delta, dtype=np.int16).tobytes()
+
+    if codec not in CODEC_SUFFIXES:
+        raise ValueError(f"Unknown codec: {codec}")
+    sf = _soundfile()
+    samples, _ = sf.read(io.BytesIO(data), dtype="int16")
+    return samples.tobytes()
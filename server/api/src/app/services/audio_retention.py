@@ -0,0 +1,247 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict
+
+from app.services.segment_store import (
+    INDEX_HEADER,
+    INDEX_RECORD,
+    list_sessions,
+    session_files,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionUsage:
+    """セッション毎のディスク使用量"""
+
+    bytes: int
+    last_write: float
+    closed: bool  # 書き込みが終わったセッションのみ削除対象にする
+
+
+@dataclass
+class RetentionStats:
+    """削除・拒否の集計"""
+
+    evicted_sessions: int = 0
+    evicted_bytes: int = 0
+    evicted_by_age: int = 0
+    evicted_by_size: int = 0
+    evicted_by_count: int = 0
+    rejected_writes: int = 0  # 上限を超えるため保存しなかった数
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class AudioRetentionManager:
+    """
+    保存した音声コンテナのディスク使用量を上限内に保つマネージャー
+
+    - 起動時に一度だけディレクトリを走査し、以降は書き込み毎に使用量を加算する
+      （ツリー全体を再走査しない）
+    - 上限は「合計バイト数」「経過時間」「セッション数」の3つ（0 は無制限）
+    - 書き込み前に reserve() で上限を確認し、足りなければ最終書き込みの古い順に削除する
+    - 書き込み中のセッションは削除しない。削除できる分がなければ書き込みを拒否する
+    - ファイルの削除は書き込みスレッドから行う（開いているファイルと競合しない）
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_total_bytes: int = 0,
+        max_age_seconds: float = 0,
+        max_sessions: int = 0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.directory = directory
+        self.max_total_bytes = max_total_bytes
+        self.max_age_seconds = max_age_seconds
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self.stats = RetentionStats()
+
+        self._sessions: Dict[str, SessionUsage] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._scan()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    @property
+    def session_count(self) -> int:
+        return len(self._sessions)
+
+    def get_stats(self) -> dict:
+        """現在の使用量と上限（監視用）"""
+        with self._lock:
+            stats = self.stats.to_dict()
+            stats["total_bytes"] = self._total_bytes
+            stats["sessions"] = len(self._sessions)
+            stats["open_sessions"] = sum(
+                1 for usage in self._sessions.values() if not usage.closed
+            )
+        stats["max_total_bytes"] = self.max_total_bytes
+        stats["max_age_seconds"] = self.max_age_seconds
+        stats["max_sessions"] = self.max_sessions
+        stats["usage_ratio"] = (
+            self._total_bytes / self.max_total_bytes if self.max_total_bytes else 0.0
+        )
+        return stats
+
+    def reserve(self, session_path: str, nbytes: int) -> bool:
+        """
+        書き込み前に容量を確保する（必要なら古いセッションを削除）
+
+        Returns:
+            bool: 書き込んでよい場合 True
+        """
+        with self._lock:
+            usage = self._sessions.get(session_path)
+            needed = nbytes + INDEX_RECORD.size
+            if usage is None:
+                needed += INDEX_HEADER.size
+                if self.max_sessions:
+                    self._evict_locked(
+                        lambda: len(self._sessions) >= self.max_sessions, "count"
+                    )
+                    if len(self._sessions) >= self.max_sessions:
+                        self.stats.rejected_writes += 1
+                        return False
+
+            if self.max_total_bytes:
+                self._evict_locked(
+                    lambda: self._total_bytes + needed > self.max_total_bytes, "size"
+                )
+                if self._total_bytes + needed > self.max_total_bytes:
+                    self.stats.rejected_writes += 1
+                    return False
+
+            if usage is None:
+                usage = SessionUsage(bytes=0, last_write=self.clock(), closed=False)
+                self._sessions[session_path] = usage
+            usage.bytes += needed
+            usage.last_write = self.clock()
+            usage.closed = False
+            self._total_bytes += needed
+        return True
+
+    def release(self, session_path: str, nbytes: int):
+        """reserve() したが書き込めなかった分を戻す"""
+        with self._lock:
+            usage = self._sessions.get(session_path)
+            if usage is None:
+                return
+            freed = min(usage.bytes, nbytes + INDEX_RECORD.size)
+            usage.bytes -= freed
+            self._total_bytes -= freed
+
+    def adjust(self, session_path: str, delta_bytes: int):
+        """書き込み以外でサイズが変わった分を反映する（アーカイブ時など）"""
+        with self._lock:
+            usage = self._sessions.get(session_path)
+            if usage is None:
+                return
+            delta_bytes = max(delta_bytes, -usage.bytes)
+            usage.bytes += delta_bytes
+            self._total_bytes += delta_bytes
+
+    def mark_closed(self, session_path: str):
+        """セッションの書き込みが終わった（以降は削除対象）"""
+        with self._lock:
+            usage = self._sessions.get(session_path)
+            if usage is not None:
+                usage.closed = True
+
+    def enforce(self) -> int:
+        """
+        経過時間・セッション数・合計サイズの上限を適用する（定期実行用）
+
+        Returns:
+            int: 削除したセッション数
+        """
+        before = self.stats.evicted_sessions
+        with self._lock:
+            if self.max_age_seconds:
+                cutoff = self.clock() - self.max_age_seconds
+                expired = [
+                    path
+                    for path, usage in self._sessions.items()
+                    if usage.closed and usage.last_write < cutoff
+                ]
+                for path in expired:
+                    self._evict_session_locked(path, "age")
+            if self.max_sessions:
+                self._evict_locked(
+                    lambda: len(self._sessions) > self.max_sessions, "count"
+                )
+            if self.max_total_bytes:
+                self._evict_locked(
+                    lambda: self._total_bytes > self.max_total_bytes, "size"
+                )
+        return self.stats.evicted_sessions - before
+
+    def _scan(self):
+        """起動時に既存のセッションを一度だけ読み込む（全て書き込み終了扱い）"""
+        for session_path in list_sessions(self.directory):
+            size = 0
+            last_write = 0.0
+            for path in session_files(session_path):
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                size += st.st_size
+                last_write = max(last_write, st.st_mtime)
+            self._sessions[session_path] = SessionUsage(size, last_write, closed=True)
+            self._total_bytes += size
+        if self._sessions:
+            logger.info(
+                f"[Retention] Indexed {len(self._sessions)} sessions "
+                f"({self._total_bytes} bytes) in {self.directory}"
+            )
+
+    def _evict_locked(self, over_limit: Callable[[], bool], reason: str):
+        """上限を下回るまで、最終書き込みの古い書き込み終了セッションから削除"""
+        if not over_limit():
+            return
+        candidates = sorted(
+            (usage.last_write, path)
+            for path, usage in self._sessions.items()
+            if usage.closed
+        )
+        for _, path in candidates:
+            if not over_limit():
+                break
+            self._evict_session_locked(path, reason)
+
+    def _evict_session_locked(self, session_path: str, reason: str):
+        usage = self._sessions.pop(session_path)
+        self._total_bytes -= usage.bytes
+        for path in session_files(session_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"[Retention] Failed to remove {path}: {e}")
+
+        self.stats.evicted_sessions += 1
+        self.stats.evicted_bytes += usage.bytes
+        if reason == "age":
+            self.stats.evicted_by_age += 1
+        elif reason == "count":
+            self.stats.evicted_by_count += 1
+        else:
+            self.stats.evicted_by_size += 1
+        logger.info(
+            f"[Retention] Evicted session {session_path} "
+            f"({usage.bytes} bytes, reason: {reason})"
+        )
@@ -0,0 +1,304 @@
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Callable, Optional
+
+from app.services.audio_archiver import AudioArchiver
+from app.services.audio_retention import AudioRetentionManager
+from app.services.segment_store import SessionAudioWriter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AudioWriterStats:
+    """書き込み状況の集計"""
+
+    submitted: int = 0
+    written: int = 0
+    dropped: int = 0  # キューが一杯で破棄した数
+    failed: int = 0  # 書き込みエラー数
+    bytes_written: int = 0
+    fsync_batches: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class AudioSegmentWriter:
+    """
+    音声セグメントをバックグラウンドスレッドで保存するサービス
+    セグメントはセッション毎の追記型コンテナ（segment_store）に書き込む
+
+    - submit() はキューに積むだけでイベントループをブロックしない
+    - キュー（件数・バイト数）が一杯の場合は書き込みを破棄して音声処理を止めない
+      （セッションを閉じる依頼は破棄しない）
+    - 書き込みスレッドはキューにある分をまとめて書き、fsync もまとめて行う
+    - enabled=False の場合は何も保存しない（音声を保持しない運用向け）
+    - retention を指定した場合は書き込み前に容量を確保し、定期的に上限を適用する
+    - archiver を指定した場合は閉じたセッションを圧縮に回す
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_queue_size: int = 256,
+        max_queued_bytes: int = 64 * 1024 * 1024,
+        fsync_batch_size: int = 16,
+        max_open_sessions: int = 64,
+        retention: Optional[AudioRetentionManager] = None,
+        retention_interval: float = 60.0,
+        archiver: Optional[AudioArchiver] = None,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        sample_width: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.enabled = enabled
+        self.max_queue_size = max_queue_size
+        self.max_queued_bytes = max_queued_bytes
+        self.fsync_batch_size = fsync_batch_size
+        self.max_open_sessions = max_open_sessions
+        self.retention = retention
+        self.retention_interval = retention_interval
+        self.archiver = archiver
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.clock = clock
+        self.stats = AudioWriterStats()
+
+        # 件数の上限は submit() で確認する（閉じる依頼は上限を超えても積む）
+        self._queue: queue.Queue = queue.Queue()
+        self._queued_bytes = 0
+        self._lock = threading.Lock()
+        # 書き込みスレッドだけが触る、開いているセッションのライター
+        self._writers: OrderedDict[str, SessionAudioWriter] = OrderedDict()
+        # 書き込みスレッドだけが触る、書き込んだがまだ閉じる依頼が来ていないセッション
+        # （開いているファイル数の上限で閉じたライターも含む）
+        self._unclosed: set[str] = set()
+        self._thread_stopping = False
+        self._retention_enforced_at = clock()
+        self._thread: Optional[threading.Thread] = None
+        if enabled:
+            self._thread = threading.Thread(
+                target=self._run, name="audio-segment-writer", daemon=True
+            )
+            self._thread.start()
+
+    @property
+    def queue_depth(self) -> int:
+        """書き込み待ちの件数"""
+        return self._queue.qsize()
+
+    def get_stats(self) -> dict:
+        stats = self.stats.to_dict()
+        stats["enabled"] = self.enabled
+        stats["queue_depth"] = self.queue_depth
+        stats["queued_bytes"] = self._queued_bytes
+        if self.retention:
+            stats["retention"] = self.retention.get_stats()
+        if self.archiver:
+            stats["archive"] = self.archiver.get_stats()
+        return stats
+
+    def submit(self, session_path: str, segment_id: int, pcm_bytes: bytes) -> bool:
+        """
+        PCMデータをセッションのコンテナに追記するようキューに積む
+
+        Returns:
+            bool: キューに積めた場合 True（無効時・破棄時は False）
+        """
+        if not self.enabled:
+            return False
+
+        size = len(pcm_bytes)
+        with self._lock:
+            self.stats.submitted += 1
+            if self._queued_bytes + size > self.max_queued_bytes:
+                self.stats.dropped += 1
+                logger.warning(
+                    f"[AudioWriter] Queue bytes limit reached, dropping segment "
+                    f"{segment_id} of {session_path}"
+                )
+                return False
+            if self._queue_full():
+                self.stats.dropped += 1
+                logger.warning(
+                    f"[AudioWriter] Queue full, dropping segment {segment_id} of {session_path}"
+                )
+                return False
+            self._queue.put_nowait((session_path, segment_id, pcm_bytes))
+            self._queued_bytes += size
+        return True
+
+    def close_session(self, session_path: str):
+        """
+        セッションのファイルを閉じるよう依頼する
+
+        キューが一杯でも破棄しない（閉じないとセッションが削除・圧縮の対象にならない）。
+        先に積んだセグメントを書き終えてから閉じる
+        """
+        if not self.enabled:
+            return
+        if self._queue_full():
+            logger.warning(
+                f"[AudioWriter] Queue full, queuing close of {session_path} over the limit"
+            )
+        self._queue.put_nowait((session_path, None, None))
+
+    def _queue_full(self) -> bool:
+        """キューの件数が上限に達しているか（0 は無制限）"""
+        return 0 < self.max_queue_size <= self._queue.qsize()
+
+    def close(self, timeout: Optional[float] = None):
+        """キューに残っている分を書き終えてスレッドを停止する"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        """書き込みスレッド本体"""
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self._retention_wait())
+            except queue.Empty:
+                self._enforce_retention_if_due()
+                continue
+            batch = []
+            # キューにある分をまとめて取り出す
+            while True:
+                if item is None:
+                    stopping = True
+                    self._thread_stopping = True
+                else:
+                    batch.append(item)
+                if stopping or len(batch) >= self.fsync_batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            self._write_batch(batch)
+            # 書き込みが続いていても retention_interval 毎に上限を適用する
+            self._enforce_retention_if_due()
+
+    def _retention_wait(self) -> Optional[float]:
+        """次に上限を適用するまでの秒数（retention がなければ無期限に待つ）"""
+        if not self.retention:
+            return None
+        elapsed = self.clock() - self._retention_enforced_at
+        return max(0.0, self.retention_interval - elapsed)
+
+    def _enforce_retention_if_due(self):
+        """前回から retention_interval 経っていれば経過時間などの上限を適用"""
+        if not self.retention:
+            return
+        now = self.clock()
+        if now - self._retention_enforced_at < self.retention_interval:
+            return
+        self._retention_enforced_at = now
+        try:
+            self.retention.enforce()
+        except Exception as e:
+            logger.error(f"[AudioWriter] Retention enforcement failed: {e}")
+
+    def _get_writer(self, session_path: str) -> SessionAudioWriter:
+        writer = self._writers.get(session_path)
+        if writer is not None:
+            self._writers.move_to_end(session_path)
+            return writer
+
+        # 開いているファイル数を制限（最も古いセッションを閉じる）
+        while len(self._writers) >= self.max_open_sessions:
+            _, oldest = self._writers.popitem(last=False)
+            oldest.close()
+
+        writer = SessionAudioWriter(
+            session_path,
+            sample_rate=self.sample_rate,
+            channels=self.channels,
+            sample_width=self.sample_width,
+        )
+        self._writers[session_path] = writer
+        return writer
+
+    def _write_batch(self, batch: list):
+        touched = {}
+        for session_path, segment_id, pcm_bytes in batch:
+            if pcm_bytes is None:
+                # セッションを閉じる依頼
+                writer = self._writers.pop(session_path, None)
+                touched.pop(session_path, None)
+                if writer is not None:
+                    self._close_writer(writer)
+                if session_path in self._unclosed:
+                    self._unclosed.discard(session_path)
+                    if self.archiver:
+                        # 圧縮が終わるまでは削除対象にしない
+                        self.archiver.submit(session_path)
+                        continue
+                if self.retention:
+                    self.retention.mark_closed(session_path)
+                continue
+
+            if self.retention and not self.retention.reserve(
+                session_path, len(pcm_bytes)
+            ):
+                self.stats.dropped += 1
+                logger.warning(
+                    f"[AudioWriter] Disk quota exceeded, dropping segment "
+                    f"{segment_id} of {session_path}"
+                )
+                with self._lock:
+                    self._queued_bytes -= len(pcm_bytes)
+                continue
+
+            try:
+                writer = self._get_writer(session_path)
+                writer.append(segment_id, pcm_bytes)
+                touched[session_path] = writer
+                self._unclosed.add(session_path)
+                self.stats.written += 1
+                self.stats.bytes_written += len(pcm_bytes)
+                logger.info(
+                    f"[AudioWriter] Saved segment {segment_id} to {session_path}"
+                )
+            except Exception as e:
+                self.stats.failed += 1
+                if self.retention:
+                    self.retention.release(session_path, len(pcm_bytes))
+                logger.error(
+                    f"[AudioWriter] Failed to write segment {segment_id} to {session_path}: {e}"
+                )
+            finally:
+                with self._lock:
+                    self._queued_bytes -= len(pcm_bytes)
+
+        # バッチ内で書き込んだセッションをまとめて fsync
+        for session_path, writer in touched.items():
+            try:
+                writer.sync()
+            except OSError as e:
+                self.stats.failed += 1
+                logger.error(f"[AudioWriter] fsync failed for {session_path}: {e}")
+        if touched:
+            self.stats.fsync_batches += 1
+
+        if self._thread_stopping:
+            for writer in self._writers.values():
+                self._close_writer(writer)
+            self._writers.clear()
+
+    def _close_writer(self, writer: SessionAudioWriter):
+        try:
+            writer.close()
+        except OSError as e:
+            logger.error(f"[AudioWriter] Failed to close {writer.base_path}: {e}")
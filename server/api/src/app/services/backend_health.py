@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BackendStatus:
+    """バックエンド1つ分の直近のヘルスチェック結果"""
+
+    healthy: Optional[bool] = None  # None は未確認
+    checked_at: Optional[float] = None  # clock 基準
+    latency: float = 0.0  # 秒
+    error: str = ""
+    consecutive_failures: int = 0
+
+
+class BackendHealthCache:
+    """
+    アダプターの health_check 結果を TTL 付きでキャッシュする
+
+    - refresh_interval 秒毎にバックグラウンドで全バックエンドを確認する
+      （readiness の問い合わせ毎にモデルの推論やリモート API を呼ばない）
+    - 結果が ttl 秒より古い場合は正常とみなさない（確認が止まった場合に備える）
+    - 各確認は timeout 秒で打ち切り、失敗として扱う
+    """
+
+    def __init__(
+        self,
+        checks: Dict[str, Callable[[], Awaitable[bool]]],
+        ttl: float = 30.0,
+        refresh_interval: float = 10.0,
+        timeout: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.checks = checks
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.clock = clock
+        self.statuses: Dict[str, BackendStatus] = {
+            name: BackendStatus() for name in checks
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self, name: str) -> BackendStatus:
+        status = self.statuses[name]
+        started = time.perf_counter()
+        try:
+            healthy = bool(await asyncio.wait_for(self.checks[name](), self.timeout))
+            error = "" if healthy else "health check returned false"
+        except asyncio.TimeoutError:
+            healthy, error = False, f"timed out after {self.timeout:g}s"
+        except Exception as e:
+            healthy, error = False, str(e)
+        status.latency = time.perf_counter() - started
+        status.checked_at = self.clock()
+        if healthy != status.healthy:
+            log = logger.info if healthy else logger.warning
+            log(f"[BackendHealth] {name} is {'healthy' if healthy else 'unhealthy'}")
+        status.healthy = healthy
+        status.error = error
+        status.consecutive_failures = 0 if healthy else status.consecutive_failures + 1
+        return status
+
+    async def refresh_all(self):
+        await asyncio.gather(*(self.refresh(name) for name in self.checks))
+
+    def is_healthy(self, name: str) -> bool:
+        status = self.statuses[name]
+        return (
+            status.healthy is True
+            and status.checked_at is not None
+            and self.clock() - status.checked_at <= self.ttl
+        )
+
+    def unhealthy(self) -> list[str]:
+        """正常と確認できていないバックエンド（未確認・失敗・期限切れ）"""
+        return [name for name in self.checks if not self.is_healthy(name)]
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh_all()
+
+    def get_stats(self) -> dict:
+        now = self.clock()
+        return {
+            name: {
+                "healthy": self.is_healthy(name),
+                "last_result": status.healthy,
+                "age_seconds": round(now - status.checked_at, 1)
+                if status.checked_at is not None
+                else None,
+                "latency_ms": round(status.latency * 1000, 1),
+                "consecutive_failures": status.consecutive_failures,
+                "error": status.error,
+            }
+            for name, status in self.statuses.items()
+        }
@@ -0,0 +1,220 @@
+import json
+import logging
+import os
+import queue
+import random
+import struct
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import BinaryIO, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# 受信ログのファイル形式（リトルエンディアン）
+#   先頭: MAGIC, ヘッダー長 (uint32), ヘッダー (JSON)
+#   以降: レコードの繰り返し
+#     種類 (uint8), セッション開始からの受信時刻 (uint64, マイクロ秒), 長さ (uint32), 本体
+MAGIC = b"RIL1"
+HEADER_LENGTH = struct.Struct("<I")
+RECORD_HEADER = struct.Struct("<BQI")
+KIND_AUDIO = 1  # バイナリメッセージ（PCM）
+KIND_TEXT = 2  # テキストメッセージ（JSON、UTF-8）
+LOG_SUFFIX = ".ril"
+
+
+@dataclass
+class IngestRecord:
+    """受信ログの1レコード"""
+
+    kind: int
+    offset: float  # セッション開始からの受信時刻（秒）
+    payload: bytes
+
+
+def read_ingest_log(f: BinaryIO) -> tuple[dict, Iterator[IngestRecord]]:
+    """
+    受信ログを読む（途中で切れている場合は読めたところまで）
+
+    Returns:
+        tuple[dict, Iterator[IngestRecord]]: ヘッダーとレコードのイテレーター
+    """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not an ingest log")
+    (length,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+    header = json.loads(f.read(length))
+
+    def records() -> Iterator[IngestRecord]:
+        while True:
+            raw = f.read(RECORD_HEADER.size)
+            if len(raw) < RECORD_HEADER.size:
+                return
+            kind, offset_us, size = RECORD_HEADER.unpack(raw)
+            payload = f.read(size)
+            if len(payload) < size:
+                return
+            yield IngestRecord(kind, offset_us / 1_000_000, payload)
+
+    return header, records()
+
+
+@dataclass
+class IngestRecorderStats:
+    """記録状況の集計"""
+
+    sessions: int = 0  # 記録を始めたセッション数
+    records: int = 0
+    bytes_written: int = 0
+    dropped_sessions: int = 0  # キューが一杯で記録を打ち切ったセッション数
+    failed: int = 0  # 書き込みエラー数
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class _SessionLog:
+    """記録中のセッション（イベントループ側のバッファ）"""
+
+    def __init__(self, path: str, started: float, header: dict):
+        self.path = path
+        self.started = started
+        encoded = json.dumps(header, ensure_ascii=False).encode()
+        self.buffer = bytearray(MAGIC + HEADER_LENGTH.pack(len(encoded)) + encoded)
+        self.truncated = False
+
+
+class IngestRecorder:
+    """
+    セッション毎に受信したメッセージを受信時刻付きで記録するサービス（再生・回帰確認用）
+
+    - record() はセッションのバッファに追記するだけで、flush_bytes を超えたら
+      書き込みスレッドに渡す（イベントループでファイルを書かない）
+    - 書き込み待ちが max_queued_bytes を超えたセッションは記録を打ち切る
+      （欠けたログを再生しても同じ結果にならないため、途中からは書かない）
+    - sample_ratio で記録するセッションの割合を指定する
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        enabled: bool = True,
+        sample_ratio: float = 1.0,
+        flush_bytes: int = 64 * 1024,
+        max_queued_bytes: int = 64 * 1024 * 1024,
+        clock=time.perf_counter,
+    ):
+        self.directory = directory
+        self.enabled = enabled
+        self.sample_ratio = sample_ratio
+        self.flush_bytes = flush_bytes
+        self.max_queued_bytes = max_queued_bytes
+        self.clock = clock
+        self.stats = IngestRecorderStats()
+
+        self._sessions: dict[str, _SessionLog] = {}
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._queued_bytes = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        if enabled:
+            self._thread = threading.Thread(
+                target=self._run, name="ingest-recorder", daemon=True
+            )
+            self._thread.start()
+
+    def get_stats(self) -> dict:
+        stats = self.stats.to_dict()
+        stats["enabled"] = self.enabled
+        stats["recording"] = len(self._sessions)
+        stats["queued_bytes"] = self._queued_bytes
+        return stats
+
+    def start_session(self, session_id: str, header: Optional[dict] = None) -> bool:
+        """
+        セッションの記録を始める（sample_ratio に当たらなかった場合は記録しない）
+
+        Returns:
+            bool: 記録する場合 True
+        """
+        if not self.enabled or session_id in self._sessions:
+            return False
+        if self.sample_ratio < 1.0 and random.random() >= self.sample_ratio:
+            return False
+        started_at = time.time()
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(started_at))
+        path = os.path.join(self.directory, f"{stamp}_{session_id}{LOG_SUFFIX}")
+        self._sessions[session_id] = _SessionLog(
+            path,
+            self.clock(),
+            {"session_id": session_id, "started_at": started_at, **(header or {})},
+        )
+        self.stats.sessions += 1
+        return True
+
+    def record(
+        self, session_id: str, kind: int, payload: bytes, at: Optional[float] = None
+    ):
+        """受信したメッセージを記録する（at: 受信時刻。clock と同じ基準）"""
+        log = self._sessions.get(session_id)
+        if log is None or log.truncated:
+            return
+        if at is None:
+            at = self.clock()
+        offset_us = max(0, round((at - log.started) * 1_000_000))
+        log.buffer += RECORD_HEADER.pack(kind, offset_us, len(payload))
+        log.buffer += payload
+        self.stats.records += 1
+        if len(log.buffer) >= self.flush_bytes:
+            self._flush(session_id, log)
+
+    def end_session(self, session_id: str):
+        """残りを書き込んで記録を終える"""
+        log = self._sessions.pop(session_id, None)
+        if log is not None and not log.truncated:
+            self._flush(session_id, log)
+
+    def close(self, timeout: Optional[float] = None):
+        """記録中のセッションを書き込み、スレッドを停止する"""
+        for session_id in list(self._sessions):
+            self.end_session(session_id)
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _flush(self, session_id: str, log: _SessionLog):
+        if not log.buffer:
+            return
+        chunk = bytes(log.buffer)
+        log.buffer.clear()
+        with self._lock:
+            if self._queued_bytes + len(chunk) > self.max_queued_bytes:
+                log.truncated = True
+                self.stats.dropped_sessions += 1
+                logger.warning(
+                    f"[IngestRecorder] Queue bytes limit reached, "
+                    f"stopped recording session {session_id}"
+                )
+                return
+            self._queued_bytes += len(chunk)
+        self._queue.put((log.path, chunk))
+
+    def _run(self):
+        """書き込みスレッド本体"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            path, chunk = item
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                with open(path, "ab") as f:
+                    f.write(chunk)
+                self.stats.bytes_written += len(chunk)
+            except OSError as e:
+                self.stats.failed += 1
+                logger.error(f"[IngestRecorder] Failed to write {path}: {e}")
+            finally:
+                with self._lock:
+                    self._queued_bytes -= len(chunk)
@@ -0,0 +1,165 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class InterimRequest:
+    """途中結果の文字起こし要求"""
+
+    segment_id: int
+    start: int  # speech_buffer 内の開始オフセット（バイト）
+    end: int  # speech_buffer 内の終了オフセット（バイト）
+    generation: int  # 発話ごとの世代番号（古い結果の破棄用）
+
+
+class _InterimState:
+    """クライアント毎の途中結果の状態"""
+
+    def __init__(self):
+        self.generation = 0
+        self.segment_id: Optional[int] = None
+        self.in_flight = False
+        self.last_request_end = 0  # 最後に要求したバッファ長
+        # 確定済みプレフィックス（再アップロードしない部分）
+        self.committed_bytes = 0
+        self.committed_text = ""
+        # 直近の結果（committed_bytes から last_result_end までの文字起こし）
+        self.last_result_end = 0
+        self.last_result_text = ""
+        self.uploaded_seconds = 0.0  # セッション全体での送信音声秒数
+        self.budget_exhausted = False
+
+
+class InterimTranscriber:
+    """
+    発話中の speech_buffer を定期的に文字起こしして途中結果（is_final=False）を作るクラス
+
+    - 前回の要求からバッファが interval_seconds 以上伸びたときだけ要求を作る
+    - 未確定部分が window_seconds を超えたら、直近の結果を確定プレフィックスとして固定し、
+      以降はそれより後ろの音声だけを送信する（安定したプレフィックスは再送しない）
+    - セッション毎の送信音声秒数が session_budget_seconds を超えたら途中結果を止める
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = 1.0,
+        min_audio_seconds: float = 1.0,
+        window_seconds: float = 8.0,
+        session_budget_seconds: float = 300.0,
+        sample_rate: int = 16000,
+        sample_width: int = 2,
+    ):
+        self.bytes_per_second = sample_rate * sample_width
+        self.interval_bytes = int(interval_seconds * self.bytes_per_second)
+        self.min_audio_bytes = int(min_audio_seconds * self.bytes_per_second)
+        self.window_bytes = int(window_seconds * self.bytes_per_second)
+        self.session_budget_seconds = session_budget_seconds
+        self.states: Dict[str, _InterimState] = {}
+
+    def _get_state(self, client_id: str) -> _InterimState:
+        if client_id not in self.states:
+            self.states[client_id] = _InterimState()
+        return self.states[client_id]
+
+    def plan(
+        self, client_id: str, segment_id: int, buffer_length: int
+    ) -> Optional[InterimRequest]:
+        """
+        途中結果を要求すべきか判定し、要求内容を返す
+
+        Returns:
+            InterimRequest: 送信すべき区間、または None
+        """
+        state = self._get_state(client_id)
+
+        if state.segment_id != segment_id:
+            self._start_segment(state, segment_id)
+
+        if state.in_flight or state.budget_exhausted:
+            return None
+        if buffer_length < self.min_audio_bytes:
+            return None
+        if buffer_length - state.last_request_end < self.interval_bytes:
+            return None
+
+        # 未確定部分がウィンドウを超えたら、直近の結果をプレフィックスとして確定
+        if (
+            buffer_length - state.committed_bytes > self.window_bytes
+            and state.last_result_end > state.committed_bytes
+        ):
+            state.committed_text += state.last_result_text
+            state.committed_bytes = state.last_result_end
+            state.last_result_text = ""
+            logger.info(
+                f"[Interim] client={client_id} segment={segment_id} committed prefix "
+                f"up to {state.committed_bytes / self.bytes_per_second:.2f}s"
+            )
+
+        upload_seconds = (buffer_length - state.committed_bytes) / self.bytes_per_second
+        if state.uploaded_seconds + upload_seconds > self.session_budget_seconds:
+            state.budget_exhausted = True
+            logger.warning(
+                f"[Interim] client={client_id} session budget exhausted "
+                f"({state.uploaded_seconds:.1f}s / {self.session_budget_seconds}s)"
+            )
+            return None
+
+        state.in_flight = True
+        state.last_request_end = buffer_length
+        state.uploaded_seconds += upload_seconds
+        return InterimRequest(
+            segment_id=segment_id,
+            start=state.committed_bytes,
+            end=buffer_length,
+            generation=state.generation,
+        )
+
+    def on_result(
+        self, client_id: str, request: InterimRequest, text: str
+    ) -> Optional[str]:
+        """
+        途中結果を受け取り、クライアントに送るべき全文を返す
+        既に発話が終了している（最終結果に置き換わった）場合は None
+        """
+        state = self.states.get(client_id)
+        if state is None or state.generation != request.generation:
+            return None
+
+        state.in_flight = False
+        if request.start != state.committed_bytes:
+            # 要求後にプレフィックスが確定した場合は結果を使わない
+            return None
+
+        state.last_result_end = request.end
+        state.last_result_text = text
+        return state.committed_text + text
+
+    def on_error(self, client_id: str, request: InterimRequest):
+        """途中結果の文字起こしが失敗した場合の後処理"""
+        state = self.states.get(client_id)
+        if state is not None and state.generation == request.generation:
+            state.in_flight = False
+
+    def finish_segment(self, client_id: str):
+        """発話終了時に呼び出し、処理中の途中結果を無効化する"""
+        state = self.states.get(client_id)
+        if state is not None:
+            self._start_segment(state, None)
+
+    def cleanup_client(self, client_id: str):
+        """クライアント用のリソースをクリーンアップ"""
+        if client_id in self.states:
+            del self.states[client_id]
+
+    def _start_segment(self, state: _InterimState, segment_id: Optional[int]):
+        state.generation += 1
+        state.segment_id = segment_id
+        state.in_flight = False
+        state.last_request_end = 0
+        state.committed_bytes = 0
+        state.committed_text = ""
+        state.last_result_end = 0
+        state.last_result_text = ""
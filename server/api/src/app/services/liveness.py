@@ -0,0 +1,145 @@
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+REASON_PONG_TIMEOUT = "pong_timeout"
+REASON_IDLE = "idle"
+
+
+@dataclass
+class SessionLiveness:
+    """セッション毎の最終受信時刻と応答待ちの ping"""
+
+    last_seen: float  # 何らかのメッセージを最後に受信した時刻
+    last_audio: float  # 音声を最後に受信した時刻
+    ping_nonce: int = 0
+    ping_sent_at: Optional[float] = None  # 応答待ちの ping の送信時刻
+
+
+@dataclass
+class LivenessStats:
+    """死活監視の統計"""
+
+    sweeps: int = 0
+    pings_sent: int = 0
+    pongs_received: int = 0
+    reaped_pong_timeout: int = 0
+    reaped_idle: int = 0
+    reclaimed_bytes: int = 0  # 回収したセッションが保持していたバッファの合計
+    last_sweep_seconds: float = 0.0
+    last_sweep_sessions: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "sweeps": self.sweeps,
+            "pings_sent": self.pings_sent,
+            "pongs_received": self.pongs_received,
+            "reaped_pong_timeout": self.reaped_pong_timeout,
+            "reaped_idle": self.reaped_idle,
+            "reclaimed_bytes": self.reclaimed_bytes,
+            "last_sweep_ms": round(self.last_sweep_seconds * 1000, 3),
+            "last_sweep_sessions": self.last_sweep_sessions,
+        }
+
+
+@dataclass
+class SweepResult:
+    """1回の巡回で決まった処理"""
+
+    to_ping: list[tuple[str, int]] = field(default_factory=list)  # (セッション, nonce)
+    dead: list[tuple[str, str]] = field(default_factory=list)  # (セッション, 理由)
+
+
+class LivenessMonitor:
+    """
+    接続中セッションの死活監視
+
+    - 一定時間受信がなければ ping を送り、pong_timeout 以内に何も受信しなければ切断対象にする
+      （音声などの受信も生存の証拠として扱うので、送信中のクライアントには ping を送らない）
+    - 音声が idle_timeout 以上届かないセッションも切断対象にする
+    - sweep は接続中のセッションだけを1回ずつ見る（O(接続数)）
+
+    各タイムアウトは 0 で無効。
+    """
+
+    def __init__(
+        self,
+        ping_interval: float = 15.0,
+        pong_timeout: float = 10.0,
+        idle_timeout: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ping_interval = ping_interval
+        self.pong_timeout = pong_timeout
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.sessions: Dict[str, SessionLiveness] = {}
+        self.stats = LivenessStats()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ping_interval > 0 or self.idle_timeout > 0
+
+    def register(self, session_id: str):
+        now = self.clock()
+        self.sessions[session_id] = SessionLiveness(last_seen=now, last_audio=now)
+
+    def unregister(self, session_id: str):
+        self.sessions.pop(session_id, None)
+
+    def touch(self, session_id: str, audio: bool = False):
+        """メッセージを受信した（応答待ちの ping も解消する）"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        session.last_seen = self.clock()
+        session.ping_sent_at = None
+        if audio:
+            session.last_audio = session.last_seen
+
+    def on_pong(self, session_id: str, nonce: Optional[int] = None):
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        if nonce is None or nonce == session.ping_nonce:
+            self.stats.pongs_received += 1
+        self.touch(session_id)
+
+    def sweep(self) -> SweepResult:
+        """ping を送るセッションと切断するセッションを決める"""
+        started = time.perf_counter()
+        now = self.clock()
+        result = SweepResult()
+        for session_id, session in self.sessions.items():
+            if self.idle_timeout > 0 and now - session.last_audio >= self.idle_timeout:
+                result.dead.append((session_id, REASON_IDLE))
+            elif session.ping_sent_at is not None:
+                if (
+                    self.pong_timeout > 0
+                    and now - session.ping_sent_at >= self.pong_timeout
+                ):
+                    result.dead.append((session_id, REASON_PONG_TIMEOUT))
+            elif (
+                self.ping_interval > 0 and now - session.last_seen >= self.ping_interval
+            ):
+                session.ping_nonce += 1
+                session.ping_sent_at = now
+                result.to_ping.append((session_id, session.ping_nonce))
+
+        for session_id, reason in result.dead:
+            del self.sessions[session_id]
+            if reason == REASON_IDLE:
+                self.stats.reaped_idle += 1
+            else:
+                self.stats.reaped_pong_timeout += 1
+        self.stats.pings_sent += len(result.to_ping)
+        self.stats.sweeps += 1
+        self.stats.last_sweep_sessions = len(self.sessions) + len(result.dead)
+        self.stats.last_sweep_seconds = time.perf_counter() - started
+        return result
+
+    def record_reclaimed(self, nbytes: int):
+        self.stats.reclaimed_bytes += nbytes
+
+    def get_stats(self) -> dict:
+        return {"sessions": len(self.sessions), **self.stats.to_dict()}
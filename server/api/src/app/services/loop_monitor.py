@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Optional
+
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+# ループがこの時間（秒）以上止まったら実行中のスタックを記録する（0 で無効）
+LOOP_BLOCK_THRESHOLD_SECONDS = float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.1"))
+LOOP_BLOCK_STACK_DEPTH = int(os.getenv("LOOP_BLOCK_STACK_DEPTH", "20"))
+
+
+@dataclass
+class BlockingEvent:
+    """イベントループが止まった1回分の記録"""
+
+    started_at: float  # time.time()
+    duration: float  # 秒（ループ再開時に確定）
+    stack: list[str] = field(default_factory=list)  # 止まっていたコード（内側が末尾）
+    finished: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 1),
+            "finished": self.finished,
+            "stack": self.stack,
+        }
+
+
+class LoopLagMonitor:
+    """
+    イベントループの遅延（スケジュールした時刻からの遅れ）を定期的に測るモニター
+
+    - interval 秒毎に sleep し、実際に再開するまでの遅れを記録する
+      （直近 window 件の最大値を受け付け制御に、直近 history 件を分位点に使う）
+    - block_threshold > 0 の場合は監視スレッドを動かし、ループが閾値以上止まったら
+      その時点のループのスレッドのスタックを取得する（止めているコードが分かる）
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        window: int = 20,
+        history: int = 600,
+        block_threshold: float = 0.0,
+        stack_depth: int = 20,
+        max_events: int = 20,
+    ):
+        self.interval = interval
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.history: Deque[float] = deque(maxlen=history)
+        self.block_threshold = block_threshold
+        self.stack_depth = stack_depth
+        self.events: Deque[BlockingEvent] = deque(maxlen=max_events)
+        self.blocked_count = 0
+        self._task: Optional[asyncio.Task] = None
+        self._beat = time.perf_counter()  # 直近の sleep 開始時刻
+        self._loop_thread_id: Optional[int] = None
+        self._current: Optional[BlockingEvent] = None
+        self._lock = threading.Lock()
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def lag(self) -> float:
+        """直近の最大遅延（秒）"""
+        return max(self.samples, default=0.0)
+
+    def percentile(self, q: float) -> float:
+        """直近 history 件の遅延の分位点（秒）"""
+        if not self.history:
+            return 0.0
+        ordered = sorted(self.history)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            events = [event.to_dict() for event in self.events]
+        return {
+            "lag_ms": round(self.lag * 1000, 2),
+            "p50_ms": round(self.percentile(0.5) * 1000, 2),
+            "p95_ms": round(self.percentile(0.95) * 1000, 2),
+            "p99_ms": round(self.percentile(0.99) * 1000, 2),
+            "max_ms": round(max(self.history, default=0.0) * 1000, 2),
+            "block_threshold_ms": self.block_threshold * 1000,
+            "blocked_count": self.blocked_count,
+            "recent_blocks": events,
+        }
+
+    def ensure_started(self):
+        """イベントループ内で呼ばれた場合に測定タスクを起動"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if (
+            self._task is not None
+            and not self._task.done()
+            and self._task.get_loop() is loop
+        ):
+            return
+        self._current = None
+        self._task = loop.create_task(self._run())
+        if self.block_threshold > 0 and self._watchdog is None:
+            self._stopping.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self):
+        self._stopping.set()
+        if self._watchdog is not None:
+            self._watchdog.join(1.0)
+            self._watchdog = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        self._loop_thread_id = threading.get_ident()
+        while True:
+            start = time.perf_counter()
+            self._beat = start
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start - self.interval)
+            self.samples.append(lag)
+            self.history.append(lag)
+            metrics.LOOP_LAG_SECONDS.observe(lag)
+            if self._current is not None:
+                with self._lock:
+                    self._current.duration = lag
+                    self._current.finished = True
+                    self._current = None
+                logger.warning(f"[LoopWatchdog] Event loop resumed after {lag:.3f}s")
+
+    def _watch(self):
+        """監視スレッド: ループの再開が閾値以上遅れたらスタックを取得"""
+        period = max(0.005, self.block_threshold / 2)
+        while not self._stopping.wait(period):
+            stalled = time.perf_counter() - self._beat - self.interval
+            if stalled < self.block_threshold or self._current is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = (
+                [line.rstrip() for line in traceback.format_stack(frame)]
+                if frame is not None
+                else []
+            )[-self.stack_depth :]
+            del frame
+            event = BlockingEvent(
+                started_at=time.time() - stalled, duration=stalled, stack=stack
+            )
+            with self._lock:
+                self._current = event
+                self.events.append(event)
+                self.blocked_count += 1
+            metrics.LOOP_BLOCKED_TOTAL.inc()
+            logger.warning(
+                f"[LoopWatchdog] Event loop blocked for {stalled:.3f}s, "
+                f"running:\n" + "\n".join(stack)
+            )
+
+
+_monitor: Optional[LoopLagMonitor] = None
+
+
+def get_loop_monitor() -> LoopLagMonitor:
+    """プロセスで1つのモニター（起動時から WebSocket 以外の処理も含めて測る）"""
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopLagMonitor(
+            block_threshold=LOOP_BLOCK_THRESHOLD_SECONDS,
+            stack_depth=LOOP_BLOCK_STACK_DEPTH,
+        )
+    return _monitor
@@ -0,0 +1,81 @@
+import logging
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Deque, Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MergeStats:
+    """結合待機の判断と結果の集計"""
+
+    holds: int = 0  # 保留したセグメント数
+    merged: int = 0  # 次のセグメントと結合できた数
+    timed_out: int = 0  # 待機時間切れで単独処理した数
+    flushed: int = 0  # 結合せずに即座に処理した数（間隔超過・切断時）
+    total_wait_chosen: float = 0.0  # 判断した待機時間の合計（秒）
+    total_hold_seconds: float = 0.0  # 実際に保留していた時間の合計（秒）
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class AdaptiveMergePolicy:
+    """
+    セッション毎の発話間隔の分布をオンラインで学習し、結合待機時間を決めるポリシー
+
+    短いセグメントの後に次のセグメントが来るまでの間隔を直近 history_size 件保持し、
+    - max_timeout（遅延の上限）以内に次が来る割合が min_merge_rate 未満なら、
+      待っても結合される見込みが低いので min_timeout だけ待つ
+    - それ以外は、上限以内に来た間隔の target_probability 分位点まで待つ
+    学習が進むまで（min_samples 件未満）は default_timeout を使う
+    """
+
+    def __init__(
+        self,
+        default_timeout: float = 2.0,
+        min_timeout: float = 0.3,
+        max_timeout: float = 2.0,
+        target_probability: float = 0.9,
+        min_merge_rate: float = 0.2,
+        min_samples: int = 5,
+        history_size: int = 32,
+    ):
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.target_probability = target_probability
+        self.min_merge_rate = min_merge_rate
+        self.min_samples = min_samples
+        self.history_size = history_size
+        self.gaps: Dict[str, Deque[float]] = {}
+
+    def observe_gap(self, client_id: str, gap: float):
+        """短いセグメントから次のセグメントまでの間隔を記録"""
+        if client_id not in self.gaps:
+            self.gaps[client_id] = deque(maxlen=self.history_size)
+        # 上限を大きく超える間隔は「結合されなかった」ことだけ分かればよい
+        self.gaps[client_id].append(min(gap, self.max_timeout * 2))
+
+    def choose_timeout(self, client_id: str) -> float:
+        """クライアントの保留セグメントを待機する時間を決める"""
+        history = self.gaps.get(client_id)
+        if history is None or len(history) < self.min_samples:
+            return self.default_timeout
+
+        gaps = np.fromiter(history, dtype=np.float64, count=len(history))
+        mergeable = gaps[gaps < self.max_timeout]
+        merge_rate = len(mergeable) / len(gaps)
+        if merge_rate < self.min_merge_rate:
+            return self.min_timeout
+
+        wait = float(np.quantile(mergeable, self.target_probability))
+        return min(self.max_timeout, max(self.min_timeout, wait))
+
+    def cleanup_client(self, client_id: str):
+        """クライアント用のリソースをクリーンアップ"""
+        if client_id in self.gaps:
+            del self.gaps[client_id]
@@ -0,0 +1,287 @@
+import math
+from bisect import bisect_left
+from typing import Dict, Sequence
+
+# 処理段階の遅延用バケット（秒）。VAD の数ms から API の数十秒までを対数的に区切る
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# イベントループ遅延用バケット（秒）。正常時の 1ms 未満とブロック時の数百ms を区別する
+LOOP_LAG_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+METRIC_PREFIX = "vad_transcriber_"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """単調増加するカウンター（ラベル値の組み合わせ毎に集計）"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self.values.get(tuple(labels.get(n, "") for n in self.labelnames), 0)
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        for key, value in sorted(self.values.items()):
+            labels = _format_labels(dict(zip(self.labelnames, key)))
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        if not self.values and not self.labelnames:
+            lines.append(f"{self.name} 0")
+        return lines
+
+
+class Gauge:
+    """現在値（出力時に値を設定する。ラベルがあればラベル値の組み合わせ毎）"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[tuple, float] = {}
+
+    @property
+    def current(self) -> float:
+        return self.values.get((), 0.0)
+
+    def set(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        self.values[key] = value
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+        ]
+        if not self.labelnames:
+            lines.append(f"{self.name} {_format_value(self.current)}")
+            return lines
+        for key, value in sorted(self.values.items()):
+            labels = _format_labels(dict(zip(self.labelnames, key)))
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    固定バケットのヒストグラム
+
+    observe はバケットの二分探索と加算だけで、サンプルは保持しない。
+    イベントループのスレッドからのみ更新する前提でロックは取らない。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)  # 最後は +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        cumulative = 0
+        for bound, bucket_count in zip(self.bounds, self.counts):
+            cumulative += bucket_count
+            lines.append(
+                f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}'
+            )
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """メトリクスを登録順に保持し、Prometheus のテキスト形式で出力する"""
+
+    def __init__(self, prefix: str = METRIC_PREFIX):
+        self.prefix = prefix
+        self.metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(self.prefix + name, documentation, labelnames))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self._register(Gauge(self.prefix + name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(self.prefix + name, documentation, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# 処理段階毎の遅延
+VAD_DECISION_SECONDS = REGISTRY.histogram(
+    "vad_decision_seconds", "Audio packet receive to VAD decision for all its frames"
+)
+SPEECH_END_TO_CLOSE_SECONDS = REGISTRY.histogram(
+    "speech_end_to_segment_close_seconds",
+    "Last speech frame received to segment close (silence tolerance included)",
+)
+MERGE_HOLD_SECONDS = REGISTRY.histogram(
+    "merge_hold_seconds", "Time a segment was held by the segment merger"
+)
+WAV_ENCODE_SECONDS = REGISTRY.histogram(
+    "wav_encode_seconds", "PCM to WAV encoding time per segment"
+)
+TRANSCRIPTION_QUEUE_SECONDS = REGISTRY.histogram(
+    "transcription_queue_seconds",
+    "Segment ready to transcription request start (task and thread pool wait)",
+)
+TRANSCRIPTION_API_SECONDS = REGISTRY.histogram(
+    "transcription_api_seconds", "Transcription API round-trip time"
+)
+RESULT_SEND_SECONDS = REGISTRY.histogram(
+    "result_send_seconds", "Time to send a transcription result to the client"
+)
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "event_loop_lag_seconds",
+    "Event loop lag measured every 100ms",
+    buckets=LOOP_LAG_BUCKETS,
+)
+
+# 件数
+FRAMES_TOTAL = REGISTRY.counter("frames_total", "VAD frames processed")
+SEGMENTS_TOTAL = REGISTRY.counter(
+    "segments_total", "Speech segments closed", labelnames=("reason",)
+)
+SEGMENTS_SKIPPED_TOTAL = REGISTRY.counter(
+    "segments_skipped_total", "Segments not transcribed", labelnames=("reason",)
+)
+TRANSCRIPTIONS_TOTAL = REGISTRY.counter(
+    "transcriptions_total", "Transcription results sent", labelnames=("kind",)
+)
+ERRORS_TOTAL = REGISTRY.counter(
+    "errors_total", "Errors by processing stage", labelnames=("stage",)
+)
+LOOP_BLOCKED_TOTAL = REGISTRY.counter(
+    "event_loop_blocked_total", "Event loop stalls longer than the block threshold"
+)
+RECLAIMED_BYTES_TOTAL = REGISTRY.counter(
+    "liveness_reclaimed_bytes_total", "Buffer bytes reclaimed from reaped sessions"
+)
+# 結合待機の判断（holds）と結果（merged / timed_out / flushed）
+SEGMENT_MERGE_SEGMENTS_TOTAL = REGISTRY.counter(
+    "segment_merge_segments_total",
+    "Segments handled by the segment merger, by decision or outcome",
+    labelnames=("outcome",),
+)
+SEGMENT_MERGE_WAIT_CHOSEN_SECONDS_TOTAL = REGISTRY.counter(
+    "segment_merge_wait_chosen_seconds_total",
+    "Sum of merge wait times chosen by the merge policy",
+)
+SEGMENT_MERGE_HOLD_SECONDS_TOTAL = REGISTRY.counter(
+    "segment_merge_hold_seconds_total",
+    "Sum of time segments were actually held for merging",
+)
+
+# 現在値（/metrics の出力時に ConnectionManager から設定する）
+ACTIVE_SESSIONS = REGISTRY.gauge("active_sessions", "Attached WebSocket sessions")
+DETACHED_SESSIONS = REGISTRY.gauge(
+    "detached_sessions", "Sessions waiting for the client to resume"
+)
+TRANSCRIPTIONS_IN_FLIGHT = REGISTRY.gauge(
+    "transcriptions_in_flight", "Running final and interim transcription tasks"
+)
+LOOP_LAG_RECENT_MAX_SECONDS = REGISTRY.gauge(
+    "event_loop_lag_recent_max_seconds", "Maximum event loop lag over the last 2s"
+)
+LOOP_LAG_QUANTILE_SECONDS = REGISTRY.gauge(
+    "event_loop_lag_quantile_seconds",
+    "Event loop lag quantiles over the last minute",
+    labelnames=("quantile",),
+)
+VAD_QUEUE_FRAMES = REGISTRY.gauge(
+    "vad_queue_frames", "Frames waiting for the VAD inference processes"
+)
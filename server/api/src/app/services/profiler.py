@@ -0,0 +1,183 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict
+
+
+class ProfilerBusyError(RuntimeError):
+    """別のプロファイルが実行中"""
+
+
+@dataclass
+class ProfileResult:
+    """サンプリングプロファイルの結果（collapsed stacks 形式で出力できる）"""
+
+    duration: float
+    interval: float
+    samples: int = 0  # サンプリングした回数
+    stacks: Counter = field(default_factory=Counter)  # "スレッド;関数;..." -> 回数
+    sampling_seconds: float = 0.0  # スタック取得に使った時間（オーバーヘッドの目安）
+
+    def collapsed(self) -> str:
+        """flamegraph.pl / speedscope がそのまま読める1行1スタックの形式"""
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict:
+        return {
+            "duration_seconds": round(self.duration, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "unique_stacks": len(self.stacks),
+            "overhead_ratio": round(self.sampling_seconds / self.duration, 4)
+            if self.duration > 0
+            else 0.0,
+        }
+
+
+@dataclass
+class MemoryGrowth:
+    """tracemalloc の2つのスナップショット間で増えたメモリ"""
+
+    duration: float
+    traced_bytes: int  # 終了時点で追跡中の合計
+    top: list[dict] = field(default_factory=list)  # 増加量の多い確保元
+    sessions: list[dict] = field(default_factory=list)  # セッション毎のバッファ増加
+
+    def add_session_growth(self, before: Dict[str, int], after: Dict[str, int]):
+        """{セッション: 保持バイト数} の前後から、増加量の多い順に記録する"""
+        for session_id in after.keys() | before.keys():
+            end_bytes = after.get(session_id, 0)
+            self.sessions.append(
+                {
+                    "session_id": session_id,
+                    "bytes": end_bytes,
+                    "growth_bytes": end_bytes - before.get(session_id, 0),
+                }
+            )
+        self.sessions.sort(key=lambda s: s["growth_bytes"], reverse=True)
+
+    def to_dict(self) -> dict:
+        return {
+            "duration_seconds": round(self.duration, 3),
+            "traced_bytes": self.traced_bytes,
+            "top": self.top,
+            "sessions": self.sessions,
+        }
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class WorkerProfiler:
+    """
+    稼働中のワーカーを外から計測するプロファイラ
+
+    - sample: 全スレッドのスタックを一定間隔で採取する（sys._current_frames() で
+      イベントループと executor のスレッドをまとめて見る。対象コードへの計装は不要）
+    - memory_growth: tracemalloc のスナップショットを2回取り、増えた確保元を集計する
+
+    どちらも呼んだスレッドで duration 秒ブロックするので、イベントループからは
+    asyncio.to_thread 等で呼ぶ。同時に実行できる計測は1つ。
+    """
+
+    def __init__(self, max_depth: int = 64):
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+
+    def sample(self, duration: float, interval: float = 0.005) -> ProfileResult:
+        with self._exclusive():
+            return self._sample(duration, interval)
+
+    def memory_growth(
+        self, duration: float, top: int = 25, frames: int = 10
+    ) -> MemoryGrowth:
+        """
+        duration 秒の間に増えたメモリを確保元（トレースバック）毎に集計する
+
+        tracemalloc が無効なら計測の間だけ有効にする（有効化前の確保は追跡されないので、
+        計測期間中の増加だけを見る）
+        """
+        with self._exclusive():
+            return self._memory_growth(duration, top, frames)
+
+    @contextmanager
+    def _exclusive(self):
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            yield
+        finally:
+            self._lock.release()
+
+    def _sample(self, duration: float, interval: float) -> ProfileResult:
+        own_thread = threading.get_ident()
+        result = ProfileResult(duration=0.0, interval=interval)
+        started = time.perf_counter()
+        deadline = started + duration
+        while True:
+            sample_started = time.perf_counter()
+            if sample_started >= deadline:
+                break
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                labels = []
+                while frame is not None and len(labels) < self.max_depth:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                thread_name = names.get(thread_id, str(thread_id))
+                stack = ";".join([thread_name, *reversed(labels)])
+                result.stacks[stack] += 1
+            result.samples += 1
+            elapsed = time.perf_counter() - sample_started
+            result.sampling_seconds += elapsed
+            time.sleep(max(0.0, interval - elapsed))
+        result.duration = time.perf_counter() - started
+        return result
+
+    def _memory_growth(self, duration: float, top: int, frames: int) -> MemoryGrowth:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(frames)
+        try:
+            before = tracemalloc.take_snapshot()
+            started = time.perf_counter()
+            time.sleep(duration)
+            elapsed = time.perf_counter() - started
+            after = tracemalloc.take_snapshot()
+            traced_bytes, _ = tracemalloc.get_traced_memory()
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+
+        # 計測自体の確保（スナップショット等）は除く
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        stats = after.filter_traces(ignore).compare_to(
+            before.filter_traces(ignore), "traceback"
+        )
+        growth = MemoryGrowth(duration=elapsed, traced_bytes=traced_bytes)
+        for stat in stats:
+            if stat.size_diff <= 0:
+                continue
+            growth.top.append(
+                {
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size": stat.size,
+                    "traceback": [
+                        f"{frame.filename}:{frame.lineno}" for frame in stat.traceback
+                    ],
+                }
+            )
+            if len(growth.top) >= top:
+                break
+        return growth
@@ -0,0 +1,278 @@
+import logging
+from typing import Dict, Optional
+
+from app.services.merge_policy import AdaptiveMergePolicy, MergeStats
+from app.services.metrics import (
+    MERGE_HOLD_SECONDS,
+    SEGMENT_MERGE_HOLD_SECONDS_TOTAL,
+    SEGMENT_MERGE_SEGMENTS_TOTAL,
+    SEGMENT_MERGE_WAIT_CHOSEN_SECONDS_TOTAL,
+)
+from app.services.timer_scheduler import TimerHandle, TimerScheduler
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # 16bit
+
+
+class PendingSegment:
+    """保留中のセグメントデータ"""
+
+    def __init__(self, segment_id: int, audio_data: bytes, timestamp: float):
+        self.segment_id = segment_id
+        self.audio_data = audio_data
+        self.timestamp = timestamp
+        self.duration = len(audio_data) // SAMPLE_WIDTH / SAMPLE_RATE
+        self.timeout: Optional[float] = None  # このセグメントの結合待機時間
+
+
+class SegmentMerger:
+    """
+    遅延バッファリング方式でセグメントを結合するクラス
+    短いセグメントを一定時間待機して、次のセグメントと結合判定を行う
+    待機のタイムアウトは共有の TimerScheduler で管理する（クライアント毎にタスクを作らない）
+    policy を指定した場合は、クライアント毎に学習した待機時間を使う
+    """
+
+    def __init__(
+        self,
+        merge_timeout: float = 2.0,
+        min_merge_duration: float = 0.8,
+        scheduler: Optional[TimerScheduler] = None,
+        policy: Optional[AdaptiveMergePolicy] = None,
+    ):
+        self.merge_timeout = merge_timeout  # 結合待機時間（秒）
+        self.min_merge_duration = min_merge_duration  # この時間未満は結合対象
+        self.scheduler = scheduler or TimerScheduler()
+        self.pending_segments: Dict[
+            str, PendingSegment
+        ] = {}  # クライアント毎の保留セグメント
+        self.pending_timers: Dict[str, TimerHandle] = {}  # 遅延処理タイマー
+        self.policy = policy
+        self.last_hold_time: Dict[str, float] = {}  # 最後に保留した時刻
+        self.stats = MergeStats()
+
+    @property
+    def pending_timer_count(self) -> int:
+        """発火待ちの結合タイムアウト数（共有の scheduler の他のタイマーは数えない）"""
+        return len(self.pending_timers)
+
+    def get_stats(self) -> dict:
+        """結合待機の判断と結果の集計を返す"""
+        stats = self.stats.to_dict()
+        stats["pending_segments"] = len(self.pending_segments)
+        stats["pending_timers"] = self.pending_timer_count
+        stats["merge_rate"] = (
+            self.stats.merged / self.stats.holds if self.stats.holds else 0.0
+        )
+        stats["mean_wait_chosen"] = (
+            self.stats.total_wait_chosen / self.stats.holds if self.stats.holds else 0.0
+        )
+        return stats
+
+    async def process_segment(
+        self,
+        segment_id: int,
+        audio_data: bytes,
+        client_id: str,
+        transcription_callback,
+        error_callback,
+    ) -> bool:
+        """
+        セグメントを処理し、結合するかすぐに文字起こしするかを判定
+
+        Returns:
+            bool: True=即座に処理, False=結合待機中
+        """
+        current_time = self.scheduler.clock()
+        duration = len(audio_data) // SAMPLE_WIDTH / SAMPLE_RATE
+
+        # 短いセグメントの後の発話間隔を学習
+        last_hold_time = self.last_hold_time.pop(client_id, None)
+        if self.policy and last_hold_time is not None:
+            self.policy.observe_gap(client_id, current_time - last_hold_time)
+
+        # 前の保留セグメントがあるかチェック
+        if client_id in self.pending_segments:
+            prev_segment = self.pending_segments[client_id]
+            time_gap = current_time - prev_segment.timestamp
+
+            # 前のセグメントが短く、時間間隔が短い場合は結合
+            if (
+                prev_segment.duration < self.min_merge_duration
+                and time_gap < prev_segment.timeout
+            ):
+                logger.info(
+                    f"[SegmentMerger] Merging segment {prev_segment.segment_id} + {segment_id} "
+                    f"(gap: {time_gap:.2f}s, prev_duration: {prev_segment.duration:.2f}s)"
+                )
+
+                # 前のタイマーを取り消し
+                self._cancel_timer(client_id)
+                self.stats.merged += 1
+                SEGMENT_MERGE_SEGMENTS_TOTAL.inc(outcome="merged")
+                self._record_hold(time_gap)
+
+                # セグメントを結合
+                merged_audio = prev_segment.audio_data + audio_data
+                merged_segment = PendingSegment(
+                    prev_segment.segment_id, merged_audio, prev_segment.timestamp
+                )
+
+                # 結合後のセグメントを処理
+                del self.pending_segments[client_id]
+                return await self._process_merged_segment(
+                    merged_segment, client_id, transcription_callback, error_callback
+                )
+            else:
+                # 前のセグメントを即座に処理（結合しない）
+                await self._flush_pending_segment(
+                    client_id, transcription_callback, error_callback
+                )
+
+        # 現在のセグメントが短い場合は保留
+        if duration < self.min_merge_duration:
+            logger.info(
+                f"[SegmentMerger] Holding segment {segment_id} for potential merge "
+                f"(duration: {duration:.2f}s < {self.min_merge_duration}s)"
+            )
+
+            self.pending_segments[client_id] = PendingSegment(
+                segment_id, audio_data, current_time
+            )
+
+            # 遅延処理タイマーを設定
+            self._schedule_timeout(client_id, transcription_callback, error_callback)
+            return False
+        else:
+            # 長いセグメントは即座に処理
+            logger.info(
+                f"[SegmentMerger] Processing segment {segment_id} immediately (duration: {duration:.2f}s)"
+            )
+            await transcription_callback(audio_data, segment_id)
+            return True
+
+    async def _process_merged_segment(
+        self,
+        merged_segment: PendingSegment,
+        client_id: str,
+        transcription_callback,
+        error_callback,
+    ) -> bool:
+        """結合されたセグメントを処理"""
+        duration = merged_segment.duration
+
+        # 結合後も短い場合は再度保留
+        if duration < self.min_merge_duration:
+            logger.info(
+                f"[SegmentMerger] Merged segment still short, holding again "
+                f"(duration: {duration:.2f}s)"
+            )
+            self.pending_segments[client_id] = merged_segment
+            self._schedule_timeout(client_id, transcription_callback, error_callback)
+            return False
+        else:
+            # 十分な長さになったので処理
+            logger.info(
+                f"[SegmentMerger] Processing merged segment {merged_segment.segment_id} "
+                f"(final duration: {duration:.2f}s)"
+            )
+            await transcription_callback(
+                merged_segment.audio_data, merged_segment.segment_id
+            )
+            return True
+
+    def _schedule_timeout(self, client_id: str, transcription_callback, error_callback):
+        """保留セグメントのタイムアウトを設定（既存のタイマーは置き換える）"""
+        timeout = (
+            self.policy.choose_timeout(client_id) if self.policy else self.merge_timeout
+        )
+        segment = self.pending_segments[client_id]
+        segment.timeout = timeout
+        self.last_hold_time[client_id] = self.scheduler.clock()
+        self.stats.holds += 1
+        self.stats.total_wait_chosen += timeout
+        SEGMENT_MERGE_SEGMENTS_TOTAL.inc(outcome="holds")
+        SEGMENT_MERGE_WAIT_CHOSEN_SECONDS_TOTAL.inc(timeout)
+        logger.info(
+            f"[SegmentMerger] Decision client={client_id} segment={segment.segment_id} "
+            f"wait={timeout:.2f}s"
+        )
+
+        self._cancel_timer(client_id)
+        self.pending_timers[client_id] = self.scheduler.call_later(
+            timeout,
+            self._on_timeout,
+            client_id,
+            transcription_callback,
+            error_callback,
+        )
+
+    def _cancel_timer(self, client_id: str):
+        handle = self.pending_timers.pop(client_id, None)
+        if handle is not None:
+            handle.cancel()
+
+    def _record_hold(self, seconds: float):
+        self.stats.total_hold_seconds += seconds
+        SEGMENT_MERGE_HOLD_SECONDS_TOTAL.inc(seconds)
+        MERGE_HOLD_SECONDS.observe(seconds)
+
+    async def _on_timeout(self, client_id: str, transcription_callback, error_callback):
+        """待機時間経過後にセグメントを処理"""
+        self.pending_timers.pop(client_id, None)
+        try:
+            if client_id in self.pending_segments:
+                segment = self.pending_segments[client_id]
+                logger.info(
+                    f"[SegmentMerger] Timeout reached, processing pending segment {segment.segment_id} "
+                    f"(duration: {segment.duration:.2f}s)"
+                )
+                del self.pending_segments[client_id]
+                self.stats.timed_out += 1
+                SEGMENT_MERGE_SEGMENTS_TOTAL.inc(outcome="timed_out")
+                self._record_hold(self.scheduler.clock() - segment.timestamp)
+                await transcription_callback(segment.audio_data, segment.segment_id)
+
+        except Exception as e:
+            logger.error(f"[SegmentMerger] Error in delayed processing: {e}")
+            await error_callback(e)
+
+    async def _flush_pending_segment(
+        self, client_id: str, transcription_callback, error_callback
+    ):
+        """保留中のセグメントを即座に処理"""
+        if client_id in self.pending_segments:
+            segment = self.pending_segments[client_id]
+            logger.info(
+                f"[SegmentMerger] Flushing pending segment {segment.segment_id}"
+            )
+
+            # タイマーを取り消し
+            self._cancel_timer(client_id)
+            self.stats.flushed += 1
+            SEGMENT_MERGE_SEGMENTS_TOTAL.inc(outcome="flushed")
+            self._record_hold(self.scheduler.clock() - segment.timestamp)
+
+            del self.pending_segments[client_id]
+            await transcription_callback(segment.audio_data, segment.segment_id)
+
+    async def flush_client(
+        self, client_id: str, transcription_callback, error_callback
+    ):
+        """クライアント切断時に保留中のセグメントを処理"""
+        if client_id in self.pending_segments:
+            await self._flush_pending_segment(
+                client_id, transcription_callback, error_callback
+            )
+
+    def cleanup_client(self, client_id: str):
+        """クライアント用のリソースをクリーンアップ"""
+        self._cancel_timer(client_id)
+        self.last_hold_time.pop(client_id, None)
+        if self.policy:
+            self.policy.cleanup_client(client_id)
+
+        if client_id in self.pending_segments:
+            del self.pending_segments[client_id]
@@ -0,0 +1,265 @@
+"""
+セッション単位の追記型音声コンテナ
+
+1セッションにつき2ファイルだけを使う:
+  <base>.pcm : 全セグメントの16bit PCMを連結したデータファイル
+  <base>.idx : ヘッダ + セグメント毎の固定長レコード（ID・オフセット・長さ・時刻）
+
+データを書いて fsync してからインデックスを追記するため、インデックスに載っている
+セグメントは常にデータファイル上に存在する。読み出しはデータファイルを mmap して行う。
+
+アーカイブ済みのセッション（audio_archiver）は <base>.pcm の代わりに
+<base>.flac / <base>.opus / <base>.pcmz を持つ。読み出し時に展開する。
+
+WAVへの書き出し:
+  python -m app.services.segment_store export audio_segments/<session> <out_dir>
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+import wave
+from dataclasses import dataclass
+from typing import Optional
+
+from app.services.audio_codecs import CODEC_SUFFIXES, decode_pcm
+
+DATA_SUFFIX = ".pcm"
+INDEX_SUFFIX = ".idx"
+
+INDEX_MAGIC = b"VADS"
+INDEX_VERSION = 1
+# magic, version, channels, sample_rate, sample_width, reserved
+INDEX_HEADER = struct.Struct("<4sHHIHH")
+# segment_id, offset, length, created_at
+INDEX_RECORD = struct.Struct("<IQId")
+
+
+@dataclass(frozen=True)
+class SegmentRecord:
+    """インデックスの1レコード"""
+
+    segment_id: int
+    offset: int
+    length: int
+    created_at: float
+
+
+def data_path(base_path: str) -> str:
+    return base_path + DATA_SUFFIX
+
+
+def index_path(base_path: str) -> str:
+    return base_path + INDEX_SUFFIX
+
+
+def archive_path(base_path: str, codec: str) -> str:
+    return base_path + CODEC_SUFFIXES[codec]
+
+
+def find_archive(base_path: str) -> Optional[tuple[str, str]]:
+    """アーカイブ済みデータファイルの (コーデック, パス) を返す"""
+    for codec in CODEC_SUFFIXES:
+        path = archive_path(base_path, codec)
+        if os.path.exists(path):
+            return codec, path
+    return None
+
+
+def session_files(base_path: str) -> list[str]:
+    """セッションを構成する既存のファイル一覧"""
+    candidates = [data_path(base_path), index_path(base_path)]
+    candidates += [archive_path(base_path, codec) for codec in CODEC_SUFFIXES]
+    return [path for path in candidates if os.path.exists(path)]
+
+
+def list_sessions(directory: str) -> list[str]:
+    """ディレクトリ内のセッション（拡張子なしのベースパス）を列挙"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, entry.name[: -len(INDEX_SUFFIX)])
+        for entry in os.scandir(directory)
+        if entry.name.endswith(INDEX_SUFFIX)
+    )
+
+
+class SessionAudioWriter:
+    """セッションのコンテナに追記するライター（書き込みスレッドから使う）"""
+
+    def __init__(
+        self,
+        base_path: str,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        sample_width: int = 2,
+    ):
+        self.base_path = base_path
+        directory = os.path.dirname(base_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._data = open(data_path(base_path), "ab")
+        self._index = open(index_path(base_path), "ab")
+        if self._index.tell() == 0:
+            self._index.write(
+                INDEX_HEADER.pack(
+                    INDEX_MAGIC, INDEX_VERSION, channels, sample_rate, sample_width, 0
+                )
+            )
+        self._offset = self._data.tell()
+        self._pending_records: list[SegmentRecord] = []
+
+    def append(self, segment_id: int, pcm_bytes: bytes) -> SegmentRecord:
+        """データを追記する（インデックスは sync() で書き込む）"""
+        record = SegmentRecord(segment_id, self._offset, len(pcm_bytes), time.time())
+        self._data.write(pcm_bytes)
+        self._offset += len(pcm_bytes)
+        self._pending_records.append(record)
+        return record
+
+    def sync(self):
+        """データを fsync してからインデックスを追記して fsync する"""
+        if not self._pending_records:
+            return
+        self._data.flush()
+        os.fsync(self._data.fileno())
+        self._index.write(
+            b"".join(
+                INDEX_RECORD.pack(r.segment_id, r.offset, r.length, r.created_at)
+                for r in self._pending_records
+            )
+        )
+        self._index.flush()
+        os.fsync(self._index.fileno())
+        self._pending_records.clear()
+
+    def close(self):
+        try:
+            self.sync()
+        finally:
+            self._data.close()
+            self._index.close()
+
+
+class SessionAudioReader:
+    """セッションのコンテナを読み出すリーダー（データファイルを mmap する）"""
+
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+        with open(index_path(base_path), "rb") as f:
+            index_bytes = f.read()
+        if len(index_bytes) < INDEX_HEADER.size:
+            raise ValueError(f"Index file too short: {index_path(base_path)}")
+
+        magic, version, channels, sample_rate, sample_width, _ = (
+            INDEX_HEADER.unpack_from(index_bytes)
+        )
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError(f"Unsupported index file: {index_path(base_path)}")
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+
+        # 書き込み途中の末尾レコードは無視する
+        body = index_bytes[INDEX_HEADER.size :]
+        usable = len(body) - len(body) % INDEX_RECORD.size
+        self.records = [
+            SegmentRecord(*fields) for fields in INDEX_RECORD.iter_unpack(body[:usable])
+        ]
+        self._by_id = {record.segment_id: record for record in self.records}
+
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._decoded: Optional[bytes] = None
+        archive = (
+            None if os.path.exists(data_path(base_path)) else find_archive(base_path)
+        )
+        if archive is not None:
+            # アーカイブ済みの場合は全体を展開して読む
+            codec, path = archive
+            with open(path, "rb") as f:
+                self._decoded = decode_pcm(f.read(), codec)
+        else:
+            self._file = open(data_path(base_path), "rb")
+            size = os.fstat(self._file.fileno()).st_size
+            if size > 0:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def segment_ids(self) -> list[int]:
+        return [record.segment_id for record in self.records]
+
+    def read(self, segment_id: int) -> memoryview:
+        """セグメントのPCMをコピーせずに返す"""
+        record = self._by_id.get(segment_id)
+        if record is None:
+            raise KeyError(f"Segment {segment_id} not found in {self.base_path}")
+        source = self._decoded if self._decoded is not None else self._mmap
+        return memoryview(source)[record.offset : record.offset + record.length]
+
+    def export_wav(self, segment_id: int, filepath: str):
+        """セグメントをWAVファイルとして書き出す"""
+        with wave.open(filepath, "wb") as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(self.sample_width)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(self.read(segment_id))
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+        self._decoded = None
+
+
+def export_session(base_path: str, output_dir: str) -> list[str]:
+    """セッションの全セグメントを segment_NNNN.wav として書き出す"""
+    os.makedirs(output_dir, exist_ok=True)
+    exported = []
+    with SessionAudioReader(base_path) as reader:
+        for segment_id in reader.segment_ids():
+            filepath = os.path.join(output_dir, f"segment_{segment_id:04d}.wav")
+            reader.export_wav(segment_id, filepath)
+            exported.append(filepath)
+    return exported
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="セッション音声コンテナの操作")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="セグメント一覧を表示")
+    list_parser.add_argument("session", help="セッションのベースパス（拡張子なし）")
+
+    export_parser = subparsers.add_parser("export", help="WAVファイルに書き出す")
+    export_parser.add_argument("session", help="セッションのベースパス（拡張子なし）")
+    export_parser.add_argument("output_dir", help="出力ディレクトリ")
+
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        with SessionAudioReader(args.session) as reader:
+            for record in reader.records:
+                duration = record.length / reader.sample_width / reader.sample_rate
+                print(
+                    f"{record.segment_id:6d} offset={record.offset} "
+                    f"bytes={record.length} duration={duration:.2f}s"
+                )
+    elif args.command == "export":
+        for filepath in export_session(args.session, args.output_dir):
+            print(filepath)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
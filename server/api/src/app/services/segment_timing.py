@@ -0,0 +1,116 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+
+@dataclass
+class SegmentTrace:
+    """セグメントが文字起こしに回るまでの時刻（パイプラインの clock）とストリーム上の位置"""
+
+    segment_id: int
+    audio_bytes: int
+    speech_start: float  # ストリーム先頭からの秒
+    speech_end: float
+    speech_end_at: float  # 最後の発話フレームを含むパケットを受信した時刻
+    closed_at: float  # セグメントが確定した時刻
+
+
+@dataclass
+class TranscriptionTiming:
+    """文字起こし1件分の時刻（結合されたセグメントは1つにまとめる）"""
+
+    speech_start: float
+    speech_end: float
+    speech_end_at: float
+    closed_at: float
+    started_at: float  # 結合待ちを終えて文字起こしに回した時刻
+    wav_encode_seconds: float = 0.0
+
+    def to_dict(
+        self, adapter_timings: dict, task_started_at: float, now: Optional[float] = None
+    ) -> dict:
+        """
+        transcription_result に付ける timings（時間はミリ秒）
+
+        adapter_timings: アダプターが書き込んだ queue_seconds / api_seconds /
+        upload_seconds / model_seconds
+        now: 結果を送る時刻（他の時刻と同じ clock。省略時は perf_counter）
+        """
+        if now is None:
+            now = time.perf_counter()
+        timings = {
+            "speech_start": round(self.speech_start, 3),
+            "speech_end": round(self.speech_end, 3),
+            "segment_close_ms": _ms(self.closed_at - self.speech_end_at),
+            "merge_hold_ms": _ms(self.started_at - self.closed_at),
+            "wav_encode_ms": _ms(self.wav_encode_seconds),
+            "queue_ms": _ms(
+                task_started_at
+                - self.started_at
+                - self.wav_encode_seconds
+                + adapter_timings.get("queue_seconds", 0.0)
+            ),
+        }
+        for key in ("upload", "model", "api"):
+            seconds = adapter_timings.get(f"{key}_seconds")
+            if seconds is not None:
+                timings[f"{key}_ms"] = _ms(seconds)
+        timings["server_ms"] = _ms(now - self.speech_end_at)
+        return timings
+
+
+def _ms(seconds: float) -> float:
+    return round(max(0.0, seconds) * 1000, 1)
+
+
+class SegmentTimingTracker:
+    """
+    クライアント毎にセグメントの時刻を記録し、文字起こし開始時に取り出す
+
+    SegmentMerger で結合されたセグメントは先頭の ID で文字起こしに回るので、
+    音声の長さが一致するまで後続のセグメントもまとめて取り出す。
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.traces: Dict[str, Dict[int, SegmentTrace]] = {}
+
+    def enable(self, client_id: str):
+        self.traces.setdefault(client_id, {})
+
+    def enabled(self, client_id: str) -> bool:
+        return client_id in self.traces
+
+    def record(self, client_id: str, trace: SegmentTrace):
+        traces = self.traces.get(client_id)
+        if traces is not None:
+            traces[trace.segment_id] = trace
+
+    def discard(self, client_id: str, segment_id: int):
+        traces = self.traces.get(client_id)
+        if traces is not None:
+            traces.pop(segment_id, None)
+
+    def take(
+        self, client_id: str, segment_id: int, audio_bytes: int
+    ) -> Optional[TranscriptionTiming]:
+        traces = self.traces.get(client_id)
+        if not traces or segment_id not in traces:
+            return None
+        first = last = traces.pop(segment_id)
+        consumed = first.audio_bytes
+        next_id = segment_id + 1
+        while consumed < audio_bytes and next_id in traces:
+            last = traces.pop(next_id)
+            consumed += last.audio_bytes
+            next_id += 1
+        return TranscriptionTiming(
+            speech_start=first.speech_start,
+            speech_end=last.speech_end,
+            speech_end_at=last.speech_end_at,
+            closed_at=last.closed_at,
+            started_at=self.clock(),
+        )
+
+    def cleanup_client(self, client_id: str):
+        self.traces.pop(client_id, None)
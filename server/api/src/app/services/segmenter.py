@@ -0,0 +1,315 @@
+import logging
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def find_split_frame(speech_probs: Sequence[float], lookback_frames: int) -> int:
+    """
+    長すぎる発話の区切り位置を決める
+    末尾 lookback_frames フレームの中で音声確率が最も低いフレームの直後で区切る
+    （同じ確率の場合はセグメントが長くなる後ろのフレームを選ぶ）
+
+    Returns:
+        int: 前半セグメントに含めるフレーム数
+    """
+    num_frames = len(speech_probs)
+    if num_frames == 0:
+        return 0
+
+    start = max(0, num_frames - lookback_frames)
+    window = np.asarray(speech_probs[start:num_frames])
+    return start + len(window) - int(np.argmin(window[::-1]))
+
+
+# 発話開始時に確保するフレーム数（512 サンプルで約 2 秒。以降は倍々に拡張）
+INITIAL_SEGMENT_FRAMES = 64
+
+
+@dataclass
+class Segment:
+    """確定した発話セグメント"""
+
+    audio: bytes  # 16bit PCM（プリロール含む）
+    start_frame: int  # ストリーム先頭からのフレーム番号（プリロール含む）
+    end_frame: int  # ストリーム先頭からのフレーム番号（この値は含まない）
+    speech_frames: int  # 音声と判定されたフレーム数
+    forced: bool = False  # 最大長により強制的に区切られた場合 True
+    speech_start_frame: Optional[int] = None  # 最初の発話フレーム（プリロールを除く）
+    speech_end_frame: Optional[int] = None  # 最後の発話フレームの次（末尾の無音を除く）
+
+
+class Segmenter:
+    """
+    ストリーミング用の発話区間検出ステートマシン
+
+    - 開始閾値（onset）と終了閾値（offset）を分けたヒステリシス判定
+    - 最小発話長（これ未満の発話は破棄）と最小無音長（これ以上続いたら区間終了）
+    - 発話開始直前の音声を保持するプリロール用リングバッファ
+    - 最大セグメント長に達したら直前の区間で音声確率が最も低いフレームで区切る
+    - 音声とフレーム毎の音声確率は NumPy 配列で管理する（発話が始まってから確保し、
+      最大セグメント長まで倍々に拡張する。無音のセッションはプリロール分しか持たない）
+
+    push_frame() でフレーム単位（ストリーミング）、process_array() で配列全体（オフライン）を処理する
+    """
+
+    def __init__(
+        self,
+        frame_size: int = 512,
+        onset_threshold: float = 0.5,
+        offset_threshold: float = 0.35,
+        min_speech_frames: int = 1,
+        min_silence_frames: int = 46,
+        pre_roll_frames: int = 10,
+        max_segment_frames: int = 937,
+        split_lookback_frames: int = 62,
+    ):
+        if offset_threshold > onset_threshold:
+            raise ValueError(
+                f"offset_threshold ({offset_threshold}) must not exceed "
+                f"onset_threshold ({onset_threshold})"
+            )
+        if max_segment_frames <= pre_roll_frames:
+            raise ValueError(
+                f"max_segment_frames ({max_segment_frames}) must be larger than "
+                f"pre_roll_frames ({pre_roll_frames})"
+            )
+
+        self.frame_size = frame_size
+        self.onset_threshold = onset_threshold
+        self.offset_threshold = offset_threshold
+        self.min_speech_frames = min_speech_frames
+        self.min_silence_frames = min_silence_frames
+        self.pre_roll_frames = pre_roll_frames
+        self.max_segment_frames = max_segment_frames
+        self.split_lookback_frames = max(1, split_lookback_frames)
+
+        # 発話中の音声とフレーム毎の音声確率（必要になった分だけ確保）
+        self._audio = np.zeros(0, dtype=np.int16)
+        self._probs = np.zeros(0, dtype=np.float32)
+        self._num_frames = 0
+
+        # プリロール用リングバッファ
+        self._pre_roll = np.zeros((max(1, pre_roll_frames), frame_size), dtype=np.int16)
+        self._pre_roll_pos = 0
+        self._pre_roll_count = 0
+
+        self.in_speech = False
+        self.speech_frames = 0  # 現在の区間で音声と判定されたフレーム数
+        self.silence_frames = 0  # 連続無音フレーム数
+        self.frame_index = 0  # ストリーム先頭からの処理済みフレーム数
+        self._segment_start_frame = 0
+        self.dropped_segments = 0  # 最小発話長未満で破棄したセグメント数
+
+    @property
+    def buffered_bytes(self) -> int:
+        """発話中バッファのバイト数"""
+        return self._num_frames * self.frame_size * 2
+
+    @property
+    def nbytes(self) -> int:
+        """確保しているバッファの合計バイト数"""
+        return self._audio.nbytes + self._probs.nbytes + self._pre_roll.nbytes
+
+    def current_audio(self, start: int = 0, end: Optional[int] = None) -> bytes:
+        """発話中バッファの [start, end) バイト区間を返す"""
+        end = self.buffered_bytes if end is None else end
+        return self._audio.view(np.uint8)[start:end].tobytes()
+
+    def push_frame(self, frame, speech_prob: float) -> Optional[Segment]:
+        """
+        1フレーム分の音声と音声確率を処理する
+
+        :param frame: frame_size サンプル分の16bit PCM（bytes / bytearray / int16配列）
+        :param speech_prob: VADによる音声確率
+        :return: 区間が確定した場合は Segment、それ以外は None
+        """
+        samples = self._as_samples(frame)
+        self.frame_index += 1
+
+        if not self.in_speech:
+            if speech_prob >= self.onset_threshold:
+                self._start_segment()
+                self._append(samples, speech_prob)
+                self.speech_frames = 1
+            else:
+                self._push_pre_roll(samples)
+            return None
+
+        self._append(samples, speech_prob)
+        if speech_prob >= self.offset_threshold:
+            self.speech_frames += 1
+            self.silence_frames = 0
+        else:
+            self.silence_frames += 1
+            if self.silence_frames >= self.min_silence_frames:
+                return self._close_segment()
+
+        if self._num_frames >= self.max_segment_frames:
+            return self._split_segment()
+        return None
+
+    def process_array(
+        self, audio: np.ndarray, speech_probs: np.ndarray
+    ) -> list[Segment]:
+        """
+        音声配列全体をまとめて処理する（オフライン用）
+        末尾で発話中の区間も確定させて返す
+
+        :param audio: 16bit PCM の int16 配列
+        :param speech_probs: フレーム毎の音声確率（len(audio) // frame_size 個）
+        """
+        num_frames = len(audio) // self.frame_size
+        if len(speech_probs) != num_frames:
+            raise ValueError(
+                f"Expected {num_frames} speech probabilities, got {len(speech_probs)}"
+            )
+
+        frames = np.asarray(audio[: num_frames * self.frame_size], dtype=np.int16)
+        frames = frames.reshape(num_frames, self.frame_size)
+        segments = []
+        for frame, prob in zip(frames, speech_probs):
+            segment = self.push_frame(frame, float(prob))
+            if segment is not None:
+                segments.append(segment)
+
+        segment = self.flush()
+        if segment is not None:
+            segments.append(segment)
+        return segments
+
+    def flush(self) -> Optional[Segment]:
+        """発話中の区間を強制的に確定する（ストリーム終了時など）"""
+        if not self.in_speech:
+            return None
+        return self._close_segment()
+
+    def reset(self):
+        """内部状態をリセット"""
+        self._num_frames = 0
+        self._release()
+        self._pre_roll_pos = 0
+        self._pre_roll_count = 0
+        self.in_speech = False
+        self.speech_frames = 0
+        self.silence_frames = 0
+
+    def _as_samples(self, frame) -> np.ndarray:
+        if isinstance(frame, np.ndarray):
+            samples = frame
+        else:
+            samples = np.frombuffer(frame, dtype=np.int16)
+        if len(samples) != self.frame_size:
+            raise ValueError(
+                f"Expected frame of {self.frame_size} samples, got {len(samples)}"
+            )
+        return samples
+
+    def _push_pre_roll(self, samples: np.ndarray):
+        if self.pre_roll_frames == 0:
+            return
+        self._pre_roll[self._pre_roll_pos] = samples
+        self._pre_roll_pos = (self._pre_roll_pos + 1) % self.pre_roll_frames
+        self._pre_roll_count = min(self._pre_roll_count + 1, self.pre_roll_frames)
+
+    def _start_segment(self):
+        """プリロールの内容を先頭にコピーして発話区間を開始"""
+        self.in_speech = True
+        self.silence_frames = 0
+        self._num_frames = 0
+        oldest = (self._pre_roll_pos - self._pre_roll_count) % max(
+            1, self.pre_roll_frames
+        )
+        for i in range(self._pre_roll_count):
+            index = (oldest + i) % self.pre_roll_frames
+            self._append(self._pre_roll[index], 0.0)
+        self._segment_start_frame = self.frame_index - 1 - self._pre_roll_count
+        self._pre_roll_count = 0
+        self._pre_roll_pos = 0
+
+    def _grow(self):
+        """発話中バッファの容量を倍にする（最大 max_segment_frames フレーム）"""
+        capacity = len(self._probs)
+        new_capacity = min(
+            self.max_segment_frames,
+            max(2 * capacity, self.pre_roll_frames + 1, INITIAL_SEGMENT_FRAMES),
+        )
+        audio = np.zeros(new_capacity * self.frame_size, dtype=np.int16)
+        probs = np.zeros(new_capacity, dtype=np.float32)
+        audio[: self._num_frames * self.frame_size] = self._audio[
+            : self._num_frames * self.frame_size
+        ]
+        probs[: self._num_frames] = self._probs[: self._num_frames]
+        self._audio, self._probs = audio, probs
+
+    def _append(self, samples: np.ndarray, speech_prob: float):
+        if self._num_frames == len(self._probs):
+            self._grow()
+        start = self._num_frames * self.frame_size
+        self._audio[start : start + self.frame_size] = samples
+        self._probs[self._num_frames] = speech_prob
+        self._num_frames += 1
+
+    def _take(self, num_frames: int, forced: bool) -> Segment:
+        """先頭 num_frames フレームを Segment として取り出す"""
+        voiced = np.flatnonzero(self._probs[:num_frames] >= self.offset_threshold)
+        start = self._segment_start_frame
+        segment = Segment(
+            audio=self._audio[: num_frames * self.frame_size].tobytes(),
+            start_frame=start,
+            end_frame=start + num_frames,
+            speech_frames=len(voiced),
+            forced=forced,
+            speech_start_frame=start + int(voiced[0]) if len(voiced) else start,
+            speech_end_frame=(
+                start + int(voiced[-1]) + 1 if len(voiced) else start + num_frames
+            ),
+        )
+        return segment
+
+    def _close_segment(self) -> Optional[Segment]:
+        segment = None
+        if self.speech_frames >= self.min_speech_frames:
+            segment = self._take(self._num_frames, forced=False)
+        else:
+            self.dropped_segments += 1
+            logger.debug(
+                f"[Segmenter] Dropped segment with {self.speech_frames} speech frames "
+                f"(< {self.min_speech_frames})"
+            )
+        self._num_frames = 0
+        self.in_speech = False
+        self.speech_frames = 0
+        self.silence_frames = 0
+        self._release()
+        return segment
+
+    def _release(self):
+        """長い発話で拡張したバッファを手放す（次の発話では初期サイズから確保し直す）"""
+        if len(self._probs) > INITIAL_SEGMENT_FRAMES:
+            self._audio = np.zeros(0, dtype=np.int16)
+            self._probs = np.zeros(0, dtype=np.float32)
+
+    def _split_segment(self) -> Segment:
+        """最大長に達した区間を音声確率が最も低いフレームの直後で区切り、残りを持ち越す"""
+        split_frames = find_split_frame(
+            self._probs[: self._num_frames], self.split_lookback_frames
+        )
+
+        segment = self._take(split_frames, forced=True)
+
+        # 残りのフレームを先頭に詰める
+        remaining = self._num_frames - split_frames
+        self._audio[: remaining * self.frame_size] = self._audio[
+            split_frames * self.frame_size : self._num_frames * self.frame_size
+        ]
+        self._probs[:remaining] = self._probs[split_frames : self._num_frames]
+        self._num_frames = remaining
+        self._segment_start_frame += split_frames
+        self.speech_frames = int(
+            np.count_nonzero(self._probs[:remaining] >= self.offset_threshold)
+        )
+        return segment
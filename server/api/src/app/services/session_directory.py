@@ -0,0 +1,293 @@
+"""
+セッションと所有ワーカーの対応を管理するセッションディレクトリ
+
+複数のワーカープロセスは状態を共有しない（shared-nothing）。各セッションの音声と
+状態は接続を受けたワーカーだけが持ち、ディレクトリには「どのワーカーが持っているか」
+だけを記録する。再接続が別のワーカーに届いた場合は、所有ワーカーへ誘導する。
+
+- memory://            : プロセス内の辞書（テスト・単一ワーカー用）
+- redis://host:port/db : Redis プロトコル互換のサーバー（Redis / Valkey / KeyDB など）
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+
+def new_session_id() -> str:
+    """衝突しないセッションIDを生成（ランダム128bit）"""
+    return uuid.uuid4().hex
+
+
+@dataclass
+class SessionInfo:
+    """ディレクトリに登録するセッションの所有者情報"""
+
+    session_id: str
+    worker_id: str
+    worker_url: str = ""  # 所有ワーカーに直接接続するためのURL
+    created_at: float = 0.0
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, data: str) -> "SessionInfo":
+        return cls(**json.loads(data))
+
+
+class SessionDirectory(ABC):
+    """セッションディレクトリの抽象化"""
+
+    @abstractmethod
+    async def register(self, info: SessionInfo, ttl: float) -> bool:
+        """
+        セッションを登録（既に同じIDがある場合は登録しない）
+        :return: 登録できた場合 True
+        """
+        pass
+
+    @abstractmethod
+    async def lookup(self, session_id: str) -> Optional[SessionInfo]:
+        """セッションの所有者情報を取得（期限切れ・未登録は None）"""
+        pass
+
+    @abstractmethod
+    async def refresh(self, session_ids: Iterable[str], ttl: float):
+        """所有しているセッションの有効期限を延長"""
+        pass
+
+    @abstractmethod
+    async def unregister(self, session_id: str):
+        """セッションを削除"""
+        pass
+
+    async def close(self):
+        pass
+
+
+class InMemorySessionDirectory(SessionDirectory):
+    """プロセス内で完結するセッションディレクトリ"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._entries: Dict[str, Tuple[SessionInfo, float]] = {}
+
+    def _get(self, session_id: str) -> Optional[Tuple[SessionInfo, float]]:
+        entry = self._entries.get(session_id)
+        if entry is not None and entry[1] <= self.clock():
+            del self._entries[session_id]
+            return None
+        return entry
+
+    async def register(self, info: SessionInfo, ttl: float) -> bool:
+        if self._get(info.session_id) is not None:
+            return False
+        self._entries[info.session_id] = (info, self.clock() + ttl)
+        return True
+
+    async def lookup(self, session_id: str) -> Optional[SessionInfo]:
+        entry = self._get(session_id)
+        return entry[0] if entry else None
+
+    async def refresh(self, session_ids: Iterable[str], ttl: float):
+        expires_at = self.clock() + ttl
+        for session_id in session_ids:
+            entry = self._get(session_id)
+            if entry is not None:
+                self._entries[session_id] = (entry[0], expires_at)
+
+    async def unregister(self, session_id: str):
+        self._entries.pop(session_id, None)
+
+
+class RespError(Exception):
+    """Redis プロトコルのエラー応答"""
+
+
+class RespConnection:
+    """
+    Redis プロトコル（RESP2）の最小限のクライアント
+    コマンドはロックで直列化し、複数コマンドはパイプラインでまとめて送る
+    接続と各パイプラインは timeout 秒で打ち切り、接続を張り直す
+    （応答しないサーバーで接続処理やヘルスチェックが止まらないようにする）
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        db: int = 0,
+        password: str = "",
+        timeout: float = 2.0,
+    ):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def encode(*args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    @classmethod
+    async def read_reply(cls, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            raise RespError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = await reader.readexactly(length + 2)
+            return data[:-2].decode()
+        if prefix == b"*":
+            count = int(payload)
+            if count < 0:
+                return None
+            return [await cls.read_reply(reader) for _ in range(count)]
+        raise RespError(f"Unexpected reply: {line!r}")
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        if self.password:
+            await self._send([("AUTH", self.password)])
+        if self.db:
+            await self._send([("SELECT", self.db)])
+
+    async def _send(self, commands: list) -> list:
+        self._writer.write(b"".join(self.encode(*command) for command in commands))
+        await self._writer.drain()
+        replies = []
+        error = None
+        for _ in commands:
+            try:
+                replies.append(await self.read_reply(self._reader))
+            except RespError as e:
+                error = error or e
+                replies.append(None)
+        if error:
+            raise error
+        return replies
+
+    async def pipeline(self, commands: list) -> list:
+        """
+        コマンドをまとめて送信し、応答を順に返す
+        （切断・タイムアウト時は接続を張り直して1回だけ再送する）
+        """
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._writer is None:
+                        await self._connect()
+                    return await asyncio.wait_for(self._send(commands), self.timeout)
+                except (
+                    ConnectionError,
+                    OSError,
+                    asyncio.IncompleteReadError,
+                    asyncio.TimeoutError,
+                ):
+                    # 応答の途中で止まった接続は読み位置がずれるので使い回さない
+                    await self._reset()
+                    if attempt:
+                        raise
+
+    async def execute(self, *args):
+        return (await self.pipeline([args]))[0]
+
+    async def _reset(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await asyncio.wait_for(self._writer.wait_closed(), self.timeout)
+            except (ConnectionError, OSError, asyncio.TimeoutError):
+                pass
+        self._reader = self._writer = None
+
+    async def close(self):
+        async with self._lock:
+            await self._reset()
+
+
+class RedisSessionDirectory(SessionDirectory):
+    """Redis プロトコル互換サーバーを使うセッションディレクトリ（ワーカー間で共有）"""
+
+    def __init__(self, connection: RespConnection, prefix: str = "vad:session:"):
+        self.connection = connection
+        self.prefix = prefix
+
+    def _key(self, session_id: str) -> str:
+        return self.prefix + session_id
+
+    async def register(self, info: SessionInfo, ttl: float) -> bool:
+        reply = await self.connection.execute(
+            "SET",
+            self._key(info.session_id),
+            info.to_json(),
+            "NX",
+            "PX",
+            int(ttl * 1000),
+        )
+        return reply == "OK"
+
+    async def lookup(self, session_id: str) -> Optional[SessionInfo]:
+        data = await self.connection.execute("GET", self._key(session_id))
+        return SessionInfo.from_json(data) if data else None
+
+    async def refresh(self, session_ids: Iterable[str], ttl: float):
+        commands = [
+            ("PEXPIRE", self._key(session_id), int(ttl * 1000))
+            for session_id in session_ids
+        ]
+        if commands:
+            await self.connection.pipeline(commands)
+
+    async def unregister(self, session_id: str):
+        await self.connection.execute("DEL", self._key(session_id))
+
+    async def close(self):
+        await self.connection.close()
+
+
+def create_session_directory(url: str = "", timeout: float = 2.0) -> SessionDirectory:
+    """
+    URLからセッションディレクトリを作成（空の場合はプロセス内）
+    timeout: Redis への接続・コマンド毎のタイムアウト（秒）
+    """
+    if not url or url.startswith("memory://"):
+        return InMemorySessionDirectory()
+
+    parsed = urlparse(url)
+    if parsed.scheme not in ("redis", "valkey"):
+        raise ValueError(f"Unsupported session directory URL: {url}")
+    db = int(parsed.path.lstrip("/") or 0)
+    connection = RespConnection(
+        parsed.hostname or "localhost",
+        parsed.port or 6379,
+        db=db,
+        password=parsed.password or "",
+        timeout=timeout,
+    )
+    return RedisSessionDirectory(connection)
@@ -0,0 +1,134 @@
+import hmac
+import logging
+import secrets
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Optional
+
+from app.services.timer_scheduler import TimerHandle, TimerScheduler
+
+logger = logging.getLogger(__name__)
+
+# 再接続時に再送するメッセージ（受信確認・統計は再送しない）
+REPLAYABLE_MESSAGE_TYPES = frozenset(
+    {
+        "transcription_result",
+        "transcription_error",
+        "transcription_skipped",
+        "segment_merge_error",
+    }
+)
+
+
+@dataclass
+class ResumableSession:
+    """再接続に必要なセッションの状態"""
+
+    token: str
+    next_seq: int = 1  # 次に送信するメッセージの通し番号
+    outbox: Deque[tuple[int, dict]] = field(default_factory=deque)
+    expiry: Optional[TimerHandle] = None  # 切断中の猶予タイマー
+
+    @property
+    def detached(self) -> bool:
+        return self.expiry is not None
+
+
+class SessionResumeRegistry:
+    """
+    切断されたセッションを猶予時間だけ保持し、再接続で元のセッションに戻すレジストリ
+
+    - 送信するメッセージには通し番号 seq を付け、結果系のメッセージは直近 replay_size 件を保持する
+    - 再接続時はクライアントが受信済みの seq より後のメッセージを再送する
+    - 猶予時間内に再接続がなければ on_expire でセッションを終了する
+    """
+
+    def __init__(
+        self,
+        scheduler: TimerScheduler,
+        grace_seconds: float = 30.0,
+        replay_size: int = 64,
+    ):
+        self.scheduler = scheduler
+        self.grace_seconds = grace_seconds
+        self.replay_size = replay_size
+        self.sessions: Dict[str, ResumableSession] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.grace_seconds > 0
+
+    def create(self, session_id: str) -> str:
+        """セッションを登録し、再接続用のトークンを返す"""
+        token = secrets.token_urlsafe(16)
+        self.sessions[session_id] = ResumableSession(
+            token=token, outbox=deque(maxlen=self.replay_size)
+        )
+        return token
+
+    def stamp(self, session_id: str, data: dict) -> dict:
+        """送信するメッセージに通し番号を付け、再送対象なら保持する"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return data
+        data = {**data, "seq": session.next_seq}
+        session.next_seq += 1
+        if data.get("type") in REPLAYABLE_MESSAGE_TYPES:
+            session.outbox.append((data["seq"], data))
+        return data
+
+    def is_detached(self, session_id: str) -> bool:
+        session = self.sessions.get(session_id)
+        return session is not None and session.detached
+
+    def detach(self, session_id: str, on_expire: Callable) -> bool:
+        """
+        接続が切れたセッションを猶予時間だけ保持する
+
+        Returns:
+            bool: 保持した場合 True（無効時・未登録の場合は False）
+        """
+        session = self.sessions.get(session_id)
+        if not self.enabled or session is None:
+            return False
+        if session.expiry is not None:
+            session.expiry.cancel()
+        session.expiry = self.scheduler.call_later(
+            self.grace_seconds, self._expire, session_id, on_expire
+        )
+        logger.info(
+            f"[Resume] Session {session_id} detached, "
+            f"waiting {self.grace_seconds}s for reconnect"
+        )
+        return True
+
+    def reattach(
+        self, session_id: str, token: str, last_seq: int = 0
+    ) -> Optional[list[dict]]:
+        """
+        セッションに再接続する（トークンが一致する場合のみ）
+
+        Returns:
+            Optional[list[dict]]: 再送するメッセージ（再接続できない場合は None）
+        """
+        session = self.sessions.get(session_id)
+        if session is None or not hmac.compare_digest(session.token, token):
+            return None
+        # 切断を検知する前の再接続（半開きの接続）も引き継げるようにする
+        if session.expiry is not None:
+            session.expiry.cancel()
+            session.expiry = None
+        return [message for seq, message in session.outbox if seq > last_seq]
+
+    def remove(self, session_id: str):
+        session = self.sessions.pop(session_id, None)
+        if session is not None and session.expiry is not None:
+            session.expiry.cancel()
+
+    async def _expire(self, session_id: str, on_expire: Callable):
+        session = self.sessions.get(session_id)
+        if session is None or not session.detached:
+            return
+        session.expiry = None
+        logger.info(f"[Resume] Grace period expired for session {session_id}")
+        await on_expire(session_id)
@@ -0,0 +1,178 @@
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TimerHandle:
+    """スケジュールされたタイマー（cancel() で取り消し可能）"""
+
+    __slots__ = ("deadline", "callback", "args", "cancelled", "_scheduler")
+
+    def __init__(self, deadline: float, callback: Callable, args: tuple, scheduler):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self._scheduler = scheduler
+
+    def cancel(self):
+        """タイマーを取り消す（ヒープからは発火時に遅延削除）"""
+        if not self.cancelled:
+            self.cancelled = True
+            self._scheduler._on_cancel()
+
+
+class TimerScheduler:
+    """
+    多数のタイムアウトを1つのタスクで処理するヒープベースのスケジューラ
+    クライアント毎に asyncio.sleep タスクを作らずに済む
+
+    - call_later / reschedule / cancel はいずれも O(log n) 以下
+    - 取り消されたタイマーは遅延削除し、半分以上が取り消し済みになったらヒープを再構築する
+    - コールバックは駆動タスク内で順に実行する（コルーチン関数の場合は別タスクで実行し、
+      遅いコールバックが後続のタイマーを遅らせないようにする）
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._heap: list[tuple[float, int, TimerHandle]] = []
+        self._sequence = itertools.count()
+        self._pending = 0
+        self._cancelled = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._callback_tasks: set[asyncio.Task] = set()
+
+    @property
+    def pending_count(self) -> int:
+        """発火待ちのタイマー数"""
+        return self._pending
+
+    def call_at(self, deadline: float, callback: Callable, *args) -> TimerHandle:
+        """指定時刻（clock 基準）にコールバックを実行する"""
+        handle = TimerHandle(deadline, callback, args, self)
+        is_earliest = not self._heap or deadline < self._heap[0][0]
+        heapq.heappush(self._heap, (deadline, next(self._sequence), handle))
+        self._pending += 1
+
+        self._ensure_running()
+        if is_earliest and self._wakeup is not None:
+            self._wakeup.set()
+        return handle
+
+    def call_later(self, delay: float, callback: Callable, *args) -> TimerHandle:
+        """delay 秒後にコールバックを実行する"""
+        return self.call_at(self.clock() + delay, callback, *args)
+
+    def reschedule(self, handle: TimerHandle, delay: float) -> TimerHandle:
+        """タイマーを取り消して、同じコールバックを delay 秒後に再設定する"""
+        handle.cancel()
+        return self.call_later(delay, handle.callback, *handle.args)
+
+    async def close(self):
+        """駆動タスクを停止し、全てのタイマーを破棄する"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.wait_callbacks()
+        for _, _, handle in self._heap:
+            handle.cancelled = True
+        self._heap.clear()
+        self._pending = 0
+        self._cancelled = 0
+
+    async def run_due(self) -> int:
+        """
+        期限を過ぎたタイマーを全て実行する
+
+        Returns:
+            int: 実行したタイマー数
+        """
+        fired = 0
+        now = self.clock()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, handle = heapq.heappop(self._heap)
+            if handle.cancelled:
+                self._cancelled -= 1
+                continue
+
+            self._pending -= 1
+            handle.cancelled = True  # 発火後の cancel() を無効化
+            fired += 1
+            try:
+                result = handle.callback(*handle.args)
+                if inspect.isawaitable(result):
+                    task = asyncio.ensure_future(result)
+                    self._callback_tasks.add(task)
+                    task.add_done_callback(self._on_callback_done)
+            except Exception as e:
+                logger.error(f"[TimerScheduler] Error in timer callback: {e}")
+        return fired
+
+    async def wait_callbacks(self):
+        """実行中のコルーチンのコールバックが全て終わるまで待つ"""
+        while self._callback_tasks:
+            await asyncio.wait(list(self._callback_tasks))
+
+    def _on_callback_done(self, task: asyncio.Task):
+        self._callback_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                f"[TimerScheduler] Error in timer callback: {task.exception()}"
+            )
+
+    def next_deadline(self) -> Optional[float]:
+        """次に発火するタイマーの時刻（なければ None）"""
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+            self._cancelled -= 1
+        return self._heap[0][0] if self._heap else None
+
+    def _on_cancel(self):
+        self._pending -= 1
+        self._cancelled += 1
+        # 取り消し済みが多くなったらヒープを再構築してメモリを解放
+        if self._cancelled > 64 and self._cancelled > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def _ensure_running(self):
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # イベントループ外では駆動タスクを起動しない（run_due() で手動駆動）
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        """次の期限まで待機してタイマーを発火させる駆動ループ"""
+        while True:
+            self._wakeup.clear()
+            deadline = self.next_deadline()
+            if deadline is None:
+                await self._wakeup.wait()
+                continue
+
+            delay = deadline - self.clock()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.run_due()
@@ -1,12 +1,14 @@
-from collections import deque
 from typing import Optional
 from app.adapters.vad import VADAdapter
+from app.services.segmenter import Segmenter
 
 
 class VADProcessor:
     """
     Pre-buffering機能付きVADプロセッサ
     発話開始前の音声を保持して頭切れ問題を解決
+    区間検出そのものは Segmenter に任せ、任意長の入力を VAD のフレーム単位に分割して判定する
+    （Silero VAD は 16kHz で 512 サンプルのフレームしか受け付けない）
     """
 
     def __init__(
@@ -15,7 +17,9 @@ class VADProcessor:
         sample_rate: int = 16000,
         pre_buffer_duration: float = 0.5,  # 500ms pre-buffer
         threshold: float = 0.3,  # より敏感な閾値
-        chunk_size_ms: int = 100,  # 100ms単位で処理
+        chunk_size_ms: int = 100,  # 発話・無音がこの時間続いたら開始・終了
+        max_speech_duration: float = 30.0,
+        frame_size: int = 512,  # VAD に渡すフレーム（サンプル数）
     ):
         self.vad_adapter = vad_adapter
         self.sample_rate = sample_rate
@@ -23,13 +27,29 @@ class VADProcessor:
         self.threshold = threshold
         self.chunk_size_ms = chunk_size_ms
 
-        # Pre-bufferサイズ計算（100ms単位のチャンク数）
-        buffer_chunks = int((pre_buffer_duration * 1000) / chunk_size_ms)
-        self.pre_buffer = deque(maxlen=buffer_chunks)
+        # フレームサイズ（サンプル数）と、各時間に相当するフレーム数
+        self.frame_samples = frame_size
+        frame_ms = frame_size * 1000 / sample_rate
+        chunk_frames = max(1, round(chunk_size_ms / frame_ms))
+        buffer_frames = int(pre_buffer_duration * 1000 / frame_ms)
+        max_frames = max(buffer_frames + 1, int(max_speech_duration * 1000 / frame_ms))
+
+        # 閾値は開始・終了で共通
+        self.segmenter = Segmenter(
+            frame_size=frame_size,
+            onset_threshold=threshold,
+            offset_threshold=threshold,
+            min_speech_frames=chunk_frames,
+            min_silence_frames=chunk_frames,
+            pre_roll_frames=buffer_frames,
+            max_segment_frames=max_frames,
+            split_lookback_frames=max(1, int(1000 / frame_ms)),
+        )
+        self.pending = bytearray()  # フレームに満たない入力
 
-        # 状態管理
-        self.is_speaking = False
-        self.speech_chunks = []
+    @property
+    def is_speaking(self) -> bool:
+        return self.segmenter.in_speech
 
     def process_audio_chunk(self, pcm_bytes: bytes) -> Optional[bytes]:
         """
@@ -41,54 +61,41 @@ class VADProcessor:
         if len(pcm_bytes) == 0:
             return None
 
-        # VAD判定
-        is_speech, speech_prob = self.vad_adapter.predict(
-            pcm_bytes, self.sample_rate, self.threshold
-        )
-
-        if is_speech:
-            if not self.is_speaking:
-                # 発話開始: Pre-bufferの内容を含めて開始
-                self.is_speaking = True
-                self.speech_chunks = list(self.pre_buffer)  # Pre-bufferをコピー
-
-            # 発話中の音声を追加
-            self.speech_chunks.append(pcm_bytes)
-
-        else:
-            if self.is_speaking:
-                # 発話終了: 蓄積した音声を返す
-                self.is_speaking = False
-                if self.speech_chunks:
-                    # Pre-buffer + 発話音声を結合
-                    complete_speech = b"".join(self.speech_chunks)
-                    self.speech_chunks = []
-                    return complete_speech
-
-        # 非発話時は Pre-buffer に追加
-        if not is_speech:
-            self.pre_buffer.append(pcm_bytes)
-
+        self.pending.extend(pcm_bytes)
+        frame_bytes = self.frame_samples * 2
+        completed = []
+        offset = 0
+        while len(self.pending) - offset >= frame_bytes:
+            frame = bytes(self.pending[offset : offset + frame_bytes])
+            offset += frame_bytes
+
+            # VAD判定
+            _, speech_prob = self.vad_adapter.predict(
+                frame, self.sample_rate, self.threshold
+            )
+            segment = self.segmenter.push_frame(frame, speech_prob)
+            if segment is not None:
+                completed.append(segment.audio)
+        del self.pending[:offset]
+
+        if completed:
+            return b"".join(completed)
         return None
 
     def flush(self) -> Optional[bytes]:
         """
         残っている発話データを強制的に返す（ストリーム終了時など）
         """
-        if self.is_speaking and self.speech_chunks:
-            complete_speech = b"".join(self.speech_chunks)
-            self.speech_chunks = []
-            self.is_speaking = False
-            return complete_speech
-        return None
+        segment = self.segmenter.flush()
+        self.pending.clear()
+        return segment.audio if segment is not None else None
 
     def reset(self):
         """
         内部状態をリセット
         """
-        self.pre_buffer.clear()
-        self.speech_chunks = []
-        self.is_speaking = False
+        self.segmenter.reset()
+        self.pending.clear()
 
 
 def vad_predict_enhanced(
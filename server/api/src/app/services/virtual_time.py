@@ -0,0 +1,56 @@
+from typing import Optional
+
+from app.services.timer_scheduler import TimerScheduler
+
+
+class VirtualClock:
+    """手動で進める時計（シミュレーション・テスト用）"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class VirtualTimerScheduler(TimerScheduler):
+    """
+    仮想時刻で動く TimerScheduler
+
+    駆動タスクを持たず、advance() / advance_to() で時計を進めた分のタイマーを
+    期限順に発火させる（コールバック実行中の clock() はそのタイマーの期限。
+    コルーチンのコールバックも終わるまで待ってから時計を進める）。
+    実際には待たないので、数千セッション分のタイムアウトを一瞬で再現できる。
+    """
+
+    def __init__(self, clock: Optional[VirtualClock] = None):
+        super().__init__(clock=clock or VirtualClock())
+
+    async def advance(self, seconds: float) -> int:
+        """時計を seconds 秒進める"""
+        return await self.advance_to(self.clock.now + seconds)
+
+    async def advance_to(self, deadline: float) -> int:
+        """
+        時計を deadline まで進め、その間に期限を迎えるタイマーを発火させる
+
+        Returns:
+            int: 実行したタイマー数
+        """
+        fired = 0
+        while True:
+            next_deadline = self.next_deadline()
+            if next_deadline is None or next_deadline > deadline:
+                break
+            self.clock.now = max(self.clock.now, next_deadline)
+            fired += await self.run_due()
+            await self.wait_callbacks()
+        self.clock.now = max(self.clock.now, deadline)
+        return fired
+
+    def _ensure_running(self):
+        # 駆動は advance() で行う
+        pass
@@ -6,6 +6,8 @@ class Settings(BaseSettings):
     model_config = ConfigDict(env_file=".env", extra="ignore")
 
     OPENAI_API_KEY: str
+    # OpenAI 互換 API の URL（ローカルの fake_openai.py 等。空なら OpenAI の API）
+    OPENAI_BASE_URL: str = ""
     # 必要に応じて他の環境変数もここに追加
     # 例: DATABASE_URL: str = "sqlite:///:memory:"
 
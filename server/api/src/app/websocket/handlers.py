@@ -2,14 +2,42 @@ import json
 import logging
 import time
 import os
+import socket
 import wave
-from typing import Dict
+from typing import Dict, Optional
 import io
 import asyncio
 from datetime import datetime
 
 from fastapi import WebSocket, WebSocketDisconnect
 from app.services.vad_chunk import VADProcessor
+from app.services.segmenter import Segment, Segmenter
+from app.services.segment_timing import SegmentTimingTracker, SegmentTrace
+from app.services.segment_merger import SegmentMerger
+from app.services.merge_policy import AdaptiveMergePolicy
+from app.services.timer_scheduler import TimerHandle, TimerScheduler
+from app.services.session_directory import (
+    SessionInfo,
+    create_session_directory,
+    new_session_id,
+)
+from app.services.audio_archiver import AudioArchiver
+from app.services.audio_codecs import check_codec
+from app.services.audio_retention import AudioRetentionManager
+from app.services.audio_writer import AudioSegmentWriter
+from app.services.ingest_recorder import KIND_AUDIO, KIND_TEXT, IngestRecorder
+from app.services.interim_transcription import InterimTranscriber, InterimRequest
+from app.services.admission import (
+    AdmissionController,
+    AdmissionDecision,
+    LoadLevel,
+    LoadSignals,
+)
+from app.services.backend_health import BackendHealthCache
+from app.services.liveness import LivenessMonitor
+from app.services.loop_monitor import get_loop_monitor
+from app.services import metrics
+from app.services.session_resume import SessionResumeRegistry
 from app.adapters.transcription import TranscriptionAdapter
 from app.adapters.vad import VADAdapter
 from app.schemas.websocket import (
@@ -20,8 +48,119 @@ from app.schemas.websocket import (
 
 logger = logging.getLogger(__name__)
 
-AUDIO_SEGMENTS_DIR = "audio_segments"
-os.makedirs(AUDIO_SEGMENTS_DIR, exist_ok=True)
+AUDIO_SEGMENTS_DIR = os.getenv("AUDIO_SEGMENTS_DIR", "audio_segments")
+
+# マルチワーカー設定（ワーカー間で状態は共有せず、セッションの所有者だけを共有する）
+WORKER_ID = os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+WORKER_URL = os.getenv("WORKER_URL", "")  # このワーカーに直接接続するURL
+SESSION_DIRECTORY_URL = os.getenv("SESSION_DIRECTORY_URL", "")  # 空の場合はプロセス内
+SESSION_DIRECTORY_TTL_SECONDS = float(os.getenv("SESSION_DIRECTORY_TTL", "60"))
+SESSION_DIRECTORY_TIMEOUT_SECONDS = float(os.getenv("SESSION_DIRECTORY_TIMEOUT", "2"))
+CLOSE_CODE_SESSION_REDIRECT = 4302  # 別のワーカーが所有するセッション
+CLOSE_CODE_TRY_AGAIN_LATER = 1013  # 過負荷のため新規セッションを拒否
+CLOSE_CODE_SESSION_TAKEN_OVER = 4001  # 再接続した新しい接続にセッションを引き継いだ
+CLOSE_CODE_SERVICE_RESTART = 1012  # 停止のため接続を閉じる（別のワーカーに再接続する）
+CLOSE_CODE_LIVENESS_TIMEOUT = 4408  # pong・音声が届かないため切断
+
+# 死活監視（各タイムアウトは 0 で無効）
+LIVENESS_PING_INTERVAL_SECONDS = float(
+    os.getenv("LIVENESS_PING_INTERVAL", "5")
+)  # この時間受信がなければ ping を送る
+LIVENESS_PONG_TIMEOUT_SECONDS = float(os.getenv("LIVENESS_PONG_TIMEOUT", "5"))
+LIVENESS_IDLE_TIMEOUT_SECONDS = float(
+    os.getenv("LIVENESS_IDLE_TIMEOUT", "300")
+)  # 音声が届かないセッションを切断するまでの時間
+LIVENESS_SWEEP_INTERVAL_SECONDS = float(os.getenv("LIVENESS_SWEEP_INTERVAL", "1"))
+
+# transcription_result に処理段階毎の時間（timings）を付ける
+# （全セッションで有効にする。接続時の ?timings=1 でセッション毎にも有効にできる）
+RESULT_TIMINGS_ENABLED = os.getenv("RESULT_TIMINGS", "false").lower() == "true"
+
+# 停止時のドレイン（保留中の文字起こしを待つ上限）
+SHUTDOWN_DRAIN_TIMEOUT_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "25"))
+
+# readiness（ロードバランサーへの振り分け可否）
+READINESS_HEALTH_TTL_SECONDS = float(
+    os.getenv("READINESS_HEALTH_TTL", "30")
+)  # この時間より古いヘルスチェック結果は使わない
+READINESS_HEALTH_REFRESH_SECONDS = float(os.getenv("READINESS_HEALTH_REFRESH", "10"))
+READINESS_HEALTH_TIMEOUT_SECONDS = float(os.getenv("READINESS_HEALTH_TIMEOUT", "5"))
+READINESS_MAX_UTILIZATION = float(
+    os.getenv("READINESS_MAX_UTILIZATION", "0.7")
+)  # 受け付け制御の上限に対する使用率（負荷軽減が始まる前に振り分けを止める）
+
+# 再接続（猶予時間 0 で無効）
+RESUME_GRACE_SECONDS = float(
+    os.getenv("RESUME_GRACE_SECONDS", "30")
+)  # 異常切断後にセッションを保持する時間
+RESUME_REPLAY_MESSAGES = int(
+    os.getenv("RESUME_REPLAY_MESSAGES", "64")
+)  # 再接続時に再送できる結果メッセージ数
+# 利用者が意図して閉じた場合のクローズコード（猶予なしでセッションを終了）
+FINAL_CLOSE_CODES = {1000, 1001, 1005}
+
+# 受け付け制御（各上限は 0 で無効）
+ADMISSION_MAX_SESSIONS = int(os.getenv("ADMISSION_MAX_SESSIONS", "200"))
+ADMISSION_MAX_LOOP_LAG_SECONDS = float(os.getenv("ADMISSION_MAX_LOOP_LAG", "0.25"))
+ADMISSION_MAX_VAD_QUEUE = int(os.getenv("ADMISSION_MAX_VAD_QUEUE", "2048"))  # フレーム
+ADMISSION_MAX_TRANSCRIPTIONS = int(os.getenv("ADMISSION_MAX_TRANSCRIPTIONS", "64"))
+ADMISSION_SHED_RATIO = float(
+    os.getenv("ADMISSION_SHED_RATIO", "0.8")
+)  # この使用率から任意の処理を省く
+ADMISSION_RETRY_AFTER_SECONDS = float(os.getenv("ADMISSION_RETRY_AFTER", "5"))
+
+# 音声保存設定
+AUDIO_RETENTION_ENABLED = os.getenv("AUDIO_RETENTION", "true").lower() == "true"
+AUDIO_WRITE_QUEUE_SIZE = int(os.getenv("AUDIO_WRITE_QUEUE_SIZE", "256"))
+AUDIO_WRITE_QUEUE_MAX_BYTES = int(
+    float(os.getenv("AUDIO_WRITE_QUEUE_MAX_MB", "64")) * 1024 * 1024
+)  # 書き込み待ちの上限（超えた分は破棄）
+AUDIO_FSYNC_BATCH_SIZE = int(os.getenv("AUDIO_FSYNC_BATCH", "16"))
+
+# 保存音声の上限（0 は無制限）
+AUDIO_MAX_TOTAL_BYTES = int(
+    float(os.getenv("AUDIO_MAX_TOTAL_MB", "0")) * 1024 * 1024
+)  # 合計サイズ
+AUDIO_MAX_AGE_SECONDS = float(os.getenv("AUDIO_MAX_AGE_HOURS", "0")) * 3600
+AUDIO_MAX_SESSIONS = int(os.getenv("AUDIO_MAX_SESSIONS", "0"))
+AUDIO_RETENTION_INTERVAL_SECONDS = float(
+    os.getenv("AUDIO_RETENTION_INTERVAL", "60")
+)  # 上限を定期適用する間隔
+
+# 保存音声のアーカイブ（flac / opus / zlib、空の場合は圧縮しない）
+AUDIO_ARCHIVE_CODEC = os.getenv("AUDIO_ARCHIVE_CODEC", "").lower()
+AUDIO_ARCHIVE_LEVEL = int(os.getenv("AUDIO_ARCHIVE_LEVEL", "6"))
+AUDIO_ARCHIVE_WORKERS = int(os.getenv("AUDIO_ARCHIVE_WORKERS", "1"))
+
+if AUDIO_RETENTION_ENABLED:
+    os.makedirs(AUDIO_SEGMENTS_DIR, exist_ok=True)
+
+
+def resolve_archive_codec(codec: str) -> str:
+    """
+    アーカイブのコーデックが使えるか起動時に確認する
+    使えない場合（未知のコーデック・soundfile がない等）は警告して zlib にする
+    （閉じたセッションごとに失敗し続けないように）
+    """
+    try:
+        check_codec(codec)
+        return codec
+    except (ValueError, RuntimeError) as e:
+        logger.warning(
+            f"[Archiver] Codec {codec!r} is not available ({e}), using zlib instead"
+        )
+        return "zlib"
+
+
+# 受信ログ（受信したメッセージを受信時刻付きで記録し、src/ingest_replay.py で再生する）
+INGEST_RECORD_ENABLED = os.getenv("INGEST_RECORD", "false").lower() == "true"
+INGEST_RECORD_DIR = os.getenv("INGEST_RECORD_DIR", "ingest_logs")
+INGEST_RECORD_RATIO = float(
+    os.getenv("INGEST_RECORD_RATIO", "1.0")
+)  # 記録するセッションの割合
+INGEST_RECORD_MAX_QUEUE_BYTES = int(
+    float(os.getenv("INGEST_RECORD_MAX_QUEUE_MB", "64")) * 1024 * 1024
+)  # 書き込み待ちの上限（超えたセッションは記録を打ち切る）
 
 VAD_FRAME_SIZE = 512  # 16kHz, 16bit, モノラル: 512サンプル = 1024バイト
 SAMPLE_RATE = 16000
@@ -40,211 +179,118 @@ logger.info(
     f"[VAD Config] Silence tolerance: {VAD_SILENCE_TOLERANCE_SECONDS}s ({VAD_SILENCE_FRAME_THRESHOLD} frames)"
 )
 
+# 発話区間検出（Segmenter）設定
+VAD_ONSET_THRESHOLD = float(os.getenv("VAD_THRESHOLD", "0.5"))  # 発話開始の閾値
+VAD_OFFSET_THRESHOLD = float(
+    os.getenv("VAD_OFFSET_THRESHOLD", str(min(0.35, VAD_ONSET_THRESHOLD)))
+)  # 発話継続の閾値（ヒステリシス）
+VAD_MIN_SPEECH_SECONDS = float(
+    os.getenv("MIN_SPEECH_DURATION", "0.25")
+)  # これ未満の発話は破棄
+VAD_PRE_ROLL_SECONDS = float(
+    os.getenv("VAD_PRE_ROLL", "0.3")
+)  # 発話開始前に含める音声の長さ
 
-class PendingSegment:
-    """保留中のセグメントデータ"""
+logger.info(
+    f"[VAD Config] Thresholds: onset={VAD_ONSET_THRESHOLD} offset={VAD_OFFSET_THRESHOLD}, "
+    f"min speech: {VAD_MIN_SPEECH_SECONDS}s, pre-roll: {VAD_PRE_ROLL_SECONDS}s"
+)
 
-    def __init__(self, segment_id: int, audio_data: bytes, timestamp: float):
-        self.segment_id = segment_id
-        self.audio_data = audio_data
-        self.timestamp = timestamp
-        self.duration = len(audio_data) // SAMPLE_WIDTH / SAMPLE_RATE
+# 最大セグメント長設定
+MAX_SEGMENT_DURATION_SECONDS = float(
+    os.getenv("MAX_SPEECH_DURATION", "30.0")
+)  # この長さに達した発話は強制的に区切る
+MAX_SEGMENT_LOOKBACK_SECONDS = float(
+    os.getenv("MAX_SPEECH_SPLIT_LOOKBACK", "2.0")
+)  # 区切り位置を探す直前の区間
+MAX_SEGMENT_FRAMES = int(MAX_SEGMENT_DURATION_SECONDS * SAMPLE_RATE / VAD_FRAME_SIZE)
+MAX_SEGMENT_LOOKBACK_FRAMES = max(
+    1, int(MAX_SEGMENT_LOOKBACK_SECONDS * SAMPLE_RATE / VAD_FRAME_SIZE)
+)
 
+logger.info(
+    f"[VAD Config] Max segment duration: {MAX_SEGMENT_DURATION_SECONDS}s "
+    f"(split look-back: {MAX_SEGMENT_LOOKBACK_SECONDS}s)"
+)
 
-class SegmentMerger:
-    """
-    遅延バッファリング方式でセグメントを結合するクラス
-    短いセグメントを一定時間待機して、次のセグメントと結合判定を行う
+# セグメント結合設定
+SEGMENT_MERGE_TIMEOUT_SECONDS = float(
+    os.getenv("SEGMENT_MERGE_TIMEOUT", "2.0")
+)  # 結合待機時間の上限（遅延の上限）
+MIN_MERGE_DURATION_SECONDS = float(
+    os.getenv("MIN_MERGE_DURATION", "0.8")
+)  # この時間未満のセグメントは結合対象
+ADAPTIVE_MERGE_ENABLED = os.getenv("ADAPTIVE_MERGE", "true").lower() == "true"
+MERGE_TARGET_PROBABILITY = float(
+    os.getenv("MERGE_TARGET_PROBABILITY", "0.9")
+)  # 上限内に来る次セグメントのうち、待機で拾う割合
+MERGE_MIN_TIMEOUT_SECONDS = float(
+    os.getenv("MERGE_MIN_TIMEOUT", "0.3")
+)  # 結合待機時間の下限
+
+# 途中結果（is_final=False）設定
+INTERIM_RESULTS_ENABLED = os.getenv("INTERIM_RESULTS", "false").lower() == "true"
+INTERIM_INTERVAL_SECONDS = float(
+    os.getenv("INTERIM_INTERVAL", "1.0")
+)  # 途中結果の更新間隔（音声秒数）
+INTERIM_WINDOW_SECONDS = float(
+    os.getenv("INTERIM_WINDOW", "8.0")
+)  # 一度に送信する未確定音声の最大長
+INTERIM_SESSION_BUDGET_SECONDS = float(
+    os.getenv("INTERIM_SESSION_BUDGET", "300.0")
+)  # セッション毎に途中結果で送信できる音声の合計秒数
+
+
+def create_segmenter() -> Segmenter:
+    """設定値に従ってクライアント用の Segmenter を生成"""
+    return Segmenter(
+        frame_size=VAD_FRAME_SIZE,
+        onset_threshold=VAD_ONSET_THRESHOLD,
+        offset_threshold=VAD_OFFSET_THRESHOLD,
+        min_speech_frames=max(
+            1, int(VAD_MIN_SPEECH_SECONDS * SAMPLE_RATE / VAD_FRAME_SIZE)
+        ),
+        min_silence_frames=VAD_SILENCE_FRAME_THRESHOLD,
+        pre_roll_frames=int(VAD_PRE_ROLL_SECONDS * SAMPLE_RATE / VAD_FRAME_SIZE),
+        max_segment_frames=MAX_SEGMENT_FRAMES,
+        split_lookback_frames=MAX_SEGMENT_LOOKBACK_FRAMES,
+    )
+
+
+def ingest_log_header() -> dict:
+    """受信ログのヘッダー（再生時に同じ条件か確認するための設定値）"""
+    return {
+        "worker_id": WORKER_ID,
+        "sample_rate": SAMPLE_RATE,
+        "sample_width": SAMPLE_WIDTH,
+        "vad_frame_size": VAD_FRAME_SIZE,
+    }
+
+
+def split_frames(buf: bytearray) -> tuple[list[bytes], bytearray]:
     """
+    PCMバッファをVADフレームに分割する
 
-    def __init__(self, merge_timeout: float = 2.0, min_merge_duration: float = 0.8):
-        self.merge_timeout = merge_timeout  # 結合待機時間（秒）
-        self.min_merge_duration = min_merge_duration  # この時間未満は結合対象
-        self.pending_segments: Dict[
-            str, PendingSegment
-        ] = {}  # クライアント毎の保留セグメント
-        self.pending_tasks: Dict[str, asyncio.Task] = {}  # 遅延処理タスク
-
-    async def process_segment(
-        self,
-        segment_id: int,
-        audio_data: bytes,
-        client_id: str,
-        transcription_callback,
-        error_callback,
-    ) -> bool:
-        """
-        セグメントを処理し、結合するかすぐに文字起こしするかを判定
-
-        Returns:
-            bool: True=即座に処理, False=結合待機中
-        """
-        current_time = time.time()
-        duration = len(audio_data) // SAMPLE_WIDTH / SAMPLE_RATE
-
-        # 前の保留セグメントがあるかチェック
-        if client_id in self.pending_segments:
-            prev_segment = self.pending_segments[client_id]
-            time_gap = current_time - prev_segment.timestamp
-
-            # 前のセグメントが短く、時間間隔が短い場合は結合
-            if (
-                prev_segment.duration < self.min_merge_duration
-                and time_gap < self.merge_timeout
-            ):
-                logger.info(
-                    f"[SegmentMerger] Merging segment {prev_segment.segment_id} + {segment_id} "
-                    f"(gap: {time_gap:.2f}s, prev_duration: {prev_segment.duration:.2f}s)"
-                )
-
-                # 前のタスクをキャンセル
-                if client_id in self.pending_tasks:
-                    self.pending_tasks[client_id].cancel()
-                    del self.pending_tasks[client_id]
-
-                # セグメントを結合
-                merged_audio = prev_segment.audio_data + audio_data
-                merged_segment = PendingSegment(
-                    prev_segment.segment_id, merged_audio, prev_segment.timestamp
-                )
-
-                # 結合後のセグメントを処理
-                del self.pending_segments[client_id]
-                return await self._process_merged_segment(
-                    merged_segment, client_id, transcription_callback, error_callback
-                )
-            else:
-                # 前のセグメントを即座に処理（結合しない）
-                await self._flush_pending_segment(
-                    client_id, transcription_callback, error_callback
-                )
-
-        # 現在のセグメントが短い場合は保留
-        if duration < self.min_merge_duration:
-            logger.info(
-                f"[SegmentMerger] Holding segment {segment_id} for potential merge "
-                f"(duration: {duration:.2f}s < {self.min_merge_duration}s)"
-            )
-
-            self.pending_segments[client_id] = PendingSegment(
-                segment_id, audio_data, current_time
-            )
-
-            # 遅延処理タスクを開始
-            self.pending_tasks[client_id] = asyncio.create_task(
-                self._delayed_process(client_id, transcription_callback, error_callback)
-            )
-            return False
-        else:
-            # 長いセグメントは即座に処理
-            logger.info(
-                f"[SegmentMerger] Processing segment {segment_id} immediately (duration: {duration:.2f}s)"
-            )
-            await transcription_callback(audio_data, segment_id)
-            return True
-
-    async def _process_merged_segment(
-        self,
-        merged_segment: PendingSegment,
-        client_id: str,
-        transcription_callback,
-        error_callback,
-    ) -> bool:
-        """結合されたセグメントを処理"""
-        duration = merged_segment.duration
-
-        # 結合後も短い場合は再度保留
-        if duration < self.min_merge_duration:
-            logger.info(
-                f"[SegmentMerger] Merged segment still short, holding again "
-                f"(duration: {duration:.2f}s)"
-            )
-            self.pending_segments[client_id] = merged_segment
-            self.pending_tasks[client_id] = asyncio.create_task(
-                self._delayed_process(client_id, transcription_callback, error_callback)
-            )
-            return False
-        else:
-            # 十分な長さになったので処理
-            logger.info(
-                f"[SegmentMerger] Processing merged segment {merged_segment.segment_id} "
-                f"(final duration: {duration:.2f}s)"
-            )
-            await transcription_callback(
-                merged_segment.audio_data, merged_segment.segment_id
-            )
-            return True
-
-    async def _delayed_process(
-        self, client_id: str, transcription_callback, error_callback
-    ):
-        """遅延後にセグメントを処理"""
-        try:
-            await asyncio.sleep(self.merge_timeout)
-
-            if client_id in self.pending_segments:
-                segment = self.pending_segments[client_id]
-                logger.info(
-                    f"[SegmentMerger] Timeout reached, processing pending segment {segment.segment_id} "
-                    f"(duration: {segment.duration:.2f}s)"
-                )
-                del self.pending_segments[client_id]
-                await transcription_callback(segment.audio_data, segment.segment_id)
-
-            if client_id in self.pending_tasks:
-                del self.pending_tasks[client_id]
-
-        except asyncio.CancelledError:
-            logger.info(
-                f"[SegmentMerger] Delayed processing cancelled for client {client_id}"
-            )
-        except Exception as e:
-            logger.error(f"[SegmentMerger] Error in delayed processing: {e}")
-            await error_callback(e)
-
-    async def _flush_pending_segment(
-        self, client_id: str, transcription_callback, error_callback
-    ):
-        """保留中のセグメントを即座に処理"""
-        if client_id in self.pending_segments:
-            segment = self.pending_segments[client_id]
-            logger.info(
-                f"[SegmentMerger] Flushing pending segment {segment.segment_id}"
-            )
-
-            # タスクをキャンセル
-            if client_id in self.pending_tasks:
-                self.pending_tasks[client_id].cancel()
-                del self.pending_tasks[client_id]
-
-            del self.pending_segments[client_id]
-            await transcription_callback(segment.audio_data, segment.segment_id)
-
-    async def flush_client(
-        self, client_id: str, transcription_callback, error_callback
-    ):
-        """クライアント切断時に保留中のセグメントを処理"""
-        if client_id in self.pending_segments:
-            await self._flush_pending_segment(
-                client_id, transcription_callback, error_callback
-            )
-
-    def cleanup_client(self, client_id: str):
-        """クライアント用のリソースをクリーンアップ"""
-        if client_id in self.pending_tasks:
-            self.pending_tasks[client_id].cancel()
-            del self.pending_tasks[client_id]
-
-        if client_id in self.pending_segments:
-            del self.pending_segments[client_id]
-
-
-def save_pcm_as_wav(pcm_bytes: bytes, filepath: str):
-    with wave.open(filepath, "wb") as wf:
+    Returns:
+        tuple[list[bytes], bytearray]: フレームと、フレームに満たない余り
+    """
+    frame_bytes = VAD_FRAME_SIZE * SAMPLE_WIDTH
+    end = len(buf) - len(buf) % frame_bytes
+    frames = [
+        bytes(buf[start : start + frame_bytes]) for start in range(0, end, frame_bytes)
+    ]
+    return frames, buf[end:]
+
+
+def pcm_to_wav_bytes(pcm_bytes: bytes) -> bytes:
+    """PCMデータをWAV形式bytesに変換"""
+    wav_buffer = io.BytesIO()
+    with wave.open(wav_buffer, "wb") as wf:
         wf.setnchannels(CHANNELS)
         wf.setsampwidth(SAMPLE_WIDTH)
         wf.setframerate(SAMPLE_RATE)
         wf.writeframes(pcm_bytes)
+    return wav_buffer.getvalue()
 
 
 class ConnectionManager:
@@ -256,22 +302,34 @@ class ConnectionManager:
         vad_adapter: VADAdapter,
         use_vad_processor: bool = False,
         use_segment_merger: bool = True,
+        use_interim_results: bool = False,
+        scheduler: Optional[TimerScheduler] = None,
     ):
+        """
+        :param scheduler: 全クライアント共有のタイマー。発話終了・確定・結合待ち・文字起こし開始の
+            時刻もこの clock で測る（シミュレーションでは VirtualTimerScheduler を渡す）
+        """
+        self.timer_scheduler = scheduler or TimerScheduler()
+        self.clock = self.timer_scheduler.clock
         self.transcription_adapter = transcription_adapter
         self.vad_adapter = vad_adapter
         self.active_connections: Dict[str, WebSocket] = {}
         self.audio_data_count: Dict[str, int] = {}
         # VAD用バッファ・状態
-        self.speech_buffer: Dict[str, bytearray] = {}
-        self.in_speech: Dict[str, bool] = {}
+        self.segmenters: Dict[str, Segmenter] = {}  # クライアント毎の発話区間検出
         self.segment_count: Dict[str, int] = {}
         self.pcm_buffer: Dict[str, bytearray] = {}  # PCMバッファ（VADフレーム分割用）
-        self.silence_frame_count: Dict[str, int] = {}  # 連続無音フレーム数
-
-        # クライアント毎のディレクトリ管理
-        self.client_directories: Dict[
+        self.last_speech_at: Dict[
+            str, float
+        ] = {}  # 最後の発話フレームを受信した時刻（clock）
+        self.segment_timings = SegmentTimingTracker(
+            clock=self.clock
+        )  # timings を返すセッションのみ記録
+
+        # クライアント毎の音声コンテナ管理
+        self.session_paths: Dict[
             str, str
-        ] = {}  # クライアントIDごとの保存ディレクトリパス
+        ] = {}  # クライアントIDごとの音声コンテナのベースパス（拡張子なし）
         self.connection_timestamps: Dict[str, str] = {}  # 接続時刻の記録
 
         # モデル選択管理
@@ -287,39 +345,162 @@ class ConnectionManager:
 
         # セグメント結合機能
         self.use_segment_merger = use_segment_merger
+        self.draining = False  # 停止処理中（新規接続・音声を受け付けない）
+
+        # 再接続用のセッション保持
+        self.session_resume = SessionResumeRegistry(
+            self.timer_scheduler,
+            grace_seconds=RESUME_GRACE_SECONDS,
+            replay_size=RESUME_REPLAY_MESSAGES,
+        )
+
+        # 死活監視（半開きの接続を回収する）
+        self.liveness = LivenessMonitor(
+            ping_interval=LIVENESS_PING_INTERVAL_SECONDS,
+            pong_timeout=LIVENESS_PONG_TIMEOUT_SECONDS,
+            idle_timeout=LIVENESS_IDLE_TIMEOUT_SECONDS,
+            clock=self.clock,
+        )
+        self._reaper: Optional[TimerHandle] = None
+
+        # 負荷の監視と受け付け制御
+        self.loop_monitor = get_loop_monitor()  # 起動時から動いているものを共有
+        self.transcription_tasks: set[asyncio.Task] = set()  # 実行中の文字起こし
+        self.admission = AdmissionController(
+            signals=self.load_signals,
+            max_sessions=ADMISSION_MAX_SESSIONS,
+            max_loop_lag=ADMISSION_MAX_LOOP_LAG_SECONDS,
+            max_vad_queue=ADMISSION_MAX_VAD_QUEUE,
+            max_transcription_backlog=ADMISSION_MAX_TRANSCRIPTIONS,
+            shed_ratio=ADMISSION_SHED_RATIO,
+            retry_after=ADMISSION_RETRY_AFTER_SECONDS,
+        )
+
+        # readiness（モデルのウォームアップとバックエンドのヘルスチェック）
+        self.warmed = False
+        self.backend_health = BackendHealthCache(
+            {
+                "vad": vad_adapter.health_check,
+                "transcription": transcription_adapter.health_check,
+            },
+            ttl=READINESS_HEALTH_TTL_SECONDS,
+            refresh_interval=READINESS_HEALTH_REFRESH_SECONDS,
+            timeout=READINESS_HEALTH_TIMEOUT_SECONDS,
+        )
+
+        # セッションディレクトリ（どのワーカーがセッションを持っているか）
+        self.worker_id = WORKER_ID
+        self.session_directory = create_session_directory(
+            SESSION_DIRECTORY_URL, timeout=SESSION_DIRECTORY_TIMEOUT_SECONDS
+        )
+        self._directory_refresh: Optional[asyncio.Task] = None
         self.segment_merger = (
             SegmentMerger(
-                merge_timeout=2.0,  # 2秒待機
-                min_merge_duration=0.8,  # 0.8秒未満は結合対象
+                merge_timeout=SEGMENT_MERGE_TIMEOUT_SECONDS,
+                min_merge_duration=MIN_MERGE_DURATION_SECONDS,
+                scheduler=self.timer_scheduler,
+                policy=(
+                    AdaptiveMergePolicy(
+                        default_timeout=SEGMENT_MERGE_TIMEOUT_SECONDS,
+                        min_timeout=MERGE_MIN_TIMEOUT_SECONDS,
+                        max_timeout=SEGMENT_MERGE_TIMEOUT_SECONDS,
+                        target_probability=MERGE_TARGET_PROBABILITY,
+                    )
+                    if ADAPTIVE_MERGE_ENABLED
+                    else None
+                ),
             )
             if use_segment_merger
             else None
         )
 
-    async def connect(self, websocket: WebSocket, client_id: str):
-        """新しいクライアント接続を受け入れる"""
+        # 音声セグメントの保存（バックグラウンドスレッド）
+        self.audio_retention = (
+            AudioRetentionManager(
+                AUDIO_SEGMENTS_DIR,
+                max_total_bytes=AUDIO_MAX_TOTAL_BYTES,
+                max_age_seconds=AUDIO_MAX_AGE_SECONDS,
+                max_sessions=AUDIO_MAX_SESSIONS,
+            )
+            if AUDIO_RETENTION_ENABLED
+            else None
+        )
+        self.audio_archiver = (
+            AudioArchiver(
+                codec=resolve_archive_codec(AUDIO_ARCHIVE_CODEC),
+                level=AUDIO_ARCHIVE_LEVEL,
+                max_workers=AUDIO_ARCHIVE_WORKERS,
+                on_done=self._on_session_archived,
+            )
+            if AUDIO_RETENTION_ENABLED and AUDIO_ARCHIVE_CODEC
+            else None
+        )
+        self.audio_writer = AudioSegmentWriter(
+            enabled=AUDIO_RETENTION_ENABLED,
+            max_queue_size=AUDIO_WRITE_QUEUE_SIZE,
+            max_queued_bytes=AUDIO_WRITE_QUEUE_MAX_BYTES,
+            fsync_batch_size=AUDIO_FSYNC_BATCH_SIZE,
+            retention=self.audio_retention,
+            retention_interval=AUDIO_RETENTION_INTERVAL_SECONDS,
+            archiver=self.audio_archiver,
+            sample_rate=SAMPLE_RATE,
+            channels=CHANNELS,
+            sample_width=SAMPLE_WIDTH,
+        )
+
+        # 受信ログ（再生による回帰確認用、バックグラウンドスレッドで書き込む）
+        self.ingest_recorder = IngestRecorder(
+            INGEST_RECORD_DIR,
+            enabled=INGEST_RECORD_ENABLED,
+            sample_ratio=INGEST_RECORD_RATIO,
+            max_queued_bytes=INGEST_RECORD_MAX_QUEUE_BYTES,
+        )
+
+        # 途中結果機能
+        self.interim_transcriber = (
+            InterimTranscriber(
+                interval_seconds=INTERIM_INTERVAL_SECONDS,
+                window_seconds=INTERIM_WINDOW_SECONDS,
+                session_budget_seconds=INTERIM_SESSION_BUDGET_SECONDS,
+                sample_rate=SAMPLE_RATE,
+                sample_width=SAMPLE_WIDTH,
+            )
+            if use_interim_results
+            else None
+        )
+
+    async def connect(self, websocket: WebSocket, client_id: str) -> str:
+        """
+        新しいクライアント接続を受け入れる
+
+        Returns:
+            str: 再接続用のトークン
+        """
         await websocket.accept()
         self.active_connections[client_id] = websocket
+        resume_token = self.session_resume.create(client_id)
+        self.start_liveness(client_id)
+        if RESULT_TIMINGS_ENABLED or websocket.query_params.get("timings") in (
+            "1",
+            "true",
+        ):
+            self.segment_timings.enable(client_id)
         self.audio_data_count[client_id] = 0
-        self.speech_buffer[client_id] = bytearray()
-        self.in_speech[client_id] = False
+        self.segmenters[client_id] = create_segmenter()
+        self.ingest_recorder.start_session(client_id, ingest_log_header())
         self.segment_count[client_id] = 0
         self.pcm_buffer[client_id] = bytearray()
-        self.silence_frame_count[client_id] = 0  # 連続無音フレーム数を初期化
 
         # デフォルトモデルを設定
         self.client_models[client_id] = TranscriptionModel.GPT_4O_TRANSCRIBE
 
-        # 接続時刻を記録してクライアント専用ディレクトリを作成
+        # 接続時刻を記録してセッションの音声コンテナを決める
+        # （ファイルは書き込みスレッドが最初の保存時に作成する）
         connection_time = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.connection_timestamps[client_id] = connection_time
-        client_dir_name = f"{connection_time}_{client_id}"
-        client_dir_path = os.path.join(AUDIO_SEGMENTS_DIR, client_dir_name)
-        self.client_directories[client_id] = client_dir_path
-
-        # ディレクトリを作成
-        os.makedirs(client_dir_path, exist_ok=True)
-        logger.info(f"[Connection] Created audio directory: {client_dir_path}")
+        self.session_paths[client_id] = os.path.join(
+            AUDIO_SEGMENTS_DIR, f"{connection_time}_{client_id}"
+        )
 
         # VADProcessorを使用する場合は初期化
         if self.use_vad_processor:
@@ -327,11 +508,57 @@ class ConnectionManager:
                 vad_adapter=self.vad_adapter,
                 pre_buffer_duration=0.5,  # 500ms pre-buffer
                 threshold=0.3,  # より敏感な閾値
-                chunk_size_ms=100,  # 100ms単位で処理
+                chunk_size_ms=100,  # 100ms 続いたら発話開始・終了
+                frame_size=VAD_FRAME_SIZE,
             )
             logger.info(f"Client {client_id} connected with VADProcessor enabled")
         else:
             logger.info(f"Client {client_id} connected")
+        return resume_token
+
+    async def resume(
+        self, websocket: WebSocket, session_id: str, token: str, last_seq: int
+    ) -> Optional[list[dict]]:
+        """
+        既存のセッションに再接続する
+
+        Returns:
+            Optional[list[dict]]: 再送するメッセージ（再接続できない場合は None）
+        """
+        if session_id not in self.segmenters:
+            return None
+        replay = self.session_resume.reattach(session_id, token, last_seq)
+        if replay is None:
+            return None
+
+        await websocket.accept()
+        previous = self.active_connections.get(session_id)
+        self.active_connections[session_id] = websocket
+        self.start_liveness(session_id)
+        if previous is not None and previous is not websocket:
+            # 切断を検知していない古い接続は閉じる
+            try:
+                await previous.close(code=CLOSE_CODE_SESSION_TAKEN_OVER)
+            except Exception:
+                pass
+        logger.info(
+            f"[Resume] Session {session_id} resumed, replaying {len(replay)} messages"
+        )
+        return replay
+
+    async def connection_lost(self, client_id: str, websocket: WebSocket, final: bool):
+        """
+        接続が切れた時の処理
+        意図しない切断の場合は猶予時間だけセッションを保持し、再接続を待つ
+        """
+        if self.active_connections.get(client_id) is not websocket:
+            # 既に新しい接続に引き継がれている、または終了済み
+            return
+        if not final and self.session_resume.detach(client_id, self.async_disconnect):
+            del self.active_connections[client_id]
+            self.liveness.unregister(client_id)
+            return
+        await self.async_disconnect(client_id)
 
     def disconnect(self, client_id: str):
         """クライアント接続を切断する"""
@@ -349,27 +576,31 @@ class ConnectionManager:
             del self.audio_data_count[client_id]
 
         # 切断時にバッファが残っていれば保存
-        if (
-            self.in_speech.get(client_id, False)
-            and len(self.speech_buffer.get(client_id, b"")) > 0
-        ):
+        segmenter = self.segmenters.get(client_id)
+        segment = segmenter.flush() if segmenter else None
+        if segment is not None:
             self.segment_count[client_id] = self.segment_count.get(client_id, 0) + 1
-            filename = f"segment_{self.segment_count[client_id]:04d}.wav"
+            self.save_segment(client_id, self.segment_count[client_id], segment.audio)
+            logger.info(
+                f"[VAD] (disconnect) Queued last segment for client {client_id}"
+            )
+
+        # 音声コンテナを閉じる（書き込み済みの分の後に処理される）
+        if client_id in self.session_paths:
+            self.audio_writer.close_session(self.session_paths[client_id])
 
-            # クライアント専用ディレクトリに保存
-            client_dir = self.client_directories.get(client_id, AUDIO_SEGMENTS_DIR)
-            filepath = os.path.join(client_dir, filename)
-            save_pcm_as_wav(self.speech_buffer[client_id], filepath)
-            logger.info(f"[VAD] (disconnect) Saved segment: {filepath}")
+        self.session_resume.remove(client_id)
+        self.liveness.unregister(client_id)
+        self.segment_timings.cleanup_client(client_id)
+        self.ingest_recorder.end_session(client_id)
 
         # 全てのバッファとステートを削除
         for d in [
-            self.speech_buffer,
-            self.in_speech,
+            self.segmenters,
             self.segment_count,
             self.pcm_buffer,
-            self.silence_frame_count,  # 連続無音フレーム数もクリーンアップ
-            self.client_directories,  # クライアント専用ディレクトリ情報
+            self.last_speech_at,
+            self.session_paths,  # 音声コンテナ情報
             self.connection_timestamps,  # 接続時刻情報
             self.client_models,  # クライアント毎のモデル設定
         ]:
@@ -391,45 +622,222 @@ class ConnectionManager:
             except Exception as e:
                 logger.error(f"[Disconnect] Error cleaning up SegmentMerger: {e}")
 
+        if self.interim_transcriber:
+            self.interim_transcriber.cleanup_client(client_id)
+
         logger.info(f"[Disconnect] Client {client_id} disconnected and cleaned up")
 
-    async def async_disconnect(self, client_id: str):
-        """非同期でクライアント接続を切断し、保留中のセグメントも処理する"""
+    def start_liveness(self, client_id: str):
+        """セッションを死活監視に登録し、巡回タイマーを動かす"""
+        if not self.liveness.enabled:
+            return
+        self.liveness.register(client_id)
+        if self._reaper is None:
+            self._reaper = self.timer_scheduler.call_later(
+                LIVENESS_SWEEP_INTERVAL_SECONDS, self._reap
+            )
+
+    async def _reap(self):
+        """ping を送り、応答・音声が途絶えたセッションを回収する"""
+        self._reaper = None
+        result = self.liveness.sweep()
+        for client_id, nonce in result.to_ping:
+            await self.send_json_message(
+                {"type": "ping", "nonce": nonce, "timestamp": time.time()}, client_id
+            )
+        for client_id, reason in result.dead:
+            websocket = self.active_connections.get(client_id)
+            reclaimed = self.session_memory_bytes(client_id)
+            self.liveness.record_reclaimed(reclaimed)
+            metrics.RECLAIMED_BYTES_TOTAL.inc(reclaimed)
+            logger.warning(
+                f"[Liveness] Reaping client {client_id} ({reason}, {reclaimed} bytes)"
+            )
+            await self.async_disconnect(client_id)
+            if websocket is not None:
+                try:
+                    await websocket.close(
+                        code=CLOSE_CODE_LIVENESS_TIMEOUT, reason=reason
+                    )
+                except Exception:
+                    pass
+        if self.liveness.sessions:
+            self._reaper = self.timer_scheduler.call_later(
+                LIVENESS_SWEEP_INTERVAL_SECONDS, self._reap
+            )
+
+    def session_memory_bytes(self, client_id: str) -> int:
+        """
+        セッションが保持している音声のおおよそのバイト数
+        （Segmenter は確保済みの容量ではなく、発話中に溜まっている分を数える）
+        """
+        total = len(self.pcm_buffer.get(client_id, b""))
+        segmenter = self.segmenters.get(client_id)
+        if segmenter:
+            total += segmenter.buffered_bytes
+        if self.segment_merger:
+            pending = self.segment_merger.pending_segments.get(client_id)
+            if pending:
+                total += len(pending.audio_data)
+        return total
+
+    def load_signals(self) -> LoadSignals:
+        """受け付け制御に使う現在の負荷"""
+        return LoadSignals(
+            active_sessions=len(self.active_connections),
+            loop_lag=self.loop_monitor.lag,
+            vad_queue_depth=getattr(self.vad_adapter, "queue_depth", 0),
+            transcription_backlog=len(self.transcription_tasks),
+        )
+
+    async def warm_up(self):
+        """モデルを温め、バックエンドを確認してから readiness を有効にする"""
+        started = time.perf_counter()
+        await self.vad_adapter.warm_up()
+        await self.transcription_adapter.warm_up()
+        await self.backend_health.refresh_all()
+        self.backend_health.start()
+        self.warmed = True
         logger.info(
-            f"[AsyncDisconnect] Starting async disconnect process for client {client_id}"
+            f"[Readiness] Warmed up in {time.perf_counter() - started:.2f}s "
+            f"(unhealthy backends: {self.backend_health.unhealthy() or 'none'})"
         )
 
-        # SegmentMergerの保留中セグメントを処理
-        if self.segment_merger and client_id in self.segment_merger.pending_segments:
+    def readiness(self) -> dict:
+        """新規セッションを振り分けてよいか（理由が空なら ready）"""
+        reasons = []
+        if not self.warmed:
+            reasons.append("warming_up")
+        if self.draining:
+            reasons.append("draining")
+        reasons.extend(f"unhealthy:{name}" for name in self.backend_health.unhealthy())
+        signals = self.load_signals()
+        utilization, signal = self.admission.utilization(signals)
+        if READINESS_MAX_UTILIZATION > 0 and utilization >= READINESS_MAX_UTILIZATION:
+            reasons.append(f"saturated:{signal}")
+        return {
+            "ready": not reasons,
+            "reasons": reasons,
+            "warmed": self.warmed,
+            "backends": self.backend_health.get_stats(),
+            "saturation": {
+                "utilization": round(utilization, 3),
+                "max_utilization": READINESS_MAX_UTILIZATION,
+                "signals": self.admission.saturation(signals),
+            },
+        }
+
+    def track_transcription(self, task: asyncio.Task):
+        """実行中の文字起こしタスクとして記録（完了時に自動で外す）"""
+        self.transcription_tasks.add(task)
+        task.add_done_callback(self.transcription_tasks.discard)
+
+    async def allocate_session_id(self) -> str:
+        """衝突しないセッションIDを発行し、このワーカーの所有としてディレクトリに登録"""
+        for _ in range(5):
+            session_id = new_session_id()
+            info = SessionInfo(session_id, self.worker_id, WORKER_URL, time.time())
             try:
-                # 保留中のセグメントを強制的に処理
-                async def final_callback(audio_data, segment_id):
-                    """切断時の最終コールバック（ログのみ）"""
-                    duration = len(audio_data) // SAMPLE_WIDTH / SAMPLE_RATE
-                    logger.info(
-                        f"[AsyncDisconnect] Final processing of segment {segment_id} (duration: {duration:.2f}s)"
-                    )
+                registered = await self.session_directory.register(
+                    info, SESSION_DIRECTORY_TTL_SECONDS
+                )
+            except Exception as e:
+                # ディレクトリが使えなくても新規セッションはこのワーカーで処理する
+                logger.error(f"[SessionDirectory] Failed to register session: {e}")
+                return session_id
+            if registered:
+                self._ensure_directory_refresh()
+                return session_id
+            logger.warning(f"[SessionDirectory] Session id collision: {session_id}")
+        raise RuntimeError("Could not allocate a unique session id")
+
+    async def find_session_owner(self, session_id: str) -> Optional[SessionInfo]:
+        """セッションを所有するワーカーを調べる（不明な場合は None）"""
+        try:
+            return await self.session_directory.lookup(session_id)
+        except Exception as e:
+            logger.error(f"[SessionDirectory] Failed to look up {session_id}: {e}")
+            return None
 
-                async def final_error_callback(error):
-                    logger.error(
-                        f"[AsyncDisconnect] Error in final processing: {error}"
-                    )
+    def _ensure_directory_refresh(self):
+        # ネットワーク越しの更新はタイマーのコールバックではなく専用のタスクで行う
+        if self._directory_refresh is None or self._directory_refresh.done():
+            self._directory_refresh = asyncio.create_task(self._refresh_directory())
 
-                await self.segment_merger.flush_client(
-                    client_id, final_callback, final_error_callback
+    async def _refresh_directory(self):
+        """接続中のセッションの登録期限を延長（ワーカーが落ちた場合は期限切れで消える）"""
+        while True:
+            await asyncio.sleep(SESSION_DIRECTORY_TTL_SECONDS / 3)
+            if not self.segmenters:
+                return
+            try:
+                # 再接続待ちのセッションも含めて延長する
+                await self.session_directory.refresh(
+                    list(self.segmenters), SESSION_DIRECTORY_TTL_SECONDS
                 )
+            except Exception as e:
+                logger.error(f"[SessionDirectory] Failed to refresh sessions: {e}")
+
+    async def async_disconnect(self, client_id: str):
+        """非同期でクライアント接続を切断し、発話中・保留中のセグメントも文字起こしに回す"""
+        logger.info(
+            f"[AsyncDisconnect] Starting async disconnect process for client {client_id}"
+        )
+
+        try:
+            flushed = await finalize_session(client_id)
+            if flushed:
                 logger.info(
-                    f"[AsyncDisconnect] Flushed pending segments for client {client_id}"
+                    f"[AsyncDisconnect] Flushed {flushed} pending segments for client {client_id}"
                 )
-            except Exception as e:
-                logger.error(f"[AsyncDisconnect] Error flushing segments: {e}")
+        except Exception as e:
+            logger.error(f"[AsyncDisconnect] Error flushing segments: {e}")
 
         # 通常の切断処理を実行
         self.disconnect(client_id)
+        try:
+            await self.session_directory.unregister(client_id)
+        except Exception as e:
+            logger.error(f"[SessionDirectory] Failed to unregister {client_id}: {e}")
         logger.info(
             f"[AsyncDisconnect] Async disconnect completed for client {client_id}"
         )
 
+    async def close(self):
+        """バックグラウンド処理を停止する（ドレイン後のシャットダウン時）"""
+        await self.loop_monitor.stop()
+        await self.backend_health.stop()
+        await self.timer_scheduler.close()
+        if self._directory_refresh is not None:
+            self._directory_refresh.cancel()
+        # 書き込み待ちの音声を書き終えてから、未着手のアーカイブは取り消す
+        # （圧縮されなかったセッションは PCM のまま読める）
+        self.audio_writer.close()
+        self.ingest_recorder.close()
+        if self.audio_archiver:
+            self.audio_archiver.close(wait=False)
+        close_vad = getattr(self.vad_adapter, "close", None)
+        if close_vad:
+            close_vad()
+        try:
+            await self.session_directory.close()
+        except Exception as e:
+            logger.error(f"[SessionDirectory] Failed to close: {e}")
+        logger.info("[Shutdown] ConnectionManager closed")
+
+    def _on_session_archived(self, session_path: str, delta_bytes: int):
+        """アーカイブ完了時（プロセスプールの管理スレッドから呼ばれる）"""
+        if self.audio_retention:
+            self.audio_retention.adjust(session_path, delta_bytes)
+            self.audio_retention.mark_closed(session_path)
+
+    def save_segment(self, client_id: str, segment_id: int, audio_data: bytes):
+        """セグメントをセッションの音声コンテナに追記するようキューに積む"""
+        session_path = self.session_paths.get(client_id)
+        if session_path is None:
+            session_path = os.path.join(AUDIO_SEGMENTS_DIR, client_id)
+        self.audio_writer.submit(session_path, segment_id, audio_data)
+
     async def set_client_model(self, client_id: str, model: TranscriptionModel):
         """クライアントの音声認識モデルを設定（接続時のみ）"""
         previous_model = self.client_models.get(
@@ -451,6 +859,8 @@ class ConnectionManager:
 
     async def send_json_message(self, data: dict, client_id: str):
         """特定のクライアントにJSONメッセージを送信"""
+        # 通し番号を付け、結果系のメッセージは再接続時の再送用に保持
+        data = self.session_resume.stamp(client_id, data)
         if client_id in self.active_connections:
             websocket = self.active_connections[client_id]
             try:
@@ -467,40 +877,60 @@ class ConnectionManager:
                     f"[WebSocket] Failed to send message to client {client_id}: {e}"
                 )
                 logger.error(f"[WebSocket] WebSocket state: {websocket.state}")
-                # 接続が切れている場合は接続リストから削除
+                # 接続が切れている場合は再接続を待つ（猶予がなければ切断）
                 logger.warning(f"[WebSocket] Removing disconnected client {client_id}")
-                # 非同期切断処理をタスクとして実行
-                asyncio.create_task(self.async_disconnect(client_id))
+                asyncio.create_task(
+                    self.connection_lost(client_id, websocket, final=False)
+                )
+        elif self.session_resume.is_detached(client_id):
+            logger.info(
+                f"[WebSocket] Client {client_id} is reconnecting, kept "
+                f"{data.get('type', 'unknown')} for replay"
+            )
         else:
             logger.warning(
                 f"[WebSocket] Client {client_id} not found in active connections"
             )
 
     async def send_transcription_result(
-        self, text: str, client_id: str, segment_id: int
+        self,
+        text: str,
+        client_id: str,
+        segment_id: int,
+        is_final: bool = True,
+        timings: Optional[dict] = None,
     ):
-        """文字起こし結果をクライアントに送信"""
+        """文字起こし結果をクライアントに送信（is_final=False は途中結果）"""
         logger.info(f"send_transcription_result: {text}")
         current_model = self.get_client_model(client_id)
-        await self.send_json_message(
-            {
-                "type": "transcription_result",
-                "id": f"{client_id}_{segment_id}",
-                "text": text,
-                "confidence": 0.95,  # OpenAI APIは通常高い信頼度を持つ
-                "timestamp": time.time(),
-                "is_final": True,
-                "segment_id": segment_id,
-                "model_used": current_model.value,  # Enumの値を文字列として使用
-            },
-            client_id,
-        )
+        started = time.perf_counter()
+        message = {
+            "type": "transcription_result",
+            "id": f"{client_id}_{segment_id}",
+            "text": text,
+            "confidence": 0.95,  # OpenAI APIは通常高い信頼度を持つ
+            "timestamp": time.time(),
+            "is_final": is_final,
+            "segment_id": segment_id,
+            "model_used": current_model.value,  # Enumの値を文字列として使用
+        }
+        if timings is not None:
+            message["timings"] = timings
+        await self.send_json_message(message, client_id)
+        if client_id in self.active_connections:
+            metrics.RESULT_SEND_SECONDS.observe(time.perf_counter() - started)
+        metrics.TRANSCRIPTIONS_TOTAL.inc(kind="final" if is_final else "interim")
 
 
 # manager インスタンスは関数レベルで初期化する必要があります
 manager = None
 
 
+def get_manager() -> Optional[ConnectionManager]:
+    """初期化済みのConnectionManagerを返す（未接続の場合は None）"""
+    return manager
+
+
 def initialize_manager(
     transcription_adapter: TranscriptionAdapter, vad_adapter: VADAdapter
 ):
@@ -512,19 +942,54 @@ def initialize_manager(
             vad_adapter=vad_adapter,
             use_vad_processor=False,
             use_segment_merger=True,
+            use_interim_results=INTERIM_RESULTS_ENABLED,
         )
 
 
 async def websocket_endpoint(websocket: WebSocket, client_id: str = None):
     """WebSocketエンドポイントのメインハンドラー"""
-    if not client_id:
-        client_id = str(int(time.time() * 1000))  # タイムスタンプベースのID
+    manager.loop_monitor.ensure_started()
+
+    if manager.draining:
+        # 停止処理中は別のワーカーへ接続し直してもらう
+        await reject_connection(
+            websocket,
+            AdmissionDecision(False, LoadLevel.OVERLOADED, "draining"),
+            code=CLOSE_CODE_SERVICE_RESTART,
+        )
+        return
+
+    resumed = False
+    requested_id = websocket.query_params.get("session_id")
+    if not client_id and requested_id:
+        # 別のワーカーが持つセッションへの接続は所有ワーカーへ誘導する
+        owner = await manager.find_session_owner(requested_id)
+        if owner is not None and owner.worker_id != manager.worker_id:
+            await redirect_to_owner(websocket, owner)
+            return
+        # 再接続（受付済みのセッションなので受け付け制御の対象外）
+        resumed = await resume_session(websocket, requested_id)
+        if resumed:
+            client_id = requested_id
+
+    if not resumed:
+        # 過負荷の場合は新規セッションを拒否（既存セッションの遅延を守る）
+        decision = manager.admission.admit()
+        if not decision.accepted:
+            await reject_connection(websocket, decision)
+            return
+
+        if not client_id:
+            client_id = await manager.allocate_session_id()
 
-    logger.info(f"[Connection] New WebSocket connection attempt for client {client_id}")
-    await manager.connect(websocket, client_id)
-    logger.info(f"[Connection] WebSocket connection established for client {client_id}")
+        logger.info(
+            f"[Connection] New WebSocket connection attempt for client {client_id}"
+        )
+        resume_token = await manager.connect(websocket, client_id)
+        logger.info(
+            f"[Connection] WebSocket connection established for client {client_id}"
+        )
 
-    try:
         # 接続成功メッセージを送信
         current_model = manager.get_client_model(client_id)
         await manager.send_json_message(
@@ -533,24 +998,47 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str = None):
                 "client_id": client_id,
                 "message": "WebSocket connection established successfully",
                 "model": current_model.value,  # Enumの値を文字列として使用
+                "resume_token": resume_token,
+                "resume_grace_seconds": RESUME_GRACE_SECONDS,
                 "timestamp": time.time(),
             },
             client_id,
         )
 
+    close_code = await receive_messages(websocket, client_id)
+    await manager.connection_lost(
+        client_id, websocket, final=close_code in FINAL_CLOSE_CODES
+    )
+
+
+async def receive_messages(websocket: WebSocket, client_id: str) -> Optional[int]:
+    """
+    接続が切れるまでメッセージを受信して処理する
+
+    Returns:
+        Optional[int]: クライアントのクローズコード（異常切断の場合は None）
+    """
+    try:
         while True:
             try:
                 # バイナリまたはテキストメッセージを受信
                 message = await websocket.receive()
 
                 if message["type"] == "websocket.receive":
+                    manager.liveness.touch(client_id, audio="bytes" in message)
                     if "bytes" in message:
                         # バイナリデータ（音声）の場合
                         audio_data = message["bytes"]
+                        manager.ingest_recorder.record(
+                            client_id, KIND_AUDIO, audio_data
+                        )
                         await process_audio_data(audio_data, client_id)
                     elif "text" in message:
                         # テキストデータ（JSON）の場合
                         text_data = message["text"]
+                        manager.ingest_recorder.record(
+                            client_id, KIND_TEXT, text_data.encode()
+                        )
                         await process_json_message(text_data, client_id)
                     else:
                         logger.warning(
@@ -560,8 +1048,10 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str = None):
                     logger.info(
                         f"[WebSocket] Disconnect message received from client {client_id}"
                     )
-                    break
+                    return message.get("code")
 
+            except WebSocketDisconnect:
+                raise
             except Exception as msg_error:
                 error_message = str(msg_error)
                 logger.error(
@@ -578,21 +1068,98 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str = None):
                     logger.info(
                         f"[WebSocket] Client {client_id} disconnected, stopping message processing"
                     )
-                    break
+                    return None
 
                 # その他のエラーは継続
                 continue
 
-    except WebSocketDisconnect:
+    except WebSocketDisconnect as e:
         logger.info(
             f"[Connection] WebSocket disconnect detected for client {client_id}"
         )
-        await manager.async_disconnect(client_id)
+        return e.code
     except Exception as e:
         logger.error(
             f"[Connection] Error in websocket connection for client {client_id}: {e}"
         )
-        await manager.async_disconnect(client_id)
+        return None
+
+
+async def resume_session(websocket: WebSocket, session_id: str) -> bool:
+    """
+    再接続のハンドシェイク
+    クエリ: session_id, resume_token, last_seq（受信済みの最後のメッセージ番号）
+    """
+    token = websocket.query_params.get("resume_token", "")
+    try:
+        last_seq = int(websocket.query_params.get("last_seq", "0"))
+    except ValueError:
+        last_seq = 0
+
+    replay = await manager.resume(websocket, session_id, token, last_seq)
+    if replay is None:
+        logger.info(f"[Resume] Cannot resume session {session_id}, starting a new one")
+        return False
+
+    # クライアントは next_audio_seq 番目のパケットから音声を送り直す
+    await manager.send_json_message(
+        {
+            "type": "session_resumed",
+            "client_id": session_id,
+            "model": manager.get_client_model(session_id).value,
+            "next_audio_seq": manager.audio_data_count.get(session_id, 0) + 1,
+            "replayed": len(replay),
+            "timestamp": time.time(),
+        },
+        session_id,
+    )
+    for message in replay:
+        await websocket.send_text(json.dumps(message))
+    return True
+
+
+async def reject_connection(
+    websocket: WebSocket,
+    decision: AdmissionDecision,
+    code: int = CLOSE_CODE_TRY_AGAIN_LATER,
+):
+    """再試行までの目安を伝えて接続を閉じる（既定は 1013 Try Again Later）"""
+    logger.warning(
+        f"[Admission] Rejecting new session ({decision.reason}, "
+        f"retry after {decision.retry_after}s)"
+    )
+    await websocket.accept()
+    await websocket.send_json(
+        {
+            "type": "connection_rejected",
+            "reason": decision.reason,
+            "retry_after": decision.retry_after,
+            "timestamp": time.time(),
+        }
+    )
+    await websocket.close(
+        code=code,
+        reason=f"{decision.reason}; retry_after={decision.retry_after}",
+    )
+
+
+async def redirect_to_owner(websocket: WebSocket, owner: SessionInfo):
+    """セッションを所有するワーカーのURLを伝えて接続を閉じる"""
+    logger.info(
+        f"[Connection] Session {owner.session_id} is owned by worker {owner.worker_id}, "
+        f"redirecting to {owner.worker_url or '(unknown url)'}"
+    )
+    await websocket.accept()
+    await websocket.send_json(
+        {
+            "type": "session_redirect",
+            "session_id": owner.session_id,
+            "worker_id": owner.worker_id,
+            "worker_url": owner.worker_url,
+            "timestamp": time.time(),
+        }
+    )
+    await websocket.close(code=CLOSE_CODE_SESSION_REDIRECT)
 
 
 async def process_json_message(text_data: str, client_id: str):
@@ -605,7 +1172,10 @@ async def process_json_message(text_data: str, client_id: str):
             f"[WebSocket] Received JSON message from client {client_id}: {message_type}"
         )
 
-        if message_type == WebSocketMessageType.MODEL_SELECTION:
+        if message_type == WebSocketMessageType.PONG:
+            # 死活監視の応答（受信時に生存は記録済み）
+            manager.liveness.on_pong(client_id, data.get("nonce"))
+        elif message_type == WebSocketMessageType.MODEL_SELECTION:
             # モデル初期設定メッセージの処理（接続時のみ）
             try:
                 model_selection = ModelSelectionMessage(**data)
@@ -673,6 +1243,11 @@ async def process_json_message(text_data: str, client_id: str):
 
 async def process_audio_data(audio_data: bytes, client_id: str):
     """受信した音声データをVAD判定し、区間保存・ログ出力"""
+    if manager.draining:
+        # 発話は確定済み。以降の音声はクライアントが再接続先に送り直す
+        return
+    started = time.perf_counter()
+    received = manager.clock()
     try:
         # 受信データをカウント
         if client_id in manager.audio_data_count:
@@ -681,279 +1256,50 @@ async def process_audio_data(audio_data: bytes, client_id: str):
         data_size = len(audio_data)
         data_count = manager.audio_data_count.get(client_id, 0)
 
-        # PCMバッファに追加
+        # PCMバッファに追加し、VADフレームに分割（余りはバッファに残す）
         manager.pcm_buffer[client_id].extend(audio_data)
-        buf = manager.pcm_buffer[client_id]
-        frame_bytes = VAD_FRAME_SIZE * 2  # 16bit=2byte
-        offset = 0
-        while len(buf) - offset >= frame_bytes:
-            frame = buf[offset : offset + frame_bytes]
-            is_speech, speech_prob = manager.vad_adapter.predict(frame)
-
-            silence_count = manager.silence_frame_count.get(client_id, 0)
+        frames, manager.pcm_buffer[client_id] = split_frames(
+            manager.pcm_buffer[client_id]
+        )
+        segmenter = manager.segmenters[client_id]
+        # パケット内のフレームをまとめて推論（推論プロセス利用時は待機中もループを止めない）
+        speech_probs = await manager.vad_adapter.predict_frames(
+            frames, SAMPLE_RATE, key=client_id
+        )
+        metrics.VAD_DECISION_SECONDS.observe(time.perf_counter() - started)
+        metrics.FRAMES_TOTAL.inc(len(frames))
+        for frame, speech_prob in zip(frames, speech_probs):
+            # 発話区間検出（ヒステリシス・プリロール・最大長での分割を含む）
+            segment = segmenter.push_frame(frame, speech_prob)
+            if segmenter.in_speech and segmenter.silence_frames == 0:
+                manager.last_speech_at[client_id] = received
             logger.info(
-                f"[VAD] client={client_id} is_speech={is_speech} prob={speech_prob:.3f} "
-                f"silence_frames={silence_count}/{VAD_SILENCE_FRAME_THRESHOLD}"
+                f"[VAD] client={client_id} in_speech={segmenter.in_speech} prob={speech_prob:.3f} "
+                f"silence_frames={segmenter.silence_frames}/{VAD_SILENCE_FRAME_THRESHOLD}"
             )
 
-            if is_speech:
-                # 発話検出時の処理
-                manager.speech_buffer[client_id].extend(frame)
-                manager.in_speech[client_id] = True
-                manager.silence_frame_count[client_id] = 0  # 無音カウンタリセット
-
-            else:
-                # 無音検出時の処理
-                if manager.in_speech.get(client_id, False):
-                    # 発話中の無音 - バッファに追加（自然な発話の流れを保持）
-                    manager.speech_buffer[client_id].extend(frame)
-                    manager.silence_frame_count[client_id] += 1
-
-                    # 閾値に達した場合のみセグメント終了
-                    if (
-                        manager.silence_frame_count[client_id]
-                        >= VAD_SILENCE_FRAME_THRESHOLD
-                    ):
-                        logger.info(
-                            f"[VAD] Silence threshold reached, ending segment for client {client_id}"
-                        )
+            if segment is not None:
+                if segment.forced:
+                    logger.info(
+                        f"[VAD] Max segment duration reached, splitting segment for client {client_id} "
+                        f"(carry over {segmenter.buffered_bytes / SAMPLE_WIDTH / SAMPLE_RATE:.2f}s)"
+                    )
+                else:
+                    logger.info(
+                        f"[VAD] Silence threshold reached, ending segment for client {client_id}"
+                    )
+                    speech_end_at = manager.last_speech_at.pop(client_id, received)
+                    metrics.SPEECH_END_TO_CLOSE_SECONDS.observe(
+                        manager.clock() - speech_end_at
+                    )
+                metrics.SEGMENTS_TOTAL.inc(
+                    reason="max_duration" if segment.forced else "silence"
+                )
+                await finalize_segment(
+                    client_id, segment, received if segment.forced else speech_end_at
+                )
 
-                        # 既存のセグメント終了処理をそのまま実行
-                        if len(manager.speech_buffer.get(client_id, b"")) > 0:
-                            manager.segment_count[client_id] += 1
-                            segment_id = manager.segment_count[client_id]
-                            filename = f"segment_{segment_id:04d}.wav"
-
-                            # クライアント専用ディレクトリに保存
-                            client_dir = manager.client_directories.get(
-                                client_id, AUDIO_SEGMENTS_DIR
-                            )
-                            filepath = os.path.join(client_dir, filename)
-                            save_pcm_as_wav(manager.speech_buffer[client_id], filepath)
-                            logger.info(f"[VAD] Saved segment: {filepath}")
-
-                            # 音声セグメントの長さをチェック（最小0.3秒 = 4800サンプル = 9600バイト）
-                            min_audio_length = SAMPLE_RATE * 0.3  # 0.3秒
-                            audio_samples = (
-                                len(manager.speech_buffer[client_id]) // SAMPLE_WIDTH
-                            )
-
-                            if audio_samples < min_audio_length:
-                                logger.warning(
-                                    f"[Audio] Segment {segment_id} too short ({audio_samples} samples < {min_audio_length}), skipping transcription"
-                                )
-                                await manager.send_json_message(
-                                    {
-                                        "type": "transcription_skipped",
-                                        "segment_id": segment_id,
-                                        "reason": "Audio segment too short",
-                                        "duration_seconds": audio_samples / SAMPLE_RATE,
-                                        "timestamp": time.time(),
-                                    },
-                                    client_id,
-                                )
-                            else:
-                                # セグメント結合機能を使用する場合
-                                if (
-                                    manager.use_segment_merger
-                                    and manager.segment_merger
-                                ):
-                                    # 音声データのコピー（PCMバイト列）
-                                    segment_audio_data = bytes(
-                                        manager.speech_buffer[client_id]
-                                    )
-
-                                    # セグメント結合処理のコールバック関数を定義
-                                    async def segment_transcription_callback(
-                                        audio_data: bytes, seg_id: int
-                                    ):
-                                        """セグメント結合後の文字起こしコールバック"""
-                                        # セグメント結合後もファイル保存を行う
-                                        filename = f"segment_{seg_id:04d}.wav"
-                                        client_dir = manager.client_directories.get(
-                                            client_id, AUDIO_SEGMENTS_DIR
-                                        )
-                                        filepath = os.path.join(client_dir, filename)
-                                        save_pcm_as_wav(audio_data, filepath)
-                                        logger.info(
-                                            f"[SegmentMerger] Saved merged segment: {filepath}"
-                                        )
-
-                                        # PCMデータをWAV形式bytesに変換
-                                        wav_buffer = io.BytesIO()
-                                        with wave.open(wav_buffer, "wb") as wf:
-                                            wf.setnchannels(CHANNELS)
-                                            wf.setsampwidth(SAMPLE_WIDTH)
-                                            wf.setframerate(SAMPLE_RATE)
-                                            wf.writeframes(audio_data)
-                                        wav_bytes = wav_buffer.getvalue()
-
-                                        samples = len(audio_data) // SAMPLE_WIDTH
-                                        duration = samples / SAMPLE_RATE
-                                        logger.info(
-                                            f"[Audio] Processing segment {seg_id} ({samples} samples, {duration:.2f}s)"
-                                        )
-
-                                        # 文字起こし処理
-                                        async def transcription_callback(text: str):
-                                            selected_model = manager.get_client_model(
-                                                client_id
-                                            )
-                                            logger.info(
-                                                f"[Transcription] client={client_id} segment={seg_id} model={selected_model.value} text={text}"
-                                            )
-                                            await manager.send_transcription_result(
-                                                text, client_id, seg_id
-                                            )
-
-                                        async def transcription_error_callback(
-                                            error: Exception,
-                                        ):
-                                            current_model = manager.get_client_model(
-                                                client_id
-                                            )
-                                            logger.error(
-                                                f"[Transcription Error] client={client_id} segment={seg_id} model={current_model.value} error={error}"
-                                            )
-                                            await manager.send_json_message(
-                                                {
-                                                    "type": "transcription_error",
-                                                    "segment_id": seg_id,
-                                                    "error": str(error),
-                                                    "model_used": current_model.value,  # Enumの値を文字列として使用
-                                                    "timestamp": time.time(),
-                                                },
-                                                client_id,
-                                            )
-
-                                        # 非同期で文字起こしを実行
-                                        async def transcribe_task():
-                                            try:
-                                                # クライアントの選択モデルを使用
-                                                selected_model = (
-                                                    manager.get_client_model(client_id)
-                                                )
-                                                await manager.transcription_adapter.transcribe(
-                                                    wav_bytes,
-                                                    model=selected_model.value,  # Enumの値を文字列として使用
-                                                    callback=transcription_callback,
-                                                )
-                                            except Exception as e:
-                                                await transcription_error_callback(e)
-
-                                        asyncio.create_task(transcribe_task())
-
-                                    async def segment_error_callback(error: Exception):
-                                        """セグメント結合エラーコールバック"""
-                                        logger.error(
-                                            f"[SegmentMerger Error] client={client_id} error={error}"
-                                        )
-                                        await manager.send_json_message(
-                                            {
-                                                "type": "segment_merge_error",
-                                                "error": str(error),
-                                                "timestamp": time.time(),
-                                            },
-                                            client_id,
-                                        )
-
-                                    # セグメント結合処理を実行
-                                    processed_immediately = (
-                                        await manager.segment_merger.process_segment(
-                                            segment_id,
-                                            segment_audio_data,
-                                            client_id,
-                                            segment_transcription_callback,
-                                            segment_error_callback,
-                                        )
-                                    )
-
-                                    if processed_immediately:
-                                        logger.info(
-                                            f"[SegmentMerger] Segment {segment_id} processed immediately"
-                                        )
-                                    else:
-                                        logger.info(
-                                            f"[SegmentMerger] Segment {segment_id} held for potential merge"
-                                        )
-
-                                else:
-                                    # 従来の処理（セグメント結合なし）
-                                    # PCMデータをWAV形式bytesに変換
-                                    wav_buffer = io.BytesIO()
-                                    with wave.open(wav_buffer, "wb") as wf:
-                                        wf.setnchannels(CHANNELS)
-                                        wf.setsampwidth(SAMPLE_WIDTH)
-                                        wf.setframerate(SAMPLE_RATE)
-                                        wf.writeframes(manager.speech_buffer[client_id])
-                                    wav_bytes = wav_buffer.getvalue()
-
-                                    logger.info(
-                                        f"[Audio] Processing segment {segment_id} ({audio_samples} samples, {audio_samples / SAMPLE_RATE:.2f}s)"
-                                    )
-
-                                    # 文字起こし処理のコールバック関数を定義
-                                    async def transcription_callback(text: str):
-                                        selected_model = manager.get_client_model(
-                                            client_id
-                                        )
-                                        logger.info(
-                                            f"[Transcription] client={client_id} segment={segment_id} model={selected_model.value} text={text}"
-                                        )
-                                        await manager.send_transcription_result(
-                                            text, client_id, segment_id
-                                        )
-
-                                    # エラー処理のコールバック関数を定義
-                                    async def transcription_error_callback(
-                                        error: Exception,
-                                    ):
-                                        current_model = manager.get_client_model(
-                                            client_id
-                                        )
-                                        logger.error(
-                                            f"[Transcription Error] client={client_id} segment={segment_id} model={current_model.value} error={error}"
-                                        )
-                                        await manager.send_json_message(
-                                            {
-                                                "type": "transcription_error",
-                                                "segment_id": segment_id,
-                                                "error": str(error),
-                                                "model_used": current_model.value,  # Enumの値を文字列として使用
-                                                "timestamp": time.time(),
-                                            },
-                                            client_id,
-                                        )
-
-                                    # 非同期で文字起こしを実行
-                                    async def transcribe_task():
-                                        try:
-                                            # クライアントの選択モデルを使用
-                                            selected_model = manager.get_client_model(
-                                                client_id
-                                            )
-                                            await manager.transcription_adapter.transcribe(
-                                                wav_bytes,
-                                                model=selected_model.value,  # Enumの値を文字列として使用
-                                                callback=transcription_callback,
-                                            )
-                                        except Exception as e:
-                                            await transcription_error_callback(e)
-
-                                    asyncio.create_task(transcribe_task())
-
-                            # 状態リセット
-                            manager.speech_buffer[client_id].clear()
-                            manager.silence_frame_count[client_id] = 0
-
-                        manager.in_speech[client_id] = False
-                    # else: まだ閾値に達していない → 区切らずに継続
-                # else: 発話開始前の無音 → 何もしない
-            offset += frame_bytes
-        # 余りはバッファに残す
-        manager.pcm_buffer[client_id] = buf[offset:]
-
-        # 受信確認をクライアントに送信
+        # 受信確認をクライアントに送信（再開時に送り直す音声を減らすため省かない）
         await manager.send_json_message(
             {
                 "type": "audio_received",
@@ -965,6 +1311,15 @@ async def process_audio_data(audio_data: bytes, client_id: str):
             client_id,
         )
 
+        # 負荷が高い場合は任意の処理（途中結果・統計）を省く
+        if manager.admission.should_shed():
+            manager.admission.record_shed()
+            return
+
+        # 発話中であれば途中結果を送信
+        if manager.interim_transcriber and segmenter.in_speech:
+            await maybe_send_interim_result(client_id)
+
         # 10回に1回、詳細な統計を送信
         if data_count % 10 == 0:
             await manager.send_json_message(
@@ -979,6 +1334,7 @@ async def process_audio_data(audio_data: bytes, client_id: str):
 
     except Exception as e:
         logger.error(f"Error processing audio data for client {client_id}: {e}")
+        metrics.ERRORS_TOTAL.inc(stage="audio")
         await manager.send_json_message(
             {
                 "type": "error",
@@ -987,3 +1343,327 @@ async def process_audio_data(audio_data: bytes, client_id: str):
             },
             client_id,
         )
+
+
+async def finalize_segment(
+    client_id: str, segment: Segment, speech_end_at: Optional[float] = None
+):
+    """
+    確定したセグメントを保存し、文字起こしに回す
+
+    speech_end_at: 最後の発話フレームを受信した時刻（manager.clock、timings 用）
+    """
+    segment_audio = segment.audio
+    manager.segment_count[client_id] += 1
+    segment_id = manager.segment_count[client_id]
+
+    # 処理中の途中結果を無効化（最終結果で置き換える）
+    if manager.interim_transcriber:
+        manager.interim_transcriber.finish_segment(client_id)
+
+    # 音声セグメントの長さをチェック（最小0.3秒 = 4800サンプル = 9600バイト）
+    min_audio_length = SAMPLE_RATE * 0.3  # 0.3秒
+    audio_samples = len(segment_audio) // SAMPLE_WIDTH
+
+    if audio_samples < min_audio_length:
+        logger.warning(
+            f"[Audio] Segment {segment_id} too short ({audio_samples} samples < {min_audio_length}), skipping transcription"
+        )
+        manager.save_segment(client_id, segment_id, segment_audio)
+        metrics.SEGMENTS_SKIPPED_TOTAL.inc(reason="too_short")
+        await manager.send_json_message(
+            {
+                "type": "transcription_skipped",
+                "segment_id": segment_id,
+                "reason": "Audio segment too short",
+                "duration_seconds": audio_samples / SAMPLE_RATE,
+                "timestamp": time.time(),
+            },
+            client_id,
+        )
+        return
+
+    if manager.segment_timings.enabled(client_id):
+        closed_at = manager.clock()
+        frame_seconds = VAD_FRAME_SIZE / SAMPLE_RATE
+        manager.segment_timings.record(
+            client_id,
+            SegmentTrace(
+                segment_id=segment_id,
+                audio_bytes=len(segment_audio),
+                speech_start=segment.speech_start_frame * frame_seconds,
+                speech_end=segment.speech_end_frame * frame_seconds,
+                speech_end_at=speech_end_at or closed_at,
+                closed_at=closed_at,
+            ),
+        )
+
+    # セグメント結合機能を使用する場合
+    if manager.use_segment_merger and manager.segment_merger:
+        # セグメント結合処理を実行
+        processed_immediately = await manager.segment_merger.process_segment(
+            segment_id,
+            segment_audio,
+            client_id,
+            *merge_callbacks(client_id),
+        )
+
+        if processed_immediately:
+            logger.info(f"[SegmentMerger] Segment {segment_id} processed immediately")
+        else:
+            logger.info(
+                f"[SegmentMerger] Segment {segment_id} held for potential merge"
+            )
+
+    else:
+        # 従来の処理（セグメント結合なし）
+        logger.info(
+            f"[Audio] Processing segment {segment_id} ({audio_samples} samples, {audio_samples / SAMPLE_RATE:.2f}s)"
+        )
+        start_transcription(client_id, segment_audio, segment_id)
+
+
+def merge_callbacks(client_id: str):
+    """SegmentMerger に渡す（文字起こし, エラー）コールバックを生成"""
+
+    async def segment_transcription_callback(audio_data: bytes, seg_id: int):
+        """セグメント結合後の文字起こしコールバック"""
+        samples = len(audio_data) // SAMPLE_WIDTH
+        duration = samples / SAMPLE_RATE
+        logger.info(
+            f"[Audio] Processing segment {seg_id} ({samples} samples, {duration:.2f}s)"
+        )
+
+        start_transcription(client_id, audio_data, seg_id)
+
+    async def segment_error_callback(error: Exception):
+        """セグメント結合エラーコールバック"""
+        logger.error(f"[SegmentMerger Error] client={client_id} error={error}")
+        metrics.ERRORS_TOTAL.inc(stage="merge")
+        await manager.send_json_message(
+            {
+                "type": "segment_merge_error",
+                "error": str(error),
+                "timestamp": time.time(),
+            },
+            client_id,
+        )
+
+    return segment_transcription_callback, segment_error_callback
+
+
+async def finalize_session(client_id: str) -> int:
+    """
+    発話中の音声と結合待ちのセグメントを確定し、文字起こしに回す（切断・ドレイン時）
+
+    Returns:
+        int: 確定したセグメント数
+    """
+    flushed = 0
+    segmenter = manager.segmenters.get(client_id)
+    segment = segmenter.flush() if segmenter else None
+    if segment is not None:
+        metrics.SEGMENTS_TOTAL.inc(reason="flush")
+        await finalize_segment(
+            client_id, segment, manager.last_speech_at.pop(client_id, None)
+        )
+        flushed += 1
+
+    merger = manager.segment_merger
+    if merger and client_id in merger.pending_segments:
+        await merger.flush_client(client_id, *merge_callbacks(client_id))
+        flushed += 1
+    return flushed
+
+
+async def drain_connections(timeout: float = SHUTDOWN_DRAIN_TIMEOUT_SECONDS) -> dict:
+    """
+    停止前に全セッションを終了する
+
+    新規接続を止め、発話中・結合待ちのセグメントを文字起こしに回し、実行中の
+    文字起こしを timeout まで待って結果を接続中のクライアントに届けてから
+    1012 (Service Restart) で接続を閉じる。2回目以降の呼び出しは何もしない。
+    """
+    if manager is None or manager.draining:
+        return {}
+    manager.draining = True
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    sessions = list(manager.segmenters)
+    logger.info(f"[Drain] Draining {len(sessions)} sessions (timeout {timeout}s)")
+
+    segments = 0
+    for client_id in sessions:
+        # 受信済みの音声までで区切り、続きは再接続先に送り直してもらう
+        await manager.send_json_message(
+            {
+                "type": "server_draining",
+                "next_audio_seq": manager.audio_data_count.get(client_id, 0) + 1,
+                "timestamp": time.time(),
+            },
+            client_id,
+        )
+        try:
+            segments += await finalize_session(client_id)
+        except Exception as e:
+            logger.error(f"[Drain] Error flushing segments for {client_id}: {e}")
+
+    pending = set(manager.transcription_tasks)
+    if pending:
+        _, pending = await asyncio.wait(
+            pending, timeout=max(0.0, started + timeout - loop.time())
+        )
+
+    for client_id in sessions:
+        websocket = manager.active_connections.get(client_id)
+        await manager.async_disconnect(client_id)
+        if websocket is not None:
+            try:
+                await websocket.close(code=CLOSE_CODE_SERVICE_RESTART)
+            except Exception:
+                pass
+
+    result = {
+        "sessions": len(sessions),
+        "flushed_segments": segments,
+        "unfinished_transcriptions": len(pending),
+        "seconds": round(loop.time() - started, 3),
+    }
+    logger.info(f"[Drain] Completed: {result}")
+    return result
+
+
+async def shutdown_manager():
+    """ドレインしてからバックグラウンド処理を停止する"""
+    if manager is None:
+        return
+    await drain_connections()
+    await manager.close()
+
+
+def start_transcription(client_id: str, audio_data: bytes, segment_id: int):
+    """セグメントを保存し、文字起こしをバックグラウンドで開始"""
+    timing = manager.segment_timings.take(client_id, segment_id, len(audio_data))
+    # 文字起こしに回す音声を一度だけ保存（結合済みの場合は結合後の音声）
+    manager.save_segment(client_id, segment_id, audio_data)
+
+    # PCMデータをWAV形式bytesに変換
+    encode_started = time.perf_counter()
+    wav_bytes = pcm_to_wav_bytes(audio_data)
+    encode_seconds = time.perf_counter() - encode_started
+    queued_at = manager.clock()
+    metrics.WAV_ENCODE_SECONDS.observe(encode_seconds)
+    if timing:
+        timing.wav_encode_seconds = encode_seconds
+    adapter_timings = {}
+    task_started = queued_at
+    # 切断後に完了する場合もあるので、モデルは開始時に決める
+    selected_model = manager.get_client_model(client_id)
+
+    # 文字起こし処理のコールバック関数を定義
+    async def transcription_callback(text: str):
+        logger.info(
+            f"[Transcription] client={client_id} segment={segment_id} model={selected_model.value} text={text}"
+        )
+        await manager.send_transcription_result(
+            text,
+            client_id,
+            segment_id,
+            timings=(
+                timing.to_dict(adapter_timings, task_started, manager.clock())
+                if timing
+                else None
+            ),
+        )
+
+    # エラー処理のコールバック関数を定義
+    async def transcription_error_callback(error: Exception):
+        logger.error(
+            f"[Transcription Error] client={client_id} segment={segment_id} model={selected_model.value} error={error}"
+        )
+        metrics.ERRORS_TOTAL.inc(stage="transcription")
+        await manager.send_json_message(
+            {
+                "type": "transcription_error",
+                "segment_id": segment_id,
+                "error": str(error),
+                "model_used": selected_model.value,  # Enumの値を文字列として使用
+                "timestamp": time.time(),
+            },
+            client_id,
+        )
+
+    # 非同期で文字起こしを実行
+    async def transcribe_task():
+        nonlocal task_started
+        task_started = manager.clock()
+        try:
+            await manager.transcription_adapter.transcribe(
+                wav_bytes,
+                model=selected_model.value,  # Enumの値を文字列として使用
+                callback=transcription_callback,
+                timings=adapter_timings,
+            )
+        except Exception as e:
+            await transcription_error_callback(e)
+        # タスク開始までの待ちとアダプター内のスレッドプール待ちの合計
+        metrics.TRANSCRIPTION_QUEUE_SECONDS.observe(
+            task_started - queued_at + adapter_timings.get("queue_seconds", 0.0)
+        )
+        if "api_seconds" in adapter_timings:
+            metrics.TRANSCRIPTION_API_SECONDS.observe(adapter_timings["api_seconds"])
+
+    manager.track_transcription(asyncio.create_task(transcribe_task()))
+
+
+async def maybe_send_interim_result(client_id: str):
+    """発話中のバッファから途中結果（is_final=False）を非同期で送信"""
+    # 保留中のセグメントがある場合、現在の発話はそちらに結合される可能性があり
+    # 最終結果のセグメントIDが変わるため途中結果は送らない
+    if manager.segment_merger and client_id in manager.segment_merger.pending_segments:
+        return
+
+    segment_id = manager.segment_count.get(client_id, 0) + 1
+    segmenter = manager.segmenters[client_id]
+    request = manager.interim_transcriber.plan(
+        client_id, segment_id, segmenter.buffered_bytes
+    )
+    if request is None:
+        return
+
+    wav_bytes = pcm_to_wav_bytes(segmenter.current_audio(request.start, request.end))
+    manager.track_transcription(
+        asyncio.create_task(interim_transcribe_task(client_id, request, wav_bytes))
+    )
+
+
+async def interim_transcribe_task(
+    client_id: str, request: InterimRequest, wav_bytes: bytes
+):
+    """途中結果の文字起こしを実行してクライアントに送信"""
+    try:
+        selected_model = manager.get_client_model(client_id)
+        text = await manager.transcription_adapter.transcribe(
+            wav_bytes, model=selected_model.value
+        )
+    except Exception as e:
+        logger.warning(
+            f"[Interim] client={client_id} segment={request.segment_id} error={e}"
+        )
+        metrics.ERRORS_TOTAL.inc(stage="interim")
+        if manager.interim_transcriber:
+            manager.interim_transcriber.on_error(client_id, request)
+        return
+
+    if not manager.interim_transcriber:
+        return
+    full_text = manager.interim_transcriber.on_result(client_id, request, text)
+    if full_text is None:
+        logger.info(
+            f"[Interim] client={client_id} segment={request.segment_id} stale result dropped"
+        )
+        return
+
+    await manager.send_transcription_result(
+        full_text, client_id, request.segment_id, is_final=False
+    )
@@ -0,0 +1,245 @@
+"""
+OpenAI 互換の文字起こし API のローカル代替サーバー
+
+本物の OpenAITranscriptionAdapter を OPENAI_BASE_URL でこのサーバーに向けると、
+HTTP の接続プール・タイムアウト・リトライ・同時実行数の上限を含めてオフラインで試せる。
+
+- POST /v1/audio/transcriptions : 音声のハッシュから決まる文字列を返す（同じ音声なら常に同じ）
+- GET  /v1/models, /v1/models/{model} : ヘルスチェック用
+- GET  /stats : 受け付けたリクエスト数・応答コード・最大同時実行数
+
+応答時間はモデル毎に「固定 + 音声1秒あたり」に対数正規分布の揺らぎを掛けたもの。
+429（レート制限・同時実行数超過）と 5xx を指定した割合で返す。
+
+    python src/fake_openai.py --port 9000 --error-rate 0.01 --rate-limit-rate 0.02 \\
+        --max-concurrency 32 --latency whisper-1=0.5,0.08,0.4
+    OPENAI_BASE_URL=http://127.0.0.1:9000/v1 uvicorn main:app
+
+負荷試験（loadtest.py --spawn）と組み合わせる場合は OPENAI_BASE_URL を付けて実行する
+（TESTING でも OPENAI_BASE_URL があれば本物のアダプターを使う）:
+    OPENAI_BASE_URL=http://127.0.0.1:9000/v1 python src/loadtest.py --spawn
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import random
+import sys
+import wave
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import FastAPI, File, Form, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+# 決定的な文字起こし結果に使う語（音声1秒あたり約2語）
+WORDS = (
+    "今日は",
+    "いい天気",
+    "ですね",
+    "会議の",
+    "資料を",
+    "確認して",
+    "ください",
+    "来週の",
+    "予定は",
+    "どうなって",
+    "いますか",
+    "ありがとう",
+    "ございます",
+    "よろしく",
+    "お願いします",
+    "音声認識の",
+    "テスト",
+    "です",
+)
+WORDS_PER_SECOND = 2.0
+
+
+@dataclass
+class LatencyModel:
+    """応答時間 = (base + 音声秒数 * per_audio_second) * 対数正規分布の揺らぎ（中央値 1）"""
+
+    base: float  # 秒
+    per_audio_second: float  # 秒
+    sigma: float = 0.3
+
+    def sample(self, audio_seconds: float, rng: random.Random) -> float:
+        median = self.base + audio_seconds * self.per_audio_second
+        return median * rng.lognormvariate(0.0, self.sigma) if self.sigma else median
+
+
+DEFAULT_LATENCY = {
+    "gpt-4o-transcribe": LatencyModel(0.35, 0.04, 0.3),
+    "whisper-1": LatencyModel(0.5, 0.08, 0.4),
+}
+
+
+@dataclass
+class FakeOpenAIConfig:
+    latency: dict[str, LatencyModel] = field(
+        default_factory=lambda: dict(DEFAULT_LATENCY)
+    )
+    latency_scale: float = 1.0  # 0 で待たない（テスト用）
+    error_rate: float = 0.0  # 500/503 を返す割合
+    rate_limit_rate: float = 0.0  # 429 を返す割合
+    max_concurrency: int = 0  # 超えたら 429（0 で無制限）
+    retry_after: float = 1.0
+    seed: int = 0
+
+
+def audio_seconds(data: bytes) -> float:
+    """WAV の長さ（WAV でなければ 16kHz 16bit モノラルの PCM とみなす）"""
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wf:
+            return wf.getnframes() / wf.getframerate()
+    except (wave.Error, EOFError):
+        return len(data) / 32000
+
+
+def deterministic_text(data: bytes) -> str:
+    """音声のハッシュから語を選ぶ（長さは音声の長さに比例）"""
+    digest = hashlib.sha256(data).digest()
+    count = max(1, round(audio_seconds(data) * WORDS_PER_SECOND))
+    return "".join(WORDS[digest[i % len(digest)] % len(WORDS)] for i in range(count))
+
+
+def _error(status: int, message: str, kind: str, headers: Optional[dict] = None):
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": kind, "code": None}},
+        headers=headers,
+    )
+
+
+def create_app(config: Optional[FakeOpenAIConfig] = None) -> FastAPI:
+    config = config or FakeOpenAIConfig()
+    rng = random.Random(config.seed)
+    stats = {"requests": 0, "in_flight": 0, "max_in_flight": 0}
+    statuses: Counter = Counter()
+    app = FastAPI(title="Fake OpenAI Transcription API")
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {
+            "object": "list",
+            "data": [_model(name) for name in config.latency],
+        }
+
+    @app.get("/v1/models/{model}")
+    async def retrieve_model(model: str):
+        if model not in config.latency:
+            return _error(
+                404, f"The model '{model}' does not exist", "invalid_request_error"
+            )
+        return _model(model)
+
+    @app.get("/stats")
+    async def get_stats():
+        return {**stats, "statuses": dict(statuses)}
+
+    @app.post("/v1/audio/transcriptions")
+    async def transcriptions(
+        file: UploadFile = File(...),
+        model: str = Form(...),
+        language: Optional[str] = Form(None),
+        response_format: str = Form("json"),
+    ):
+        stats["requests"] += 1
+        data = await file.read()
+        response = await _transcribe(data, model, response_format)
+        statuses[str(response.status_code)] += 1
+        return response
+
+    async def _transcribe(data: bytes, model: str, response_format: str):
+        latency = config.latency.get(model)
+        if latency is None:
+            return _error(
+                400, f"The model '{model}' does not exist", "invalid_request_error"
+            )
+        if config.max_concurrency and stats["in_flight"] >= config.max_concurrency:
+            return _rate_limited("Concurrency limit reached")
+        if rng.random() < config.rate_limit_rate:
+            return _rate_limited("Rate limit reached for requests")
+
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            delay = latency.sample(audio_seconds(data), rng) * config.latency_scale
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if rng.random() < config.error_rate:
+                status = rng.choice((500, 503))
+                return _error(status, "The server had an error", "server_error")
+        finally:
+            stats["in_flight"] -= 1
+
+        text = deterministic_text(data)
+        if response_format == "text":
+            return PlainTextResponse(text)
+        return JSONResponse(content={"text": text})
+
+    def _rate_limited(message: str):
+        return _error(
+            429,
+            message,
+            "rate_limit_exceeded",
+            headers={"retry-after": f"{config.retry_after:g}"},
+        )
+
+    return app
+
+
+def _model(name: str) -> dict:
+    return {"id": name, "object": "model", "created": 0, "owned_by": "fake-openai"}
+
+
+def parse_latency(value: str) -> tuple[str, LatencyModel]:
+    """例: whisper-1=0.5,0.08,0.4 -> ("whisper-1", LatencyModel(0.5, 0.08, 0.4))"""
+    model, _, numbers = value.partition("=")
+    parts = [float(v) for v in numbers.split(",")]
+    if not model or len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError("expected MODEL=BASE,PER_AUDIO_SECOND[,SIGMA]")
+    return model, LatencyModel(*parts)
+
+
+def main(argv=None) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="OpenAI 互換 API のローカル代替")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument(
+        "--latency",
+        type=parse_latency,
+        action="append",
+        default=[],
+        help="MODEL=BASE,PER_AUDIO_SECOND[,SIGMA]（秒。複数指定可）",
+    )
+    parser.add_argument(
+        "--latency-scale", type=float, default=1.0, help="全モデルの応答時間の倍率"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0, help="エラー注入と揺らぎの乱数")
+    args = parser.parse_args(argv)
+
+    config = FakeOpenAIConfig(
+        latency_scale=args.latency_scale,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        max_concurrency=args.max_concurrency,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    config.latency.update(dict(args.latency))
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
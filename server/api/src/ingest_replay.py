@@ -0,0 +1,289 @@
+"""
+受信ログの再生ツール
+
+INGEST_RECORD=true で記録した受信ログ（*.ril）を、サーバーと同じ部品
+（split_frames → VADAdapter.predict_frames → create_segmenter の Segmenter）に流し、
+発話区間の判定（区切り位置・理由・音声のハッシュ）と処理時間を出力する。
+別のビルドで取った結果と比較し、判定が変わったセッションがあれば終了コード 1 を返す。
+処理時間の差は表示のみ（マシンの負荷で揺れるため）。
+
+    # 記録時の受信間隔どおりに再生（--speed で倍速）
+    python src/ingest_replay.py ingest_logs/ --realtime --json before.json
+    # できるだけ速く再生し、前回の結果と比較
+    python src/ingest_replay.py ingest_logs/ --baseline before.json
+
+VAD は vad_bench.py と同じ指定（mock, silero, pool-silero など）。比較する場合は同じ VAD で取る。
+VAD_THRESHOLD など発話区間検出の設定はサーバーと同じ環境変数で変えられる。
+"""
+
+import argparse
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Callable, Optional
+
+# 再生では音声を保存しない（handlers の import 時に保存先を作らない）
+os.environ.setdefault("AUDIO_RETENTION", "false")
+
+from loadtest import git_commit, percentiles  # noqa: E402
+from vad_bench import make_adapter  # noqa: E402
+
+from app.adapters.base import VADAdapter  # noqa: E402
+from app.services.ingest_recorder import (  # noqa: E402
+    KIND_AUDIO,
+    LOG_SUFFIX,
+    read_ingest_log,
+)
+from app.websocket import handlers  # noqa: E402
+
+
+def find_logs(paths: list[str]) -> list[str]:
+    """ファイルとディレクトリ（直下の *.ril）から受信ログを集める"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(glob.glob(os.path.join(path, f"*{LOG_SUFFIX}"))))
+        else:
+            found.append(path)
+    return found
+
+
+def check_header(header: dict) -> list[str]:
+    """記録時と現在のビルドで音声の形式が違えば警告を返す"""
+    current = handlers.ingest_log_header()
+    return [
+        f"{key}: recorded {header[key]}, current {current[key]}"
+        for key in ("sample_rate", "sample_width", "vad_frame_size")
+        if key in header and header[key] != current[key]
+    ]
+
+
+async def replay_log(
+    path: str,
+    adapter: VADAdapter,
+    realtime: bool = False,
+    speed: float = 1.0,
+) -> tuple[str, dict, list[float]]:
+    """
+    1セッション分の受信ログを再生する
+
+    realtime の場合は記録時の受信時刻（を speed で割った時刻）に合わせてパケットを流し、
+    各パケットの処理が終わるまでの受信時刻からの遅れ（lag_ms）も記録する
+
+    Returns:
+        tuple[str, dict, list[float]]: セッションID、結果、パケット毎の処理時間（マイクロ秒）
+    """
+    with open(path, "rb") as f:
+        header, records = read_ingest_log(f)
+        records = list(records)
+    session_id = header.get("session_id") or os.path.basename(path)
+    segmenter = handlers.create_segmenter()
+    buf = bytearray()
+    decisions: list[dict] = []
+    packet_us: list[float] = []
+    lag_ms: list[float] = []
+    packets = texts = audio_bytes = 0
+
+    def decide(segment, reason: str, offset: float):
+        decisions.append(
+            {
+                "start_frame": segment.start_frame,
+                "end_frame": segment.end_frame,
+                "speech_start_frame": segment.speech_start_frame,
+                "speech_end_frame": segment.speech_end_frame,
+                "reason": reason,
+                "bytes": len(segment.audio),
+                "sha1": hashlib.sha1(segment.audio).hexdigest()[:12],
+                "closed_at": round(offset, 6),  # 区切りを確定したパケットの受信時刻
+            }
+        )
+
+    started = time.perf_counter()
+    offset = 0.0
+    for record in records:
+        offset = record.offset
+        if realtime:
+            delay = started + offset / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if record.kind != KIND_AUDIO:
+            texts += 1
+            continue
+        packets += 1
+        audio_bytes += len(record.payload)
+
+        received = time.perf_counter()
+        buf.extend(record.payload)
+        frames, buf = handlers.split_frames(buf)
+        speech_probs = await adapter.predict_frames(
+            frames, handlers.SAMPLE_RATE, key=session_id
+        )
+        for frame, speech_prob in zip(frames, speech_probs):
+            segment = segmenter.push_frame(frame, speech_prob)
+            if segment is not None:
+                decide(segment, "max_duration" if segment.forced else "silence", offset)
+        finished = time.perf_counter()
+        packet_us.append((finished - received) * 1_000_000)
+        if realtime:
+            lag_ms.append((finished - (started + offset / speed)) * 1000)
+
+    segment = segmenter.flush()
+    if segment is not None:
+        decide(segment, "flush", offset)
+    wall = time.perf_counter() - started
+    audio_seconds = audio_bytes / handlers.SAMPLE_WIDTH / handlers.SAMPLE_RATE
+
+    result = {
+        "file": os.path.basename(path),
+        "packets": packets,
+        "texts": texts,
+        "audio_seconds": round(audio_seconds, 3),
+        "recorded_seconds": round(offset, 3),
+        "decisions": decisions,
+        "timings": {
+            "wall_seconds": round(wall, 3),
+            "speedup": round(audio_seconds / wall, 1) if wall else None,
+            "packet_us": percentiles(packet_us),
+        },
+    }
+    if realtime:
+        result["timings"]["lag_ms"] = percentiles(lag_ms)
+    warnings = check_header(header)
+    if warnings:
+        result["warnings"] = warnings
+    return session_id, result, packet_us
+
+
+def diff_decisions(before: list[dict], after: list[dict]) -> Optional[str]:
+    """判定の違いを1行で説明する（同じなら None）"""
+    keys = ("start_frame", "end_frame", "reason", "sha1")
+    for index, (a, b) in enumerate(zip(before, after)):
+        changed = [k for k in keys if a.get(k) != b.get(k)]
+        if changed:
+            detail = ", ".join(f"{k} {a.get(k)} -> {b.get(k)}" for k in changed)
+            return f"segment {index + 1}: {detail}"
+    if len(before) != len(after):
+        return f"segments {len(before)} -> {len(after)}"
+    return None
+
+
+def compare(report: dict, baseline: dict) -> tuple[list[str], list[str]]:
+    """
+    Returns:
+        tuple[list[str], list[str]]: 判定が変わったセッションと、処理時間の比較
+    """
+    changes = []
+    for session_id, before in baseline["sessions"].items():
+        after = report["sessions"].get(session_id)
+        if after is None:
+            changes.append(f"{session_id}: not replayed")
+            continue
+        diff = diff_decisions(before["decisions"], after["decisions"])
+        if diff:
+            changes.append(f"{session_id}: {diff}")
+
+    timings = []
+    for key in ("p50", "p99"):
+        a = baseline["summary"]["packet_us"].get(key)
+        b = report["summary"]["packet_us"].get(key)
+        if a and b:
+            timings.append(f"packet {key}: {a:.1f}us -> {b:.1f}us ({b / a - 1:+.0%})")
+    return changes, timings
+
+
+async def run(args, log: Callable[[str], None] = print) -> dict:
+    paths = find_logs(args.paths)
+    adapter = await asyncio.to_thread(
+        make_adapter, args.vad, args.threads, args.pool_workers
+    )
+    try:
+        await adapter.warm_up()
+        started = time.perf_counter()
+        # セッションはサーバーと同じく並行して流す
+        results = await asyncio.gather(
+            *(replay_log(path, adapter, args.realtime, args.speed) for path in paths)
+        )
+        wall = time.perf_counter() - started
+    finally:
+        close = getattr(adapter, "close", None)
+        if close:
+            close()
+
+    sessions = {session_id: result for session_id, result, _ in results}
+    for session_id, result in sessions.items():
+        for warning in result.get("warnings", []):
+            log(f"WARNING {session_id}: {warning}")
+        log(
+            f"{session_id:<24} packets={result['packets']:<6} "
+            f"segments={len(result['decisions']):<4} "
+            f"p99={result['timings']['packet_us'].get('p99', 0.0):.1f}us"
+        )
+    all_packet_us = [value for _, _, packet_us in results for value in packet_us]
+    return {
+        "commit": git_commit(),
+        "vad": args.vad,
+        "realtime": args.realtime,
+        "speed": args.speed if args.realtime else None,
+        "summary": {
+            "sessions": len(sessions),
+            "segments": sum(len(r["decisions"]) for r in sessions.values()),
+            "audio_seconds": round(
+                sum(r["audio_seconds"] for r in sessions.values()), 3
+            ),
+            "wall_seconds": round(wall, 3),
+            "packet_us": percentiles(all_packet_us),
+        },
+        "sessions": sessions,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="受信ログの再生と判定の比較")
+    parser.add_argument(
+        "paths", nargs="+", help="受信ログ（*.ril）またはそのディレクトリ"
+    )
+    parser.add_argument(
+        "--realtime", action="store_true", help="記録時の受信間隔どおりに再生する"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="--realtime の再生速度の倍率"
+    )
+    parser.add_argument("--vad", default="mock", help="mock, silero, pool-silero など")
+    parser.add_argument("--threads", type=int, default=1, help="torch のスレッド数")
+    parser.add_argument("--pool-workers", type=int, default=2)
+    parser.add_argument("--json", help="結果の JSON の出力先")
+    parser.add_argument("--baseline", help="比較する以前の結果の JSON")
+    args = parser.parse_args(argv)
+
+    if not find_logs(args.paths):
+        print("No ingest logs found", file=sys.stderr)
+        return 2
+    report = asyncio.run(run(args))
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("vad") != report["vad"]:
+            print(f"WARNING baseline VAD is {baseline.get('vad')}, not {report['vad']}")
+        changes, timings = compare(report, baseline)
+        print(f"Baseline {baseline.get('commit')} -> {report['commit']}")
+        for line in timings:
+            print(f"  {line}")
+        for line in changes:
+            print(f"CHANGED {line}")
+        if changes:
+            return 1
+        print(f"No segmentation changes in {len(baseline['sessions'])} sessions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,429 @@
+"""
+WebSocket の負荷試験ツール
+
+N 本の /ws セッションを同時に開き、WAV ファイルまたは合成した発話・無音パターンを
+フロントエンドと同じ大きさのパケット（512 サンプル = 1024 バイト）で実時間
+（または --speed 倍速）で送信する。受信確認・文字起こし結果までの遅延とエラーを記録し、
+p50/p95/p99 と比較用の JSON を出力する。
+
+文字起こし結果の遅延は、結果の timings.speech_end（発話の終わり）を含むパケットを
+送信した時刻から結果を受信するまでの時間（サーバーの結合待ち・文字起こし・送信を含む）。
+
+モックのアダプターでローカルに完結させる場合（--spawn でサーバーも起動する）:
+    python src/loadtest.py --spawn --sessions 50 --duration 30 --json result.json
+
+起動済みのサーバーに対して WAV を 2 倍速で流し、前回の結果と比較する:
+    python src/loadtest.py --url ws://localhost:8000/ws --wav a.wav --speed 2 \\
+        --compare baseline.json
+
+--spawn 以外でモックを使う場合、発話・無音を区切れるようサーバーを
+TESTING=true MOCK_VAD_ENERGY_THRESHOLD=0.01 で起動しておく。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import wave
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+PACKET_SAMPLES = 512  # フロントエンドの AudioWorklet と同じ
+MOCK_VAD_ENERGY_THRESHOLD = "0.01"
+ERROR_TYPES = {"error", "transcription_error", "segment_merge_error"}
+
+
+def parse_pattern(pattern: str) -> list[tuple[str, float]]:
+    """例: speech:2,silence:1 -> [("speech", 2.0), ("silence", 1.0)]"""
+    parts = []
+    for item in pattern.split(","):
+        kind, _, seconds = item.strip().partition(":")
+        if kind not in ("speech", "silence") or not seconds:
+            raise ValueError(f"Invalid pattern item: {item!r}")
+        parts.append((kind, float(seconds)))
+    return parts
+
+
+def synthesize(pattern: list[tuple[str, float]], duration: float, seed: int) -> bytes:
+    """
+    発話・無音のパターンを duration 秒になるまで繰り返した 16bit PCM を作る
+
+    発話は基本周波数と倍音に音節程度（4Hz）の抑揚を付けた音、無音は弱いノイズ
+    """
+    rng = np.random.default_rng(seed)
+    chunks = []
+    total = 0
+    while total < duration * SAMPLE_RATE:
+        for kind, seconds in pattern:
+            n = int(seconds * SAMPLE_RATE)
+            t = np.arange(n) / SAMPLE_RATE
+            if kind == "speech":
+                f0 = rng.uniform(110, 220)
+                voice = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in (1, 2, 3))
+                envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t + rng.uniform(0, 6))
+                chunk = 0.2 * voice * envelope + rng.normal(0, 0.002, n)
+            else:
+                chunk = rng.normal(0, 0.002, n)
+            chunks.append(chunk)
+            total += n
+    audio = np.concatenate(chunks)[: int(duration * SAMPLE_RATE)]
+    return (np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def load_wav(path: str) -> bytes:
+    with wave.open(path, "rb") as wf:
+        if (wf.getframerate(), wf.getnchannels(), wf.getsampwidth()) != (
+            SAMPLE_RATE,
+            1,
+            SAMPLE_WIDTH,
+        ):
+            raise ValueError(f"{path}: expected 16kHz mono 16bit PCM WAV")
+        return wf.readframes(wf.getnframes())
+
+
+def packetize(pcm: bytes, packet_samples: int = PACKET_SAMPLES) -> list[bytes]:
+    size = packet_samples * SAMPLE_WIDTH
+    return [pcm[i : i + size] for i in range(0, len(pcm) - size + 1, size)]
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def at(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+    return {
+        "count": len(ordered),
+        "p50": at(0.5),
+        "p95": at(0.95),
+        "p99": at(0.99),
+        "max": round(ordered[-1], 2),
+    }
+
+
+@dataclass
+class SessionResult:
+    """1セッション分の計測値（時間はミリ秒）"""
+
+    connect_ms: Optional[float] = None
+    ack_ms: list[float] = field(default_factory=list)
+    result_ms: list[float] = field(default_factory=list)
+    send_lag_ms: list[float] = field(default_factory=list)  # 予定時刻からの送信遅れ
+    packets_sent: int = 0
+    final_results: int = 0
+    interim_results: int = 0
+    errors: Counter = field(default_factory=Counter)
+    rejected: str = ""
+    completed: bool = False
+
+
+async def run_session(
+    url: str, packets: list[bytes], speed: float, tail: float, start_delay: float
+) -> SessionResult:
+    result = SessionResult()
+    await asyncio.sleep(start_delay)
+    packet_seconds = len(packets[0]) / SAMPLE_WIDTH / SAMPLE_RATE if packets else 0.0
+    sent_at = [0.0] * len(packets)  # packet_count（1始まり）- 1 -> 送信時刻
+    loop = asyncio.get_running_loop()
+    established = loop.create_future()
+    separator = "&" if "?" in url else "?"
+
+    async def receive(ws):
+        try:
+            async for raw in ws:
+                await handle(ws, raw)
+        except ConnectionClosed:
+            pass  # 送信側で検知する
+
+    async def handle(ws, raw):
+        now = time.perf_counter()
+        message = json.loads(raw)
+        kind = message.get("type")
+        if kind == "connection_established" and not established.done():
+            established.set_result(now)
+        elif kind == "audio_received":
+            index = message.get("packet_count", 0) - 1
+            if 0 <= index < len(sent_at) and sent_at[index]:
+                result.ack_ms.append((now - sent_at[index]) * 1000)
+        elif kind == "transcription_result":
+            if not message.get("is_final", True):
+                result.interim_results += 1
+                return
+            result.final_results += 1
+            speech_end = (message.get("timings") or {}).get("speech_end")
+            if speech_end is not None and packet_seconds:
+                index = min(int(speech_end / packet_seconds), len(sent_at) - 1)
+                if sent_at[index]:
+                    result.result_ms.append((now - sent_at[index]) * 1000)
+        elif kind == "ping":
+            await ws.send(json.dumps({"type": "pong", "nonce": message.get("nonce")}))
+        elif kind in ("connection_rejected", "session_redirect"):
+            result.rejected = message.get("reason") or kind
+            if not established.done():
+                established.set_exception(ConnectionError(result.rejected))
+        elif kind in ERROR_TYPES:
+            result.errors[kind] += 1
+
+    started = time.perf_counter()
+    try:
+        async with connect(f"{url}{separator}timings=1", max_size=None) as ws:
+            receiver = asyncio.create_task(receive(ws))
+            try:
+                connected_at = await asyncio.wait_for(established, 10)
+                result.connect_ms = (connected_at - started) * 1000
+                t0 = time.perf_counter()
+                for index, packet in enumerate(packets):
+                    if speed > 0:
+                        due = t0 + index * packet_seconds / speed
+                        delay = due - time.perf_counter()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        result.send_lag_ms.append(
+                            max(0.0, time.perf_counter() - due) * 1000
+                        )
+                    sent_at[index] = time.perf_counter()
+                    await ws.send(packet)
+                    result.packets_sent += 1
+                # 最後の発話の結果（結合待ち・文字起こし）を待ってから閉じる
+                await asyncio.sleep(tail)
+                result.completed = True
+            finally:
+                receiver.cancel()
+    except ConnectionError:
+        pass
+    except ConnectionClosed as e:
+        result.errors[f"closed_{e.rcvd.code if e.rcvd else 'abnormal'}"] += 1
+    except (OSError, asyncio.TimeoutError) as e:
+        result.errors[type(e).__name__] += 1
+    return result
+
+
+def summarize(results: list[SessionResult], wall: float, audio_seconds: float) -> dict:
+    errors = Counter()
+    for r in results:
+        errors.update(r.errors)
+
+    def collect(name: str) -> list[float]:
+        return [v for r in results for v in getattr(r, name)]
+
+    return {
+        "wall_seconds": round(wall, 2),
+        "audio_seconds_per_session": round(audio_seconds, 2),
+        "sessions": {
+            "started": len(results),
+            "completed": sum(r.completed for r in results),
+            "rejected": sum(bool(r.rejected) for r in results),
+            "failed": sum(not r.completed and not r.rejected for r in results),
+        },
+        "rejections": dict(Counter(r.rejected for r in results if r.rejected)),
+        "packets_sent": sum(r.packets_sent for r in results),
+        "acks": len(collect("ack_ms")),
+        "final_results": sum(r.final_results for r in results),
+        "interim_results": sum(r.interim_results for r in results),
+        "errors": dict(errors),
+        "latency_ms": {
+            "connect": percentiles(
+                [r.connect_ms for r in results if r.connect_ms is not None]
+            ),
+            "ack": percentiles(collect("ack_ms")),
+            "result": percentiles(collect("result_ms")),
+            "send_lag": percentiles(collect("send_lag_ms")),
+        },
+    }
+
+
+def print_report(summary: dict, baseline: Optional[dict] = None):
+    sessions = summary["sessions"]
+    print(
+        f"sessions: {sessions['completed']}/{sessions['started']} completed, "
+        f"{sessions['rejected']} rejected, {sessions['failed']} failed"
+    )
+    print(
+        f"packets: {summary['packets_sent']} sent, {summary['acks']} acked; "
+        f"results: {summary['final_results']} final, "
+        f"{summary['interim_results']} interim"
+    )
+    if summary["errors"]:
+        print(f"errors: {summary['errors']}")
+    width = 18 if baseline else 10
+    print(
+        f"{'latency (ms)':<14}{'count':>8}"
+        + "".join(f"{key:>{width}}" for key in ("p50", "p95", "p99", "max"))
+    )
+    for name, stats in summary["latency_ms"].items():
+        previous = (baseline or {}).get("latency_ms", {}).get(name, {})
+        row = f"{name:<14}{stats['count']:>8}"
+        for key in ("p50", "p95", "p99", "max"):
+            value = stats.get(key)
+            cell = f"{value:.1f}" if value is not None else "-"
+            if value is not None and previous.get(key):
+                cell += f" ({(value - previous[key]) / previous[key]:+.0%})"
+            row += f"{cell:>{width}}"
+        print(row)
+    if summary["latency_ms"]["send_lag"].get("p99", 0) > 50:
+        print(
+            "warning: the load generator fell behind schedule; results understate load"
+        )
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def spawn_server(port: int) -> subprocess.Popen:
+    """モックのアダプターでサーバーを起動し、readiness が 200 になるまで待つ"""
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "dummy")
+    env["TESTING"] = "true"
+    env["MOCK_VAD_ENERGY_THRESHOLD"] = env.get(
+        "MOCK_VAD_ENERGY_THRESHOLD", MOCK_VAD_ENERGY_THRESHOLD
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Server exited during startup")
+        try:
+            url = f"http://127.0.0.1:{port}/api/v1/health/ready"
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Server did not become ready")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(args) -> dict:
+    if args.wav:
+        sources = [load_wav(path) for path in args.wav]
+        if args.duration:
+            max_bytes = int(args.duration * SAMPLE_RATE) * SAMPLE_WIDTH
+            sources = [pcm[:max_bytes] for pcm in sources]
+    else:
+        pattern = parse_pattern(args.pattern)
+        # セッション毎に声の高さ・抑揚を変える（同じ音声の一斉送信を避ける）
+        sources = [
+            synthesize(pattern, args.duration, seed=args.seed + i)
+            for i in range(min(args.sessions, 16))
+        ]
+    packet_lists = [packetize(pcm, args.packet_samples) for pcm in sources]
+    audio_seconds = len(sources[0]) / SAMPLE_WIDTH / SAMPLE_RATE
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            run_session(
+                args.url,
+                packet_lists[i % len(packet_lists)],
+                args.speed,
+                args.tail,
+                start_delay=args.ramp_up * i / args.sessions,
+            )
+            for i in range(args.sessions)
+        )
+    )
+    summary = summarize(results, time.perf_counter() - started, audio_seconds)
+    summary["commit"] = git_commit()
+    summary["config"] = {
+        "sessions": args.sessions,
+        "speed": args.speed,
+        "packet_samples": args.packet_samples,
+        "source": args.wav or args.pattern,
+        "duration": audio_seconds,
+        "ramp_up": args.ramp_up,
+    }
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="WebSocket の負荷試験")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/ws")
+    parser.add_argument(
+        "--spawn", action="store_true", help="モックでサーバーを起動する"
+    )
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--wav", nargs="*", help="16kHz モノラル 16bit の WAV")
+    parser.add_argument(
+        "--pattern",
+        default="speech:2.5,silence:1.5",
+        help="合成音声のパターン（speech:秒,silence:秒,... を繰り返す）",
+    )
+    parser.add_argument("--duration", type=float, default=20.0, help="送信する秒数")
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="送信速度の倍率（0 で待たずに送る）"
+    )
+    parser.add_argument("--packet-samples", type=int, default=PACKET_SAMPLES)
+    parser.add_argument(
+        "--ramp-up", type=float, default=1.0, help="全セッションを開くまでの秒数"
+    )
+    parser.add_argument(
+        "--tail", type=float, default=3.0, help="送信後に結果を待つ秒数"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="集計結果の JSON の出力先")
+    parser.add_argument("--compare", help="比較する以前の JSON")
+    args = parser.parse_args(argv)
+    if args.sessions < 1:
+        parser.error("--sessions must be >= 1")
+
+    server = None
+    if args.spawn:
+        port = free_port()
+        server = spawn_server(port)
+        args.url = f"ws://127.0.0.1:{port}/ws"
+    try:
+        summary = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(summary, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    return 0 if summary["sessions"]["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,97 @@
+import asyncio
 import logging
+import signal
+import threading
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, WebSocket, Depends
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1.router import api_router
-from app.websocket.handlers import websocket_endpoint, initialize_manager
+from app.services.loop_monitor import get_loop_monitor
+from app.websocket.handlers import (
+    websocket_endpoint,
+    initialize_manager,
+    drain_connections,
+    get_manager,
+    shutdown_manager,
+)
 from app.api.deps import get_transcription_adapter, get_vad_adapter
 
+logger = logging.getLogger(__name__)
+
+_drain_tasks: set[asyncio.Task] = set()
+
+
+def drain_on_signal(signum: int):
+    """
+    シグナルを受けたら、先に WebSocket セッションをドレインしてから uvicorn の停止処理に渡す
+    （uvicorn は lifespan の shutdown より前に WebSocket を 1012 で閉じてしまうため）
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    previous = signal.getsignal(signum)
+    if not callable(previous):
+        return
+    loop = asyncio.get_running_loop()
+
+    async def drain_then_exit(sig, frame):
+        try:
+            await drain_connections()
+        except Exception as e:
+            logger.error(f"[Drain] Failed to drain connections: {e}")
+        finally:
+            previous(sig, frame)
+
+    def handler(sig, frame):
+        # 2回目のシグナルはドレインを待たずに元の停止処理へ
+        signal.signal(sig, previous)
+        logger.info(f"[Drain] Received signal {sig}, draining before shutdown")
+        loop.call_soon_threadsafe(start_drain, sig, frame)
+
+    def start_drain(sig, frame):
+        task = loop.create_task(drain_then_exit(sig, frame))
+        _drain_tasks.add(task)
+        task.add_done_callback(_drain_tasks.discard)
+
+    signal.signal(signum, handler)
+
+
+async def warm_up_manager():
+    """最初の接続を待たずに ConnectionManager を作り、モデルを温める"""
+    try:
+        # モデルの読み込み（torch.hub 等）はイベントループ外で行う
+        transcription_adapter, vad_adapter = await asyncio.to_thread(
+            lambda: (get_transcription_adapter(), get_vad_adapter())
+        )
+        initialize_manager(transcription_adapter, vad_adapter)
+        await get_manager().warm_up()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"[Readiness] Warm-up failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    drain_on_signal(signal.SIGTERM)
+    # WebSocket 以外（ヘルスチェック等）がループを止めた場合も検知できるよう起動時から測る
+    get_loop_monitor().ensure_started()
+    # モデルの読み込みとウォームアップはバックグラウンドで行う
+    # （その間も liveness には応答し、readiness は 503 を返す）
+    warm_up = asyncio.create_task(warm_up_manager())
+    yield
+    warm_up.cancel()
+    # シグナル以外で停止した場合もここでドレインする（ドレイン済みなら閉じるだけ）
+    await shutdown_manager()
+    await get_loop_monitor().stop()
+
+
 app = FastAPI(
     title="VAD Transcriber API",
     description="リアルタイム音声認識とVADのためのWebSocket API",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS設定（フロントエンドからのアクセスを許可）
@@ -0,0 +1,422 @@
+"""
+発話区間検出と結合待ちの仮想時刻シミュレーション
+
+数千の合成セッションを、サーバーと同じ受信処理（process_audio_data → Segmenter →
+SegmentMerger → 文字起こし → 結果送信）に仮想時刻で流す。タイマー（結合待ち・死活監視）は
+VirtualTimerScheduler で発火させるので実際には待たず、60 秒の会話 1000 本が数十秒で終わる。
+
+- VAD はセッション毎の台本（発話と間の長さ）どおりの音声確率を返す
+  （発話の長さは対数正規分布、間は区切らない短い間と区切る長い間の混合）
+- 文字起こしはモックで即座に返す（結果の遅延 = 発話終了から確定・結合待ちまでの仮想時間）
+- 全セッションの終了後、セッション毎の状態（バッファ・保留セグメント・タイマー）が
+  残っていないこと、確定したセグメントが全て文字起こし・スキップ・結合のいずれかになったことを
+  確認し、満たさなければ終了コード 1 を返す
+  （切断時に確定したセグメントの結果は接続がないので届かない。undelivered として表示する）
+
+    python src/simulate.py --sessions 2000 --duration 60 --json sim.json
+
+発話区間検出・結合待ちの設定（VAD_SILENCE_TOLERANCE, SEGMENT_MERGE_TIMEOUT など）は
+サーバーと同じ環境変数で変えられる。
+"""
+
+import argparse
+import asyncio
+import heapq
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+# シミュレーションでは音声を保存しない（handlers の import 時に保存先を作らない）
+os.environ.setdefault("AUDIO_RETENTION", "false")
+
+from loadtest import percentiles  # noqa: E402
+
+from app.adapters.base import VADAdapter  # noqa: E402
+from app.adapters.transcription import MockTranscriptionAdapter  # noqa: E402
+from app.services import metrics  # noqa: E402
+from app.services.audio_writer import AudioSegmentWriter  # noqa: E402
+from app.services.virtual_time import VirtualTimerScheduler  # noqa: E402
+from app.websocket import handlers  # noqa: E402
+
+FRAME_SECONDS = handlers.VAD_FRAME_SIZE / handlers.SAMPLE_RATE
+SPEECH_PROB = 0.9
+SILENCE_PROB = 0.05
+SEGMENT_REASONS = ("silence", "max_duration", "flush")
+
+
+@dataclass
+class SpeechModel:
+    """合成セッションの話し方（秒）"""
+
+    utterance_median: float = 1.2  # 発話の長さ（対数正規分布の中央値）
+    utterance_sigma: float = 0.8
+    short_pause_ratio: float = 0.5  # 区切らない短い間の割合
+    short_pause: tuple[float, float] = (0.2, 1.2)  # 一様分布の範囲
+    long_pause: tuple[float, float] = (1.6, 4.0)
+
+
+def make_script(model: SpeechModel, duration: float, rng: random.Random) -> bytearray:
+    """フレーム毎の発話フラグ（1=発話）。先頭は無音から始める"""
+    frames = int(duration / FRAME_SECONDS)
+    script = bytearray(frames)
+    position = int(rng.uniform(0.2, 1.0) / FRAME_SECONDS)
+    while position < frames:
+        seconds = model.utterance_median * rng.lognormvariate(0, model.utterance_sigma)
+        length = max(1, int(min(20.0, seconds) / FRAME_SECONDS))
+        script[position : position + length] = b"\x01" * min(length, frames - position)
+        pause = (
+            model.short_pause
+            if rng.random() < model.short_pause_ratio
+            else model.long_pause
+        )
+        position += length + int(rng.uniform(*pause) / FRAME_SECONDS)
+    return script
+
+
+class ScriptedVADAdapter(VADAdapter):
+    """セッション毎の台本どおりに音声確率を返す VAD（フレームの中身は見ない）"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.scripts: dict[str, bytearray] = {}
+        self.positions: dict[str, int] = {}
+
+    def add_session(self, key: str, script: bytearray):
+        self.scripts[key] = script
+        self.positions[key] = 0
+
+    def remove_session(self, key: str):
+        self.scripts.pop(key, None)
+        self.positions.pop(key, None)
+
+    async def health_check(self) -> bool:
+        return True
+
+    def predict(
+        self, audio_bytes: bytes, sample_rate: int = 16000, threshold: float = 0.5
+    ) -> tuple[bool, float]:
+        return False, SILENCE_PROB
+
+    def get_optimal_chunk_size(self) -> int:
+        return handlers.VAD_FRAME_SIZE * handlers.SAMPLE_WIDTH
+
+    async def predict_frames(
+        self, frames: list[bytes], sample_rate: int = 16000, key: str = ""
+    ) -> list[float]:
+        script = self.scripts.get(key, b"")
+        start = self.positions.get(key, 0)
+        self.positions[key] = start + len(frames)
+        return [
+            SPEECH_PROB if index < len(script) and script[index] else SILENCE_PROB
+            for index in range(start, start + len(frames))
+        ]
+
+
+class CountingTranscriptionAdapter(MockTranscriptionAdapter):
+    """文字起こしの回数を数えるモック"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    async def transcribe(self, audio_bytes: bytes, *args, **kwargs) -> str:
+        self.calls += 1
+        return await super().transcribe(audio_bytes, *args, **kwargs)
+
+
+class SimulatedWebSocket:
+    """受け取ったメッセージを数えるだけの WebSocket（ping には即座に pong を返す）"""
+
+    def __init__(self, client_id: str, report: "SimulationReport"):
+        self.client_id = client_id
+        self.report = report
+        self.query_params = {"timings": "1"}
+        self.state = "connected"
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.report.server_closes += 1
+
+    async def send_text(self, message: str):
+        # 受信確認・統計は数が多いので中身を見ない
+        if '"type": "audio_received"' in message or '"type": "statistics"' in message:
+            return
+        data = json.loads(message)
+        kind = data.get("type")
+        self.report.messages[kind] = self.report.messages.get(kind, 0) + 1
+        if kind == "ping":
+            handlers.manager.liveness.on_pong(self.client_id, data.get("nonce"))
+        elif kind == "transcription_result":
+            for key, value in (data.get("timings") or {}).items():
+                if key.endswith("_ms"):
+                    self.report.timings.setdefault(key, []).append(value)
+
+
+@dataclass
+class SimulationReport:
+    messages: dict[str, int] = field(default_factory=dict)
+    timings: dict[str, list[float]] = field(default_factory=dict)
+    server_closes: int = 0
+    peak_session_bytes: int = 0
+    peak_pending_segments: int = 0
+    peak_pending_timers: int = 0
+    peak_timer_heap: int = 0
+
+
+@dataclass
+class SimulatedSession:
+    client_id: str
+    start: float
+    packets: int
+    sent: int = 0
+    connected: bool = False
+
+
+def leftover_state(manager: handlers.ConnectionManager) -> dict:
+    """全セッション終了後に残っているセッション毎の状態（空でなければリーク）"""
+    merger = manager.segment_merger
+    state = {
+        "active_connections": len(manager.active_connections),
+        "segmenters": len(manager.segmenters),
+        "pcm_buffer": len(manager.pcm_buffer),
+        "last_speech_at": len(manager.last_speech_at),
+        "session_paths": len(manager.session_paths),
+        "client_models": len(manager.client_models),
+        "segment_timings": len(manager.segment_timings.traces),
+        "session_resume": len(manager.session_resume.sessions),
+        "liveness": len(manager.liveness.sessions),
+        "pending_timers": manager.timer_scheduler.pending_count,
+    }
+    if merger:
+        state["merge_pending_segments"] = len(merger.pending_segments)
+        state["merge_pending_timers"] = len(merger.pending_timers)
+        state["merge_last_hold_time"] = len(merger.last_hold_time)
+        if merger.policy:
+            state["merge_policy"] = len(merger.policy.gaps)
+    return {key: value for key, value in state.items() if value}
+
+
+def segment_counts() -> dict:
+    counts = {
+        reason: metrics.SEGMENTS_TOTAL.value(reason=reason)
+        for reason in SEGMENT_REASONS
+    }
+    counts["skipped"] = metrics.SEGMENTS_SKIPPED_TOTAL.value(reason="too_short")
+    return counts
+
+
+async def simulate(args, log: Callable[[str], None] = print) -> dict:
+    rng = random.Random(args.seed)
+    model = SpeechModel(
+        utterance_median=args.utterance_median,
+        short_pause_ratio=args.short_pause_ratio,
+    )
+    scheduler = VirtualTimerScheduler()
+    vad = ScriptedVADAdapter()
+    transcription = CountingTranscriptionAdapter()
+    manager = handlers.ConnectionManager(
+        transcription_adapter=transcription,
+        vad_adapter=vad,
+        scheduler=scheduler,
+    )
+    if manager.audio_writer.enabled:
+        # import 済みの handlers で音声保存が有効でも、シミュレーションでは保存しない
+        manager.audio_writer.close()
+        manager.audio_writer = AudioSegmentWriter(enabled=False)
+    previous_manager, handlers.manager = handlers.manager, manager
+
+    report = SimulationReport()
+    packet = bytes(args.packet_frames * handlers.VAD_FRAME_SIZE * handlers.SAMPLE_WIDTH)
+    packet_seconds = args.packet_frames * FRAME_SECONDS
+    packets_per_session = int(args.duration / packet_seconds)
+    sessions = [
+        SimulatedSession(f"sim-{i}", rng.uniform(0, args.ramp), packets_per_session)
+        for i in range(args.sessions)
+    ]
+    events = [(session.start, index) for index, session in enumerate(sessions)]
+    heapq.heapify(events)
+    segments_before = segment_counts()
+    next_sample = 0.0
+    wall_started = time.perf_counter()
+
+    try:
+        while events:
+            at, index = heapq.heappop(events)
+            await scheduler.advance_to(at)
+            if at >= next_sample:
+                sample(manager, report)
+                next_sample = at + args.sample_interval
+
+            session = sessions[index]
+            client_id = session.client_id
+            if not session.connected:
+                session.connected = True
+                vad.add_session(client_id, make_script(model, args.duration, rng))
+                await manager.connect(SimulatedWebSocket(client_id, report), client_id)
+            if session.sent < session.packets:
+                manager.liveness.touch(client_id, audio=True)
+                await handlers.process_audio_data(packet, client_id)
+                session.sent += 1
+                heapq.heappush(events, (at + packet_seconds, index))
+            else:
+                await manager.async_disconnect(client_id)
+                vad.remove_session(client_id)
+            if manager.transcription_tasks:
+                await asyncio.gather(*list(manager.transcription_tasks))
+
+        # 最後のタイマー（死活監視の巡回など）が止まるまで進める
+        await scheduler.advance(
+            max(handlers.LIVENESS_SWEEP_INTERVAL_SECONDS, args.sample_interval) + 1
+        )
+        if manager.transcription_tasks:
+            await asyncio.gather(*list(manager.transcription_tasks))
+        wall = time.perf_counter() - wall_started
+        leftovers = leftover_state(manager)
+    finally:
+        handlers.manager = previous_manager
+        await scheduler.close()
+        manager.audio_writer.close()
+        manager.ingest_recorder.close()
+
+    segments = {
+        reason: int(count - segments_before[reason])
+        for reason, count in segment_counts().items()
+    }
+    skipped = segments.pop("skipped")
+    merged = manager.segment_merger.stats.merged if manager.segment_merger else 0
+    transcribed = transcription.calls
+    results = report.messages.get("transcription_result", 0)
+    errors = sum(
+        report.messages.get(kind, 0)
+        for kind in ("error", "transcription_error", "segment_merge_error")
+    )
+    problems = [f"leftover state: {key}={value}" for key, value in leftovers.items()]
+    if transcribed + skipped + merged != sum(segments.values()):
+        problems.append(
+            f"segments {sum(segments.values())} != transcribed {transcribed} + "
+            f"skipped {skipped} + merged {merged}"
+        )
+    if errors:
+        problems.append(f"{errors} error messages")
+
+    audio_seconds = args.sessions * packets_per_session * packet_seconds
+    summary = {
+        "sessions": args.sessions,
+        "virtual_seconds": round(scheduler.clock.now, 3),
+        "audio_seconds": round(audio_seconds, 1),
+        "wall_seconds": round(wall, 3),
+        "speedup": round(audio_seconds / wall, 1) if wall else None,
+        "segments": segments,
+        "transcribed": transcribed,
+        "results": results,
+        "undelivered": transcribed - results,  # 切断後に文字起こしが終わった分
+        "skipped": skipped,
+        "merged": merged,
+        "merge": manager.segment_merger.get_stats() if manager.segment_merger else None,
+        "liveness": manager.liveness.get_stats(),
+        "timings_ms": {
+            key: percentiles(values) for key, values in report.timings.items()
+        },
+        "peak": {
+            "session_bytes": report.peak_session_bytes,
+            "pending_segments": report.peak_pending_segments,
+            "pending_timers": report.peak_pending_timers,
+            "timer_heap": report.peak_timer_heap,
+            "max_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            ),
+        },
+        "problems": problems,
+    }
+    log(
+        f"{args.sessions} sessions x {args.duration:g}s in {wall:.1f}s "
+        f"({summary['speedup']}x realtime), {sum(segments.values())} segments, "
+        f"{transcribed} transcribed ({transcribed - results} undelivered), "
+        f"{merged} merged, {skipped} skipped"
+    )
+    for key, stats in summary["timings_ms"].items():
+        if stats.get("count"):
+            log(
+                f"  {key:<18} p50={stats['p50']:>9.1f} p99={stats['p99']:>9.1f} max={stats['max']:>9.1f}"
+            )
+    log(
+        f"  peak session memory {report.peak_session_bytes / 1024 / 1024:.1f}MB, "
+        f"pending segments {report.peak_pending_segments}, "
+        f"timers {report.peak_pending_timers} (heap {report.peak_timer_heap})"
+    )
+    for problem in problems:
+        log(f"PROBLEM {problem}")
+    return summary
+
+
+def sample(manager: handlers.ConnectionManager, report: SimulationReport):
+    """セッションが保持しているメモリとタイマーの数のピークを記録する"""
+    report.peak_session_bytes = max(
+        report.peak_session_bytes,
+        sum(manager.session_memory_bytes(c) for c in manager.segmenters),
+    )
+    if manager.segment_merger:
+        report.peak_pending_segments = max(
+            report.peak_pending_segments, len(manager.segment_merger.pending_segments)
+        )
+    report.peak_pending_timers = max(
+        report.peak_pending_timers, manager.timer_scheduler.pending_count
+    )
+    report.peak_timer_heap = max(
+        report.peak_timer_heap, len(manager.timer_scheduler._heap)
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="発話区間検出と結合待ちのシミュレーション"
+    )
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument(
+        "--duration", type=float, default=60.0, help="1セッションの秒数"
+    )
+    parser.add_argument(
+        "--ramp", type=float, default=10.0, help="セッションの開始をばらつかせる秒数"
+    )
+    parser.add_argument(
+        "--packet-frames",
+        type=int,
+        default=8,
+        help="1パケットのフレーム数（1 でフロントエンドと同じ 32ms、大きいほど速い）",
+    )
+    parser.add_argument("--utterance-median", type=float, default=1.2)
+    parser.add_argument("--short-pause-ratio", type=float, default=0.5)
+    parser.add_argument(
+        "--sample-interval", type=float, default=1.0, help="メモリ等を記録する仮想秒"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="結果の JSON の出力先")
+    parser.add_argument("--verbose", action="store_true", help="サーバーのログも出す")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if not args.verbose:
+        # 受信処理はフレーム毎に INFO ログを、切断後の結果送信は WARNING を出すので止める
+        logging.disable(logging.WARNING)
+    summary = asyncio.run(simulate(args))
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary["problems"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
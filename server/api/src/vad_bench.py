@@ -0,0 +1,266 @@
+"""
+VAD アダプターのマイクロベンチマーク
+
+VADAdapter の実装毎に、次の3種類の呼び出し方で frames/秒・呼び出し毎の遅延・RSS を測る。
+torch のスレッド数（プロセスプールは推論プロセス毎のスレッド数）を変えて繰り返す。
+  single   : predict で1フレームずつ（同期）
+  batch-N  : predict_frames で N フレームずつ
+  streams-N: N 本のセッションが並行して1パケット（1フレーム）ずつ predict_frames を呼ぶ
+             （サーバーの受信処理と同じ呼び出し方）
+
+    python src/vad_bench.py --backends mock,silero,pool-silero --threads 1,2,4 \\
+        --json result.json
+    # 基準値として保存し、以降の実行で frames/秒が 15% 以上落ちたら終了コード 1
+    python src/vad_bench.py --save-baseline benchmarks/vad_baseline.json
+    python src/vad_bench.py --baseline benchmarks/vad_baseline.json --tolerance 0.15
+
+基準値はマシンに依存するので、同じマシン（CI ランナー）で取ったものと比較する。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from typing import Callable, Optional
+
+from loadtest import git_commit, packetize, parse_pattern, percentiles, synthesize
+
+from app.adapters.base import VADAdapter
+
+FRAME_SAMPLES = 512
+SAMPLE_RATE = 16000
+
+
+def rss_mb(pids: list[int]) -> float:
+    """このプロセスと pids（推論プロセス）の現在の RSS の合計（MB）"""
+    total_kb = 0
+    for pid in ["self", *pids]:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            pass
+    if not total_kb:  # /proc がない環境では最大 RSS で代用
+        total_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(total_kb / 1024, 1)
+
+
+def make_adapter(backend: str, threads: int, pool_workers: int) -> VADAdapter:
+    import torch
+
+    if backend.startswith("pool-"):
+        from app.adapters.vad_pool import ProcessPoolVADAdapter
+
+        return ProcessPoolVADAdapter(
+            num_workers=pool_workers,
+            threads_per_worker=threads,
+            model_kind=backend.removeprefix("pool-"),
+        )
+    torch.set_num_threads(threads)
+    if backend == "silero":
+        from app.adapters.vad import SileroVADAdapter
+
+        return SileroVADAdapter()
+    if backend == "mock":
+        from app.adapters.vad import MockVADAdapter
+
+        return MockVADAdapter(energy_threshold=0.01)
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+def worker_pids(adapter: VADAdapter) -> list[int]:
+    return [w.process.pid for w in getattr(adapter, "workers", []) if w.process]
+
+
+async def run_case(
+    adapter: VADAdapter, case: str, frames: list[bytes], min_seconds: float
+) -> dict:
+    """
+    1つの呼び出し方を min_seconds 秒以上（かつ frames を1周以上）繰り返して測る
+    """
+    latencies: list[float] = []
+    kind, _, size = case.partition("-")
+    size = int(size or 1)
+    processed = 0
+
+    async def call(batch: list[bytes], key: str) -> None:
+        started = time.perf_counter()
+        if kind == "single":
+            adapter.predict(batch[0], SAMPLE_RATE)
+        else:
+            await adapter.predict_frames(batch, SAMPLE_RATE, key=key)
+        latencies.append((time.perf_counter() - started) * 1_000_000)
+
+    started = time.perf_counter()
+    position = 0
+    while position < len(frames) or time.perf_counter() - started < min_seconds:
+        if kind == "streams":
+            # size 本のセッションがそれぞれ1フレームずつ並行して投げる
+            batch = [frames[(position + i) % len(frames)] for i in range(size)]
+            await asyncio.gather(
+                *(call([frame], f"stream-{i}") for i, frame in enumerate(batch))
+            )
+        else:
+            batch = [
+                frames[(position + i) % len(frames)]
+                for i in range(1 if kind == "single" else size)
+            ]
+            await call(batch, "bench")
+        position += len(batch)
+        processed += len(batch)
+    elapsed = time.perf_counter() - started
+    return {
+        "frames": processed,
+        "seconds": round(elapsed, 3),
+        "frames_per_second": round(processed / elapsed, 1),
+        "latency_us": percentiles(latencies),  # 呼び出し1回あたり
+    }
+
+
+async def run_backend(
+    backend: str,
+    threads: int,
+    cases: list[str],
+    frames: list[bytes],
+    args,
+    log: Callable[[str], None],
+) -> list[dict]:
+    try:
+        adapter = await asyncio.to_thread(
+            make_adapter, backend, threads, args.pool_workers
+        )
+    except Exception as e:
+        log(f"skip {backend} (threads={threads}): {e}")
+        return []
+    results = []
+    try:
+        await adapter.warm_up()
+        for case in cases:
+            measured = await run_case(adapter, case, frames, args.min_seconds)
+            measured.update(
+                {
+                    "backend": backend,
+                    "case": case,
+                    "threads": threads,
+                    "rss_mb": rss_mb(worker_pids(adapter)),
+                }
+            )
+            log(
+                f"{backend:<12} {case:<11} threads={threads:<3}"
+                f"{measured['frames_per_second']:>12.1f} frames/s"
+                f"  p50={measured['latency_us']['p50']:.1f}us"
+                f"  p99={measured['latency_us']['p99']:.1f}us"
+                f"  rss={measured['rss_mb']}MB"
+            )
+            results.append(measured)
+    finally:
+        close = getattr(adapter, "close", None)
+        if close:
+            close()
+    return results
+
+
+def result_key(result: dict) -> str:
+    return f"{result['backend']}/{result['case']}/threads={result['threads']}"
+
+
+def find_regressions(
+    results: list[dict], baseline: dict, tolerance: float
+) -> list[str]:
+    """基準値より frames/秒 が tolerance の割合を超えて落ちた組み合わせ"""
+    expected = {result_key(r): r["frames_per_second"] for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = expected.get(result_key(result))
+        if before and result["frames_per_second"] < before * (1 - tolerance):
+            regressions.append(
+                f"{result_key(result)}: {result['frames_per_second']:.1f} frames/s "
+                f"(baseline {before:.1f}, {result['frames_per_second'] / before - 1:+.0%})"
+            )
+    return regressions
+
+
+async def run(args, log: Callable[[str], None] = print) -> dict:
+    pcm = synthesize(parse_pattern("speech:2,silence:1"), args.audio_seconds, seed=0)
+    frames = packetize(pcm, FRAME_SAMPLES)
+    cases = ["single"]
+    cases += [f"batch-{n}" for n in args.batch_sizes]
+    cases += [f"streams-{n}" for n in args.streams]
+    results = []
+    for backend in args.backends:
+        for threads in args.threads:
+            results.extend(
+                await run_backend(backend, threads, cases, frames, args, log)
+            )
+
+    import torch
+
+    return {
+        "commit": git_commit(),
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="VAD アダプターのベンチマーク")
+    parser.add_argument(
+        "--backends",
+        type=lambda v: v.split(","),
+        default=["mock", "silero", "pool-silero"],
+        help="mock, silero, pool-mock, pool-silero（カンマ区切り）",
+    )
+    parser.add_argument("--threads", type=int_list, default=[1, 2, 4])
+    parser.add_argument("--batch-sizes", type=int_list, default=[8, 32])
+    parser.add_argument("--streams", type=int_list, default=[16])
+    parser.add_argument("--pool-workers", type=int, default=2)
+    parser.add_argument(
+        "--audio-seconds", type=float, default=10.0, help="1周分の音声の長さ"
+    )
+    parser.add_argument(
+        "--min-seconds", type=float, default=2.0, help="1ケースの最短計測時間"
+    )
+    parser.add_argument("--json", help="結果の JSON の出力先")
+    parser.add_argument("--save-baseline", help="結果を基準値として保存する")
+    parser.add_argument("--baseline", help="比較する基準値の JSON")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.15, help="許容する frames/秒 の低下率"
+    )
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    for path in (args.json, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report["results"], baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No throughput regression beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+状態を共有しない複数ワーカーでサーバーを起動するランチャー
+
+各ワーカーは別ポートの uvicorn プロセスとして起動し、WORKER_ID / WORKER_URL と
+ワーカー毎の音声保存ディレクトリを割り当てる。セッションの所有者は
+SESSION_DIRECTORY_URL（Redis プロトコル互換サーバー）で共有する。
+
+新規接続はロードバランサーからどのワーカーに振り分けてもよい。別のワーカーが
+所有するセッションへの接続には session_redirect で所有ワーカーのURLを返す。
+
+    python src/workers.py --workers 4 --base-port 8100 --public-host example.com
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+
+
+def worker_env(index: int, port: int, args) -> dict:
+    env = dict(os.environ)
+    env["WORKER_ID"] = f"{args.worker_prefix}-{index}"
+    env["WORKER_URL"] = f"{args.scheme}://{args.public_host}:{port}/ws"
+    env["AUDIO_SEGMENTS_DIR"] = os.path.join(
+        args.audio_dir, f"{args.worker_prefix}-{index}"
+    )
+    if args.session_directory:
+        env["SESSION_DIRECTORY_URL"] = args.session_directory
+    return env
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="マルチワーカー起動")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--base-port", type=int, default=8100)
+    parser.add_argument("--public-host", default="localhost")
+    parser.add_argument("--scheme", default="ws", choices=["ws", "wss"])
+    parser.add_argument("--worker-prefix", default="worker")
+    parser.add_argument("--audio-dir", default="audio_segments")
+    parser.add_argument(
+        "--session-directory",
+        default=os.getenv("SESSION_DIRECTORY_URL", ""),
+        help="redis://host:port/db（ワーカーが2つ以上の場合は必須）",
+    )
+    args = parser.parse_args(argv)
+
+    if args.workers > 1 and not args.session_directory:
+        parser.error("--session-directory is required when running multiple workers")
+
+    processes = []
+    for index in range(args.workers):
+        port = args.base_port + index
+        processes.append(
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "uvicorn",
+                    "main:app",
+                    "--host",
+                    args.host,
+                    "--port",
+                    str(port),
+                ],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                env=worker_env(index, port, args),
+            )
+        )
+
+    def forward(signum, _frame):
+        for process in processes:
+            if process.poll() is None:
+                process.send_signal(signum)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+
+    # どれか1つが終了したら全体を停止する
+    exit_code = 0
+    try:
+        while processes:
+            pid, status = os.wait()
+            for process in processes:
+                if process.pid == pid:
+                    process.returncode = os.waitstatus_to_exitcode(status)
+                    exit_code = exit_code or process.returncode
+                    processes.remove(process)
+                    forward(signal.SIGTERM, None)
+                    break
+    except ChildProcessError:
+        pass
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
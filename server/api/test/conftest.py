@@ -0,0 +1,9 @@
+import pytest
+
+from app.services.virtual_time import VirtualClock
+
+
+@pytest.fixture
+def clock() -> VirtualClock:
+    """手動で進める時計（clock.now を書き換えて時間を進める）"""
+    return VirtualClock()
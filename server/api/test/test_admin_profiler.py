@@ -0,0 +1,105 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.api.v1.endpoints import admin
+from app.services.profiler import MemoryGrowth, WorkerProfiler
+from app.websocket import handlers
+from main import app
+
+client = TestClient(app)
+
+
+def busy_worker(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_admin_endpoints_require_token(monkeypatch):
+    monkeypatch.setattr(deps, "ADMIN_TOKEN", "")
+    assert client.post("/api/v1/admin/profile?seconds=0.1").status_code == 404
+
+    monkeypatch.setattr(deps, "ADMIN_TOKEN", "secret")
+    assert client.post("/api/v1/admin/profile?seconds=0.1").status_code == 401
+    response = client.post(
+        "/api/v1/admin/profile?seconds=0.1",
+        headers={"Authorization": "Bearer wrong"},
+    )
+    assert response.status_code == 401
+
+
+def test_profile_returns_collapsed_stacks_of_worker_threads(monkeypatch):
+    monkeypatch.setattr(deps, "ADMIN_TOKEN", "secret")
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_worker, args=(stop,), name="busy")
+    worker.start()
+    try:
+        response = client.post(
+            "/api/v1/admin/profile?seconds=0.3&interval_ms=5",
+            headers={"Authorization": "Bearer secret"},
+        )
+    finally:
+        stop.set()
+        worker.join()
+
+    assert response.status_code == 200
+    assert ".folded" in response.headers["content-disposition"]
+    lines = response.text.splitlines()
+    busy = [line for line in lines if line.startswith("busy;")]
+    assert busy
+    stack, count = busy[0].rsplit(" ", 1)
+    assert "busy_worker (test_admin_profiler.py:" in stack
+    assert int(count) > 0
+
+
+def test_memory_growth_reports_allocation_site():
+    profiler = WorkerProfiler()
+    retained = []
+
+    def allocate():
+        time.sleep(0.05)
+        retained.append(bytearray(4 * 1024 * 1024))
+
+    allocator = threading.Thread(target=allocate)
+    allocator.start()
+    growth = profiler.memory_growth(0.2, top=5)
+    allocator.join()
+
+    assert growth.top[0]["size_diff"] >= 4 * 1024 * 1024
+    assert any("test_admin_profiler.py" in f for f in growth.top[0]["traceback"])
+
+    growth.add_session_growth({"a": 100, "b": 10}, {"a": 100, "b": 500, "c": 50})
+    assert [(s["session_id"], s["growth_bytes"]) for s in growth.sessions] == [
+        ("b", 490),
+        ("c", 50),
+        ("a", 0),
+    ]
+
+
+def test_session_growth_follows_buffered_audio(monkeypatch):
+    monkeypatch.setattr(handlers, "manager", None)
+    speech = b"\x01\x00" * 4096  # 0.256秒（モックVADでは常に発話）
+
+    with TestClient(app) as session_client:
+        with session_client.websocket_connect("/ws") as ws:
+            session_id = ws.receive_json()["client_id"]
+            ws.send_bytes(speech)
+            assert ws.receive_json()["type"] == "audio_received"
+            before = session_client.portal.call(admin._session_bytes)
+
+            for _ in range(3):
+                ws.send_bytes(speech)
+                assert ws.receive_json()["type"] == "audio_received"
+            after = session_client.portal.call(admin._session_bytes)
+
+    growth = MemoryGrowth(duration=0.0, traced_bytes=0)
+    growth.add_session_growth(before, after)
+    assert growth.sessions == [
+        {
+            "session_id": session_id,
+            "bytes": before[session_id] + 3 * len(speech),
+            "growth_bytes": 3 * len(speech),
+        }
+    ]
@@ -0,0 +1,67 @@
+from fastapi.testclient import TestClient
+
+from app.services.admission import AdmissionController, LoadLevel, LoadSignals
+from app.websocket import handlers
+from main import app
+
+SPEECH_PACKET = b"\x01\x00" * 4096
+
+
+def make_controller(signals):
+    return AdmissionController(
+        signals=lambda: signals,
+        max_sessions=10,
+        max_loop_lag=0.2,
+        max_vad_queue=0,  # 無効
+        shed_ratio=0.8,
+        recover_ratio=0.6,
+        retry_after=5.0,
+    )
+
+
+def test_admission_rejects_when_any_signal_is_saturated():
+    signals = LoadSignals(active_sessions=3, loop_lag=0.25, vad_queue_depth=10**6)
+    controller = make_controller(signals)
+
+    decision = controller.admit()
+    assert not decision.accepted
+    assert decision.reason == "overloaded: loop_lag"
+    assert decision.retry_after == 6.2
+    assert controller.stats.rejected == 1
+
+    signals.loop_lag = 0.0
+    assert controller.admit().accepted
+
+
+def test_admission_sheds_optional_work_with_hysteresis():
+    signals = LoadSignals(active_sessions=5)
+    controller = make_controller(signals)
+    assert not controller.should_shed()
+
+    signals.active_sessions = 8
+    assert controller.should_shed()
+    assert controller.level == LoadLevel.DEGRADED
+    assert controller.admit().accepted  # 既存セッション優先だが新規もまだ受け付ける
+
+    signals.active_sessions = 7  # recover_ratio 以上なので DEGRADED のまま
+    assert controller.should_shed()
+    signals.active_sessions = 5
+    assert not controller.should_shed()
+
+
+def test_shedding_still_acknowledges_audio(monkeypatch):
+    # 他のテストと共有しないよう新しい ConnectionManager を使う
+    monkeypatch.setattr(handlers, "manager", None)
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws") as ws:
+            assert ws.receive_json()["type"] == "connection_established"
+            admission = handlers.manager.admission
+            monkeypatch.setattr(admission, "should_shed", lambda: True)
+            # 再開時の送り直しを減らすため、受信確認は負荷が高くても送る
+            for count in range(1, 11):
+                ws.send_bytes(SPEECH_PACKET)
+                message = ws.receive_json()
+                assert message["type"] == "audio_received"
+                assert message["packet_count"] == count
+        assert admission.stats.shed_messages == 10
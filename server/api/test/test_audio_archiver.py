@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pytest
+
+from app.services import audio_codecs
+from app.services.audio_archiver import AudioArchiver, archive_session
+from app.services.audio_codecs import check_codec, decode_pcm, encode_pcm
+from app.services.segment_store import SessionAudioReader, SessionAudioWriter
+from app.websocket.handlers import resolve_archive_codec
+
+t = np.arange(16000) / 16000
+PCM = (3000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16).tobytes()
+
+
+def write_session(path):
+    writer = SessionAudioWriter(path)
+    writer.append(1, PCM[:8000])
+    writer.append(2, PCM[8000:])
+    writer.close()
+
+
+def test_archive_session_swaps_in_verified_archive(tmp_path):
+    session = str(tmp_path / "session")
+    write_session(session)
+
+    result = archive_session(session, "zlib")
+    assert result.output_bytes < result.input_bytes
+    assert not os.path.exists(session + ".pcm")
+    assert not os.path.exists(session + ".pcmz.tmp")
+
+    with SessionAudioReader(session) as reader:
+        assert bytes(reader.read(1)) == PCM[:8000]
+        assert bytes(reader.read(2)) == PCM[8000:]
+
+
+def test_archiver_runs_in_process_pool_and_tracks_ratio(tmp_path):
+    session = str(tmp_path / "session")
+    write_session(session)
+    done = []
+
+    archiver = AudioArchiver(
+        codec="zlib", on_done=lambda path, delta: done.append((path, delta))
+    )
+    archiver.submit(session).result(timeout=60)
+    archiver.close()
+
+    stats = archiver.get_stats()
+    assert stats["archived"] == 1
+    assert stats["compression_ratio"] > 1
+    assert done and done[0][0] == session and done[0][1] < 0
+
+
+def test_flac_round_trip_is_lossless():
+    pytest.importorskip("soundfile")
+    assert decode_pcm(encode_pcm(PCM, "flac"), "flac") == PCM
+
+
+def test_unavailable_archive_codec_falls_back_to_zlib(monkeypatch, caplog):
+    check_codec("zlib")
+    with pytest.raises(ValueError):
+        check_codec("mp3")
+    assert resolve_archive_codec("mp3") == "zlib"
+
+    def missing_soundfile():
+        raise RuntimeError("soundfile is required for FLAC/Opus archiving")
+
+    monkeypatch.setattr(audio_codecs, "_soundfile", missing_soundfile)
+    assert resolve_archive_codec("flac") == "zlib"
+    assert resolve_archive_codec("zlib") == "zlib"
+    warnings = [r for r in caplog.records if "using zlib instead" in r.getMessage()]
+    assert len(warnings) == 2
@@ -0,0 +1,58 @@
+import os
+import time
+
+from app.services.audio_retention import AudioRetentionManager
+from app.services.segment_store import SessionAudioWriter, data_path, index_path
+
+PCM = b"\x01\x00" * 1000
+
+
+def write_session(manager, path, clock):
+    assert manager.reserve(path, len(PCM))
+    writer = SessionAudioWriter(path)
+    writer.append(1, PCM)
+    writer.close()
+    manager.mark_closed(path)
+    clock.now += 10
+
+
+def test_retention_evicts_oldest_closed_session_on_size_limit(tmp_path, clock):
+    manager = AudioRetentionManager(
+        str(tmp_path), max_total_bytes=2 * len(PCM) + 200, clock=clock
+    )
+    sessions = [str(tmp_path / f"s{i}") for i in range(3)]
+    for path in sessions:
+        write_session(manager, path, clock)
+
+    assert manager.session_count == 2
+    assert not (tmp_path / "s0.pcm").exists()
+    assert manager.stats.evicted_by_size == 1
+    assert manager.total_bytes <= manager.max_total_bytes
+
+
+def test_retention_never_evicts_open_sessions(tmp_path):
+    manager = AudioRetentionManager(str(tmp_path), max_total_bytes=len(PCM) + 100)
+    assert manager.reserve(str(tmp_path / "open"), len(PCM))
+    assert not manager.reserve(str(tmp_path / "other"), len(PCM))
+    assert manager.stats.rejected_writes == 1
+
+
+def test_retention_enforces_age_and_indexes_existing_sessions(tmp_path, clock):
+    manager = AudioRetentionManager(str(tmp_path), clock=clock)
+    write_session(manager, str(tmp_path / "old"), clock)
+    write_session(manager, str(tmp_path / "new"), clock)
+
+    # 再起動時は既存のセッションを走査して使用量を引き継ぐ
+    restarted = AudioRetentionManager(str(tmp_path), max_sessions=1, clock=clock)
+    assert restarted.total_bytes == manager.total_bytes
+    assert restarted.enforce() == 1
+
+    # 最終書き込みから時間が経ったセッションは削除される
+    old = time.time() - 7200
+    for path in (data_path(str(tmp_path / "new")), index_path(str(tmp_path / "new"))):
+        os.utime(path, (old, old))
+    aged = AudioRetentionManager(str(tmp_path), max_age_seconds=3600)
+    assert aged.enforce() == 1
+    assert aged.session_count == 0
+    assert aged.stats.evicted_by_age == 1
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,101 @@
+import threading
+
+from app.services.audio_archiver import AudioArchiver
+from app.services.audio_retention import AudioRetentionManager
+from app.services.audio_writer import AudioSegmentWriter
+from app.services.segment_store import SessionAudioReader
+
+PCM = b"\x01\x00" * 1600
+
+
+def test_audio_writer_appends_to_session_in_background(tmp_path):
+    writer = AudioSegmentWriter(fsync_batch_size=4)
+    session = str(tmp_path / "session")
+    for segment_id in range(1, 4):
+        assert writer.submit(session, segment_id, PCM)
+    writer.close_session(session)
+    writer.close(timeout=5)
+
+    with SessionAudioReader(session) as reader:
+        assert reader.segment_ids() == [1, 2, 3]
+        assert bytes(reader.read(2)) == PCM
+    assert writer.get_stats()["written"] == 3
+
+
+def test_audio_writer_archives_sessions_closed_by_open_file_limit(tmp_path):
+    archiver = AudioArchiver(codec="zlib")
+    writer = AudioSegmentWriter(max_open_sessions=1, archiver=archiver)
+    sessions = [str(tmp_path / f"s{i}") for i in range(3)]
+    for session in sessions:
+        assert writer.submit(session, 1, PCM)  # 前のセッションのファイルは閉じられる
+    for session in sessions:
+        writer.close_session(session)
+    writer.close(timeout=5)
+    archiver.close()
+
+    assert archiver.get_stats()["archived"] == 3
+    for session in sessions:
+        with SessionAudioReader(session) as reader:
+            assert bytes(reader.read(1)) == PCM
+
+
+def test_audio_writer_drops_when_queue_is_full(tmp_path):
+    writer = AudioSegmentWriter(max_queued_bytes=len(PCM))
+    writer._queued_bytes = len(PCM)  # 書き込みが詰まっている状態
+    assert not writer.submit(str(tmp_path / "dropped"), 1, PCM)
+    assert writer.stats.dropped == 1
+    writer._queued_bytes = 0
+    writer.close(timeout=5)
+
+
+def test_audio_writer_never_drops_close_requests(tmp_path):
+    retention = AudioRetentionManager(str(tmp_path))
+    writing, release = threading.Event(), threading.Event()
+    reserve = retention.reserve
+
+    def slow_reserve(session_path, nbytes):
+        writing.set()
+        release.wait(5)
+        return reserve(session_path, nbytes)
+
+    retention.reserve = slow_reserve
+    writer = AudioSegmentWriter(max_queue_size=1, retention=retention)
+    first, second = str(tmp_path / "first"), str(tmp_path / "second")
+    assert writer.submit(first, 1, PCM)
+    assert writing.wait(5)  # 書き込みスレッドが止まっている間にキューを埋める
+    assert writer.submit(second, 1, PCM)
+    assert not writer.submit(second, 2, PCM)
+    writer.close_session(first)
+    writer.close_session(second)
+    release.set()
+    writer.close(timeout=5)
+
+    assert writer.stats.dropped == 1
+    stats = retention.get_stats()
+    assert stats["sessions"] == 2
+    assert stats["open_sessions"] == 0  # 閉じる依頼は上限を超えても処理される
+
+
+def test_audio_writer_disabled_writes_nothing(tmp_path):
+    writer = AudioSegmentWriter(enabled=False)
+    assert not writer.submit(str(tmp_path / "session"), 1, PCM)
+    writer.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_audio_writer_enforces_retention_while_queue_is_busy(tmp_path, clock):
+    retention = AudioRetentionManager(str(tmp_path), max_age_seconds=30, clock=clock)
+    old = str(tmp_path / "old")
+    assert retention.reserve(old, len(PCM))
+    retention.mark_closed(old)
+    writer = AudioSegmentWriter(retention=retention, retention_interval=60, clock=clock)
+
+    # キューが空になる前に retention_interval が過ぎても上限を適用する
+    clock.now = 100.0
+    busy = str(tmp_path / "busy")
+    for segment_id in range(1, 33):
+        assert writer.submit(busy, segment_id, PCM)
+    writer.close(timeout=5)
+
+    assert retention.stats.evicted_by_age == 1
+    assert retention.session_count == 1
@@ -0,0 +1,91 @@
+import asyncio
+import socket
+import threading
+import time
+
+import uvicorn
+from fastapi.testclient import TestClient
+
+from app.adapters.transcription import OpenAITranscriptionAdapter
+from app.websocket.handlers import pcm_to_wav_bytes
+from fake_openai import (
+    FakeOpenAIConfig,
+    LatencyModel,
+    create_app,
+    deterministic_text,
+)
+
+WAV = pcm_to_wav_bytes(bytes(range(256)) * 250)  # 2秒
+
+
+def transcribe(client: TestClient, model: str = "whisper-1"):
+    return client.post(
+        "/v1/audio/transcriptions",
+        files={"file": ("a.wav", WAV, "audio/wav")},
+        data={"model": model},
+    )
+
+
+def test_text_is_derived_from_audio_and_errors_are_injected():
+    client = TestClient(create_app(FakeOpenAIConfig(latency_scale=0)))
+    response = transcribe(client)
+    assert response.json() == {"text": deterministic_text(WAV)}
+    assert deterministic_text(WAV) == deterministic_text(bytes(WAV))
+    assert deterministic_text(WAV) != deterministic_text(WAV[:-2] + b"\x01\x00")
+    assert transcribe(client, model="unknown").status_code == 400
+
+    limited = TestClient(
+        create_app(FakeOpenAIConfig(latency_scale=0, rate_limit_rate=1.0))
+    )
+    response = transcribe(limited)
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+    failing = TestClient(create_app(FakeOpenAIConfig(latency_scale=0, error_rate=1.0)))
+    assert transcribe(failing).status_code in (500, 503)
+    assert limited.get("/stats").json()["statuses"] == {"429": 1}
+
+
+def test_latency_grows_with_audio_length():
+    model = LatencyModel(base=0.2, per_audio_second=0.1, sigma=0)
+    assert model.sample(3.0, rng=None) == 0.5
+
+
+def test_real_adapter_talks_to_the_fake_server():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    config = FakeOpenAIConfig(
+        latency={"whisper-1": LatencyModel(0.05, 0.0, 0)},
+        max_concurrency=1,
+        retry_after=0.1,
+    )
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(config), port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    try:
+        while not server.started:
+            time.sleep(0.01)
+        adapter = OpenAITranscriptionAdapter(
+            api_key="dummy", base_url=f"http://127.0.0.1:{port}/v1"
+        )
+        adapter.supported_models = ["whisper-1"]
+
+        async def scenario():
+            assert await adapter.health_check()
+            timings = {}
+            # 同時実行数 1 を超えた分は 429 になり、クライアントのリトライで成功する
+            texts = await asyncio.gather(
+                adapter.transcribe(WAV, model="whisper-1", timings=timings),
+                adapter.transcribe(WAV, model="whisper-1"),
+            )
+            return texts, timings
+
+        texts, timings = asyncio.run(scenario())
+        assert texts == [deterministic_text(WAV)] * 2
+        assert timings["model_seconds"] >= 0.04
+    finally:
+        server.should_exit = True
+        thread.join(5)
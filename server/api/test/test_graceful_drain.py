@@ -0,0 +1,43 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.websocket import handlers
+from main import app
+
+SPEECH_PACKET = b"\x01\x00" * 4096  # 0.256秒（モックVADでは常に発話）
+
+
+def test_drain_transcribes_open_utterance_before_closing(monkeypatch):
+    # 他のテストと共有しないよう新しい ConnectionManager を使う
+    monkeypatch.setattr(handlers, "manager", None)
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws") as ws:
+            assert ws.receive_json()["type"] == "connection_established"
+            for _ in range(4):
+                ws.send_bytes(SPEECH_PACKET)
+                assert ws.receive_json()["type"] == "audio_received"
+
+            result = client.portal.call(handlers.drain_connections, 5.0)
+            assert result["sessions"] == 1
+            assert result["flushed_segments"] == 1
+            assert result["unfinished_transcriptions"] == 0
+
+            received = []
+            with pytest.raises(WebSocketDisconnect) as closed:
+                while True:
+                    received.append(ws.receive_json())
+            assert closed.value.code == handlers.CLOSE_CODE_SERVICE_RESTART
+
+        assert [m["type"] for m in received] == [
+            "server_draining",
+            "transcription_result",
+        ]
+        assert received[0]["next_audio_seq"] == 5
+        assert received[1]["is_final"]
+        assert handlers.manager.segmenters == {}
+
+        # ドレイン後の新規接続は 1012 で断る
+        with client.websocket_connect("/ws") as ws:
+            assert ws.receive_json()["reason"] == "draining"
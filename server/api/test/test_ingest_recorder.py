@@ -0,0 +1,48 @@
+import glob
+
+from app.services.ingest_recorder import (
+    KIND_AUDIO,
+    KIND_TEXT,
+    IngestRecorder,
+    read_ingest_log,
+)
+
+
+def test_recorder_round_trips_packets_with_arrival_offsets(tmp_path, clock):
+    recorder = IngestRecorder(str(tmp_path), flush_bytes=1500, clock=clock)
+    assert recorder.start_session("s1", {"sample_rate": 16000})
+    recorder.record("s1", KIND_TEXT, b'{"type": "model_selection"}')
+    for i in range(3):
+        clock.now += 0.032
+        recorder.record("s1", KIND_AUDIO, bytes([i]) * 1024)
+    recorder.record("unknown", KIND_AUDIO, b"\x00" * 1024)  # 記録していないセッション
+    recorder.end_session("s1")
+    recorder.close(timeout=5)
+
+    (path,) = glob.glob(str(tmp_path / "*_s1.ril"))
+    with open(path, "rb") as f:
+        header, records = read_ingest_log(f)
+        records = list(records)
+    assert header["session_id"] == "s1"
+    assert header["sample_rate"] == 16000
+    assert [r.kind for r in records] == [KIND_TEXT] + [KIND_AUDIO] * 3
+    assert [round(r.offset, 3) for r in records] == [0.0, 0.032, 0.064, 0.096]
+    assert records[2].payload == b"\x01" * 1024
+    assert recorder.get_stats()["records"] == 4
+
+
+def test_recorder_skips_unsampled_sessions_and_truncates_on_backlog(tmp_path):
+    recorder = IngestRecorder(str(tmp_path), sample_ratio=0.0)
+    assert not recorder.start_session("skipped")
+    recorder.close(timeout=5)
+
+    recorder = IngestRecorder(str(tmp_path), flush_bytes=1, max_queued_bytes=4096)
+    recorder.start_session("slow")
+    recorder._queued_bytes = 4096  # 書き込みが詰まっている状態
+    recorder.record("slow", KIND_AUDIO, b"\x00" * 1024)
+    recorder.record("slow", KIND_AUDIO, b"\x00" * 1024)
+    assert recorder.stats.dropped_sessions == 1
+    assert recorder.stats.records == 1  # 打ち切り後は記録しない
+    recorder._queued_bytes = 0
+    recorder.close(timeout=5)
+    assert not glob.glob(str(tmp_path / "*.ril"))
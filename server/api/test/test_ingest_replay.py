@@ -0,0 +1,55 @@
+import asyncio
+
+from app.adapters.vad import MockVADAdapter
+from app.services.ingest_recorder import KIND_AUDIO, IngestRecorder
+from app.websocket.handlers import split_frames
+from ingest_replay import compare, main, replay_log
+from loadtest import packetize, parse_pattern, synthesize
+
+
+def record_session(directory, session_id: str, packet_samples: int = 800) -> None:
+    """発話・無音を繰り返す音声を、フレームと揃わない大きさのパケットで記録する"""
+    now = [0.0]
+    recorder = IngestRecorder(str(directory), clock=lambda: now[0])
+    recorder.start_session(session_id)
+    pcm = synthesize(parse_pattern("speech:1.5,silence:2"), 8.0, seed=1)
+    for packet in packetize(pcm, packet_samples):
+        now[0] += packet_samples / 16000
+        recorder.record(session_id, KIND_AUDIO, packet)
+    recorder.close(timeout=5)
+
+
+def test_split_frames_keeps_remainder():
+    frames, rest = split_frames(bytearray(b"\x01" * 2500))
+    assert [len(f) for f in frames] == [1024, 1024]
+    assert rest == bytearray(b"\x01" * 452)
+
+
+def test_replay_is_deterministic_and_detects_changed_decisions(tmp_path):
+    record_session(tmp_path, "s1")
+    (path,) = tmp_path.glob("*.ril")
+    adapter = MockVADAdapter(energy_threshold=0.01)
+
+    session_id, first, _ = asyncio.run(replay_log(str(path), adapter))
+    _, second, _ = asyncio.run(replay_log(str(path), adapter))
+    assert session_id == "s1"
+    assert first["packets"] == 160
+    assert len(first["decisions"]) >= 2
+    assert first["decisions"] == second["decisions"]
+
+    summary = {"packet_us": {"p50": 10.0, "p99": 20.0}}
+    baseline = {"sessions": {"s1": first}, "summary": summary}
+    changed = {**second, "decisions": second["decisions"][:-1]}
+    assert compare({"sessions": {"s1": second}, "summary": summary}, baseline)[0] == []
+    changes, _ = compare({"sessions": {"s1": changed}, "summary": summary}, baseline)
+    assert len(changes) == 1 and changes[0].startswith("s1: segments")
+
+
+def test_main_compares_against_baseline(tmp_path):
+    record_session(tmp_path, "s1")
+    baseline = str(tmp_path / "baseline.json")
+    assert main([str(tmp_path), "--json", baseline]) == 0
+    assert (
+        main([str(tmp_path), "--realtime", "--speed", "50", "--baseline", baseline])
+        == 0
+    )
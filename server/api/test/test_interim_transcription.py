@@ -0,0 +1,57 @@
+from app.services.interim_transcription import InterimTranscriber
+
+BYTES_PER_SECOND = 16000 * 2
+
+
+def _seconds(value: float) -> int:
+    return int(value * BYTES_PER_SECOND)
+
+
+def test_interim_respects_interval_and_in_flight():
+    transcriber = InterimTranscriber(interval_seconds=1.0, min_audio_seconds=1.0)
+
+    assert transcriber.plan("c1", 1, _seconds(0.5)) is None
+    request = transcriber.plan("c1", 1, _seconds(1.0))
+    assert request is not None
+    # 処理中は次の要求を作らない
+    assert transcriber.plan("c1", 1, _seconds(2.5)) is None
+
+    assert transcriber.on_result("c1", request, "こんにちは") == "こんにちは"
+    # 前回の要求から間隔が空いていない
+    assert transcriber.plan("c1", 1, _seconds(1.5)) is None
+    assert transcriber.plan("c1", 1, _seconds(2.0)) is not None
+
+
+def test_interim_commits_stable_prefix_beyond_window():
+    transcriber = InterimTranscriber(
+        interval_seconds=1.0, min_audio_seconds=1.0, window_seconds=2.0
+    )
+
+    first = transcriber.plan("c1", 1, _seconds(2.0))
+    transcriber.on_result("c1", first, "前半")
+
+    second = transcriber.plan("c1", 1, _seconds(3.0))
+    # 確定済みの前半は再送しない
+    assert second.start == _seconds(2.0)
+    assert transcriber.on_result("c1", second, "後半") == "前半後半"
+
+
+def test_interim_drops_stale_result_after_final():
+    transcriber = InterimTranscriber()
+
+    request = transcriber.plan("c1", 1, _seconds(1.0))
+    transcriber.finish_segment("c1")
+    assert transcriber.on_result("c1", request, "古い結果") is None
+
+
+def test_interim_session_budget():
+    transcriber = InterimTranscriber(
+        interval_seconds=1.0, min_audio_seconds=1.0, session_budget_seconds=2.5
+    )
+
+    request = transcriber.plan("c1", 1, _seconds(1.0))
+    transcriber.on_result("c1", request, "a")
+    request = transcriber.plan("c1", 1, _seconds(2.0))
+    assert request is None  # 1.0 + 2.0 > 2.5
+    transcriber.finish_segment("c1")
+    assert transcriber.plan("c1", 2, _seconds(1.0)) is None
@@ -0,0 +1,48 @@
+from app.services.liveness import REASON_IDLE, REASON_PONG_TIMEOUT, LivenessMonitor
+
+
+def test_liveness_pings_quiet_sessions_and_reaps_on_pong_timeout(clock):
+    monitor = LivenessMonitor(
+        ping_interval=5, pong_timeout=5, idle_timeout=0, clock=clock
+    )
+    monitor.register("streaming")
+    monitor.register("quiet")
+    monitor.register("answers")
+
+    clock.now = 5.0
+    monitor.touch("streaming", audio=True)  # 受信中のセッションには ping しない
+    result = monitor.sweep()
+    assert result.to_ping == [("quiet", 1), ("answers", 1)]
+    assert result.dead == []
+
+    clock.now = 8.0
+    monitor.on_pong("answers", 1)
+    monitor.touch("streaming", audio=True)
+    clock.now = 10.0
+    result = monitor.sweep()
+    assert result.dead == [("quiet", REASON_PONG_TIMEOUT)]
+    assert set(monitor.sessions) == {"streaming", "answers"}
+
+    stats = monitor.get_stats()
+    assert stats["pings_sent"] == 2
+    assert stats["pongs_received"] == 1
+    assert stats["reaped_pong_timeout"] == 1
+
+
+def test_liveness_reaps_sessions_without_audio(clock):
+    monitor = LivenessMonitor(
+        ping_interval=0, pong_timeout=0, idle_timeout=60, clock=clock
+    )
+    monitor.register("idle")
+    monitor.register("talking")
+
+    clock.now = 59.0
+    monitor.touch("idle")  # 音声以外のメッセージでは延長しない
+    monitor.touch("talking", audio=True)
+    assert monitor.sweep().dead == []
+
+    clock.now = 60.0
+    assert monitor.sweep().dead == [("idle", REASON_IDLE)]
+    monitor.record_reclaimed(1024)
+    assert monitor.get_stats()["reclaimed_bytes"] == 1024
+    assert monitor.get_stats()["sessions"] == 1
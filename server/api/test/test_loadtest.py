@@ -0,0 +1,51 @@
+from app.adapters.vad import MockVADAdapter
+from loadtest import (
+    PACKET_SAMPLES,
+    SessionResult,
+    packetize,
+    parse_pattern,
+    percentiles,
+    summarize,
+    synthesize,
+)
+
+
+def test_synthetic_pattern_is_separable_by_the_energy_mock_vad():
+    pattern = parse_pattern("speech:1, silence:0.5")
+    assert pattern == [("speech", 1.0), ("silence", 0.5)]
+    packets = packetize(synthesize(pattern, duration=3.0, seed=1))
+    assert len(packets) == 3 * 16000 // PACKET_SAMPLES
+    assert {len(p) for p in packets} == {PACKET_SAMPLES * 2}
+
+    vad = MockVADAdapter(energy_threshold=0.01)
+    speech = [vad.predict(p)[0] for p in packets]
+    per_second = 16000 // PACKET_SAMPLES
+    assert all(speech[: per_second - 1])  # 0〜1秒は発話
+    assert not any(speech[per_second + 1 : per_second * 3 // 2 - 1])  # 1〜1.5秒は無音
+    assert all(speech[per_second * 3 // 2 + 1 : per_second * 5 // 2 - 1])
+
+
+def test_summary_percentiles_and_session_outcomes():
+    assert percentiles([]) == {"count": 0}
+    stats = percentiles([float(v) for v in range(1, 101)])
+    assert (stats["p50"], stats["p95"], stats["p99"], stats["max"]) == (
+        51,
+        96,
+        100,
+        100,
+    )
+
+    ok = SessionResult(connect_ms=5.0, ack_ms=[1.0, 2.0], completed=True)
+    rejected = SessionResult(rejected="overloaded: sessions")
+    failed = SessionResult()
+    failed.errors["closed_1011"] += 1
+    summary = summarize([ok, rejected, failed], wall=1.0, audio_seconds=2.0)
+    assert summary["sessions"] == {
+        "started": 3,
+        "completed": 1,
+        "rejected": 1,
+        "failed": 1,
+    }
+    assert summary["rejections"] == {"overloaded: sessions": 1}
+    assert summary["errors"] == {"closed_1011": 1}
+    assert summary["latency_ms"]["ack"]["count"] == 2
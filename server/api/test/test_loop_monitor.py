@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+from app.services.loop_monitor import LoopLagMonitor
+
+
+def block_the_loop(seconds: float):
+    time.sleep(seconds)
+
+
+def test_watchdog_captures_the_stack_of_a_blocking_call():
+    monitor = LoopLagMonitor(interval=0.01, block_threshold=0.05)
+
+    async def scenario():
+        monitor.ensure_started()
+        await asyncio.sleep(0.05)
+        block_the_loop(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    asyncio.run(scenario())
+
+    assert monitor.blocked_count == 1
+    event = monitor.events[0]
+    assert event.finished
+    assert event.duration >= 0.25  # ループ再開時に実際の停止時間で確定する
+    assert "block_the_loop" in event.stack[-2]
+    assert "time.sleep" in event.stack[-1]
+
+    stats = monitor.get_stats()
+    assert stats["max_ms"] >= 250
+    assert stats["p50_ms"] < stats["p99_ms"]
+    assert stats["recent_blocks"][0]["stack"] == event.stack
+
+
+def test_short_stalls_below_threshold_are_not_reported():
+    monitor = LoopLagMonitor(interval=0.01, block_threshold=0.2)
+
+    async def scenario():
+        monitor.ensure_started()
+        await asyncio.sleep(0.05)
+        block_the_loop(0.05)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    asyncio.run(scenario())
+
+    assert monitor.blocked_count == 0
+    assert monitor.percentile(1.0) >= 0.04
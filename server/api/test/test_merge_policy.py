@@ -0,0 +1,31 @@
+from app.services.merge_policy import AdaptiveMergePolicy
+
+
+def test_policy_uses_default_until_enough_samples():
+    policy = AdaptiveMergePolicy(default_timeout=2.0, min_samples=3)
+    policy.observe_gap("c1", 0.5)
+    assert policy.choose_timeout("c1") == 2.0
+
+
+def test_policy_shortens_wait_for_speakers_without_follow_ups():
+    policy = AdaptiveMergePolicy(
+        default_timeout=2.0, min_timeout=0.3, max_timeout=2.0, min_samples=3
+    )
+    for gap in [5.0, 8.0, 12.0, 6.0]:
+        policy.observe_gap("c1", gap)
+    assert policy.choose_timeout("c1") == 0.3
+
+
+def test_policy_waits_up_to_quantile_of_follow_up_gaps():
+    policy = AdaptiveMergePolicy(
+        default_timeout=2.0,
+        min_timeout=0.3,
+        max_timeout=2.0,
+        target_probability=1.0,
+        min_samples=3,
+    )
+    for gap in [0.6, 0.8, 1.0, 9.0]:
+        policy.observe_gap("c1", gap)
+    assert policy.choose_timeout("c1") == 1.0
+    # 他のクライアントには影響しない
+    assert policy.choose_timeout("c2") == 2.0
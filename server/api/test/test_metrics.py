@@ -0,0 +1,109 @@
+from fastapi.testclient import TestClient
+
+from app.services import metrics
+from app.services.liveness import REASON_IDLE, SweepResult
+from app.services.metrics import MetricsRegistry
+from app.websocket import handlers
+from main import app
+
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    registry = MetricsRegistry(prefix="test_")
+    histogram = registry.histogram("stage_seconds", "Stage latency", buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == [
+        "# HELP test_stage_seconds Stage latency",
+        "# TYPE test_stage_seconds histogram",
+    ]
+    assert 'test_stage_seconds_bucket{le="0.1"} 2' in lines  # 境界値は le に含む
+    assert 'test_stage_seconds_bucket{le="1"} 3' in lines
+    assert 'test_stage_seconds_bucket{le="+Inf"} 4' in lines
+    assert "test_stage_seconds_sum 3.65" in lines
+    assert "test_stage_seconds_count 4" in lines
+
+
+def test_counter_labels_are_rendered_and_escaped():
+    registry = MetricsRegistry(prefix="test_")
+    counter = registry.counter("errors_total", "Errors", labelnames=("stage",))
+    counter.inc(stage="vad")
+    counter.inc(2, stage='a"b')
+    assert counter.value(stage="vad") == 1
+
+    text = registry.render()
+    assert 'test_errors_total{stage="vad"} 1' in text
+    assert 'test_errors_total{stage="a\\"b"} 2' in text
+
+
+def test_labelled_gauge_renders_each_label_value():
+    registry = MetricsRegistry(prefix="test_")
+    gauge = registry.gauge("lag_seconds", "Lag", labelnames=("quantile",))
+    gauge.set(0.5, quantile="0.99")
+    gauge.set(0.001, quantile="0.5")
+
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'test_lag_seconds{quantile="0.5"} 0.001',
+        'test_lag_seconds{quantile="0.99"} 0.5',
+    ]
+
+
+def test_segment_merge_stats_are_exported(monkeypatch):
+    monkeypatch.setattr(handlers, "manager", None)
+
+    async def on_transcribe(audio_data: bytes, segment_id: int):
+        pass
+
+    async def on_error(error: Exception):
+        raise error
+
+    with TestClient(app) as client:
+        # 最初の接続で ConnectionManager を作る
+        with client.websocket_connect("/ws") as ws:
+            assert ws.receive_json()["type"] == "connection_established"
+        merger = handlers.manager.segment_merger
+        holds = metrics.SEGMENT_MERGE_SEGMENTS_TOTAL.value(outcome="holds")
+        short_audio = b"\x00\x00" * int(16000 * merger.min_merge_duration / 2)
+        held = client.portal.call(
+            merger.process_segment, 1, short_audio, "c1", on_transcribe, on_error
+        )
+        assert not held
+
+        # 判断の度に加算するカウンター（rate() で見られるよう _total で出力）
+        text = client.get("/api/v1/metrics").text
+        assert "# TYPE vad_transcriber_segment_merge_segments_total counter" in text
+        assert (
+            f'vad_transcriber_segment_merge_segments_total{{outcome="holds"}} '
+            f"{holds + 1:g}"
+        ) in text
+        assert metrics.SEGMENT_MERGE_WAIT_CHOSEN_SECONDS_TOTAL.value() > 0
+        stats = client.get("/api/v1/sessions").json()["segment_merger"]
+        assert stats["holds"] == 1
+        assert stats["pending_segments"] == 1
+
+
+def test_reclaimed_bytes_are_counted_when_reaping(monkeypatch):
+    monkeypatch.setattr(handlers, "manager", None)
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws") as ws:
+            client_id = ws.receive_json()["client_id"]
+            ws.send_bytes(b"\x01\x00" * 4096)
+            assert ws.receive_json()["type"] == "audio_received"
+
+            manager = handlers.manager
+            reclaimed = metrics.RECLAIMED_BYTES_TOTAL.value()
+            monkeypatch.setattr(
+                manager.liveness,
+                "sweep",
+                lambda: SweepResult(dead=[(client_id, REASON_IDLE)]),
+            )
+            client.portal.call(manager._reap)
+
+        delta = metrics.RECLAIMED_BYTES_TOTAL.value() - reclaimed
+        assert delta > 0
+        assert delta == manager.liveness.stats.reclaimed_bytes
+        text = client.get("/api/v1/metrics").text
+        assert "# TYPE vad_transcriber_liveness_reclaimed_bytes_total counter" in text
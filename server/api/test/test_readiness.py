@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+import pytest
+import torch
+from fastapi.testclient import TestClient
+
+import main
+from app.adapters.vad import SileroVADAdapter
+from app.services.backend_health import BackendHealthCache
+from app.websocket import handlers
+from main import app
+
+
+@pytest.fixture
+def silero_adapter():
+    try:
+        return SileroVADAdapter()
+    except Exception as e:  # torch.hub のキャッシュもネットワークもない環境
+        pytest.skip(f"Silero VAD model is not available: {e}")
+
+
+def wait_ready(client, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    response = client.get("/api/v1/health/ready")
+    while response.status_code != 200 and time.monotonic() < deadline:
+        time.sleep(0.05)
+        response = client.get("/api/v1/health/ready")
+    return response
+
+
+def test_backend_health_expires_after_ttl_and_times_out():
+    now = [0.0]
+    calls = []
+
+    async def healthy():
+        calls.append("vad")
+        return True
+
+    async def hanging():
+        await asyncio.sleep(10)
+        return True
+
+    cache = BackendHealthCache(
+        {"vad": healthy, "transcription": hanging},
+        ttl=30,
+        timeout=0.05,
+        clock=lambda: now[0],
+    )
+    assert cache.unhealthy() == ["vad", "transcription"]  # 未確認
+
+    asyncio.run(cache.refresh_all())
+    assert cache.unhealthy() == ["transcription"]
+    assert "timed out" in cache.get_stats()["transcription"]["error"]
+
+    # 問い合わせではチェックを呼ばず、期限切れで正常とみなさなくなる
+    now[0] = 31
+    assert cache.unhealthy() == ["vad", "transcription"]
+    assert calls == ["vad"]
+
+
+def test_ready_after_warm_up_and_not_ready_when_saturated(monkeypatch):
+    monkeypatch.setattr(handlers, "manager", None)
+
+    with TestClient(app) as client:
+        assert client.get("/api/v1/health/live").status_code == 200
+
+        response = wait_ready(client)
+        report = response.json()
+        assert response.status_code == 200, report
+        assert report["warmed"]
+        assert report["backends"]["vad"]["healthy"]
+
+        # 受け付け上限の 70% に達したら、負荷軽減が始まる前に振り分けを止める
+        monkeypatch.setattr(handlers.manager.admission, "max_sessions", 1)
+        with client.websocket_connect("/ws") as ws:
+            assert ws.receive_json()["type"] == "connection_established"
+            response = client.get("/api/v1/health/ready")
+            assert response.status_code == 503
+            report = response.json()
+            assert report["reasons"] == ["saturated:sessions"]
+            assert report["saturation"]["signals"]["sessions"]["ratio"] == 1.0
+
+
+def test_silero_health_reflects_warm_up(silero_adapter):
+    assert not asyncio.run(silero_adapter.health_check())
+
+    asyncio.run(silero_adapter.warm_up())
+    assert asyncio.run(silero_adapter.health_check())
+    # ウォームアップ後も 512 サンプルのフレームをそのまま推論できる
+    is_speech, speech_prob = silero_adapter.predict(bytes(1024))
+    assert not is_speech and 0.0 <= speech_prob <= 1.0
+
+
+class StrictSileroModel:
+    """Silero VAD と同じく 16kHz では 512 サンプルしか受け付けないモデル"""
+
+    def __init__(self):
+        self.calls = 0
+        self.resets = 0
+
+    def __call__(self, audio, sample_rate):
+        self.calls += 1
+        if audio.shape[-1] != 512:
+            raise ValueError(f"Provided number of samples is {audio.shape[-1]}")
+        return torch.tensor(0.1)
+
+    def reset_states(self):
+        self.resets += 1
+
+
+def test_silero_health_check_does_not_run_inference(monkeypatch):
+    model = StrictSileroModel()
+    monkeypatch.setattr(torch.hub, "load", lambda **kwargs: (model, None))
+    adapter = SileroVADAdapter()
+
+    assert not asyncio.run(adapter.health_check())
+    asyncio.run(adapter.warm_up(frames=4))
+    assert (model.calls, model.resets) == (4, 1)
+
+    assert asyncio.run(adapter.health_check())
+    assert model.calls == 4
+
+
+def test_ready_with_silero_adapter(monkeypatch, silero_adapter):
+    monkeypatch.setattr(handlers, "manager", None)
+    monkeypatch.setattr(main, "get_vad_adapter", lambda: silero_adapter)
+
+    with TestClient(app) as client:
+        response = wait_ready(client, timeout=30)
+        report = response.json()
+        assert response.status_code == 200, report
+        assert report["backends"]["vad"]["healthy"]
+        assert handlers.manager.vad_adapter is silero_adapter
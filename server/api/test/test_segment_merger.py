@@ -0,0 +1,163 @@
+import asyncio
+
+from app.services.merge_policy import AdaptiveMergePolicy
+from app.services.segment_merger import SegmentMerger
+from app.services.timer_scheduler import TimerScheduler
+from app.services.virtual_time import VirtualTimerScheduler
+
+SHORT_AUDIO = b"\x00\x00" * 1600  # 0.1秒
+LONG_AUDIO = b"\x00\x00" * 16000  # 1.0秒
+
+
+def test_timer_scheduler_cancel_and_pending_count(clock):
+    async def scenario():
+        scheduler = TimerScheduler(clock=clock)
+        fired = []
+        first = scheduler.call_later(1.0, fired.append, "first")
+        scheduler.call_later(2.0, fired.append, "second")
+        assert scheduler.pending_count == 2
+
+        first.cancel()
+        assert scheduler.pending_count == 1
+
+        clock.now = 2.5
+        assert await scheduler.run_due() == 1
+        assert fired == ["second"]
+        assert scheduler.pending_count == 0
+        await scheduler.close()
+
+    asyncio.run(scenario())
+
+
+def test_timer_scheduler_runs_coroutine_callbacks_as_tasks(caplog, clock):
+    async def scenario():
+        scheduler = TimerScheduler(clock=clock)
+        release = asyncio.Event()
+        fired = []
+
+        async def slow():
+            await release.wait()
+            fired.append("slow")
+
+        async def failing():
+            raise RuntimeError("boom")
+
+        scheduler.call_later(1.0, slow)
+        scheduler.call_later(1.0, failing)
+        scheduler.call_later(1.0, fired.append, "sync")
+
+        # 遅いコールバックを待たずに、同じ期限の後続タイマーも発火する
+        clock.now = 1.0
+        assert await scheduler.run_due() == 3
+        assert fired == ["sync"]
+
+        release.set()
+        await scheduler.wait_callbacks()
+        assert fired == ["sync", "slow"]
+        await scheduler.close()
+
+    asyncio.run(scenario())
+    assert "boom" in caplog.text
+
+
+def test_segment_merger_merges_short_segments_and_times_out(clock):
+    async def scenario():
+        scheduler = TimerScheduler(clock=clock)
+        # 共有の scheduler にある他のタイマー（死活監視など）は数えない
+        scheduler.call_later(60.0, lambda: None)
+        merger = SegmentMerger(
+            merge_timeout=2.0,
+            min_merge_duration=0.8,
+            scheduler=scheduler,
+        )
+        processed = []
+
+        async def on_transcribe(audio_data: bytes, segment_id: int):
+            processed.append((segment_id, len(audio_data)))
+
+        async def on_error(error: Exception):
+            raise error
+
+        # 短いセグメントは保留され、次のセグメントと結合される
+        assert not await merger.process_segment(
+            1, SHORT_AUDIO, "c1", on_transcribe, on_error
+        )
+        assert merger.pending_timer_count == 1
+        clock.now = 1.0
+        assert await merger.process_segment(
+            2, LONG_AUDIO, "c1", on_transcribe, on_error
+        )
+        assert processed == [(1, len(SHORT_AUDIO) + len(LONG_AUDIO))]
+        assert merger.pending_timer_count == 0
+
+        # 次のセグメントが来なければタイムアウトで処理される
+        await merger.process_segment(3, SHORT_AUDIO, "c1", on_transcribe, on_error)
+        clock.now = 3.5
+        await merger.scheduler.run_due()
+        await merger.scheduler.wait_callbacks()
+        assert processed[-1] == (3, len(SHORT_AUDIO))
+        assert merger.pending_segments == {}
+        await merger.scheduler.close()
+
+    asyncio.run(scenario())
+
+
+def test_segment_merger_exports_decisions_and_outcomes(clock):
+    async def scenario():
+        merger = SegmentMerger(
+            merge_timeout=2.0,
+            min_merge_duration=0.8,
+            scheduler=TimerScheduler(clock=clock),
+            policy=AdaptiveMergePolicy(min_timeout=0.3, min_samples=2),
+        )
+
+        async def on_transcribe(audio_data: bytes, segment_id: int):
+            pass
+
+        async def on_error(error: Exception):
+            raise error
+
+        # 次の発話がいつも遅いクライアントは待機時間が短くなる
+        for segment_id in range(1, 4):
+            clock.now += 10.0
+            await merger.scheduler.run_due()
+            await merger.scheduler.wait_callbacks()
+            await merger.process_segment(
+                segment_id, SHORT_AUDIO, "c1", on_transcribe, on_error
+            )
+
+        assert merger.pending_segments["c1"].timeout == 0.3
+        stats = merger.get_stats()
+        assert stats["holds"] == 3
+        assert stats["timed_out"] == 2
+        assert stats["pending_timers"] == 1
+        await merger.scheduler.close()
+
+    asyncio.run(scenario())
+
+
+def test_virtual_scheduler_fires_merge_timeouts_at_their_deadlines():
+    async def scenario():
+        scheduler = VirtualTimerScheduler()
+        merger = SegmentMerger(
+            merge_timeout=2.0, min_merge_duration=0.8, scheduler=scheduler
+        )
+        processed = []
+
+        async def on_transcribe(audio_data: bytes, segment_id: int):
+            processed.append((segment_id, scheduler.clock()))
+
+        async def on_error(error: Exception):
+            raise error
+
+        await merger.process_segment(1, SHORT_AUDIO, "c1", on_transcribe, on_error)
+        await scheduler.advance(0.5)
+        await merger.process_segment(2, SHORT_AUDIO, "c2", on_transcribe, on_error)
+
+        # 実際には待たずに、各タイムアウトの期限の時刻で処理される
+        assert await scheduler.advance(10.0) == 2
+        assert processed == [(1, 2.0), (2, 2.5)]
+        assert scheduler.clock() == 10.5
+        assert scheduler.pending_count == 0
+
+    asyncio.run(scenario())
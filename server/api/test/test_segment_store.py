@@ -0,0 +1,57 @@
+import wave
+
+from app.services.segment_store import (
+    INDEX_RECORD,
+    SessionAudioReader,
+    SessionAudioWriter,
+    export_session,
+    index_path,
+    list_sessions,
+)
+
+
+def test_segment_store_round_trip_and_reopen(tmp_path):
+    session = str(tmp_path / "20250101_000000_client")
+    writer = SessionAudioWriter(session)
+    writer.append(1, b"\x01\x00" * 100)
+    writer.append(2, b"\x02\x00" * 50)
+    writer.sync()
+    writer.close()
+
+    # 再度開いた場合は末尾に追記される
+    writer = SessionAudioWriter(session)
+    writer.append(3, b"\x03\x00" * 10)
+    writer.close()
+
+    assert list_sessions(str(tmp_path)) == [session]
+    with SessionAudioReader(session) as reader:
+        assert reader.segment_ids() == [1, 2, 3]
+        assert bytes(reader.read(2)) == b"\x02\x00" * 50
+        assert bytes(reader.read(3)) == b"\x03\x00" * 10
+
+
+def test_segment_store_ignores_torn_index_record(tmp_path):
+    session = str(tmp_path / "session")
+    writer = SessionAudioWriter(session)
+    writer.append(1, b"\x01\x00" * 100)
+    writer.close()
+
+    # インデックス書き込み途中でクラッシュした状態
+    with open(index_path(session), "ab") as f:
+        f.write(b"\x00" * (INDEX_RECORD.size // 2))
+
+    with SessionAudioReader(session) as reader:
+        assert reader.segment_ids() == [1]
+
+
+def test_segment_store_exports_wav(tmp_path):
+    session = str(tmp_path / "session")
+    writer = SessionAudioWriter(session)
+    writer.append(7, b"\x05\x00" * 160)
+    writer.close()
+
+    [filepath] = export_session(session, str(tmp_path / "out"))
+    assert filepath.endswith("segment_0007.wav")
+    with wave.open(filepath, "rb") as wf:
+        assert wf.getframerate() == 16000
+        assert wf.readframes(wf.getnframes()) == b"\x05\x00" * 160
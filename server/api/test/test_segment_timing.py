@@ -0,0 +1,59 @@
+from fastapi.testclient import TestClient
+
+from app.services.segment_timing import SegmentTimingTracker, SegmentTrace
+from app.websocket import handlers
+from main import app
+
+
+def make_trace(segment_id, audio_bytes, speech_start, closed_at):
+    return SegmentTrace(
+        segment_id=segment_id,
+        audio_bytes=audio_bytes,
+        speech_start=speech_start,
+        speech_end=speech_start + 0.5,
+        speech_end_at=closed_at - 0.1,
+        closed_at=closed_at,
+    )
+
+
+def test_take_combines_segments_merged_by_segment_merger():
+    tracker = SegmentTimingTracker()
+    tracker.record("c", make_trace(1, 100, 0.0, 1.0))  # 無効なセッションは記録しない
+    tracker.enable("c")
+    tracker.record("c", make_trace(1, 100, 0.0, 1.0))
+    tracker.record("c", make_trace(2, 200, 1.0, 2.0))
+    tracker.record("c", make_trace(3, 400, 3.0, 4.0))
+
+    # 1 と 2 が結合されて ID 1 で文字起こしに回る
+    timing = tracker.take("c", 1, 300)
+    assert timing.speech_start == 0.0
+    assert timing.speech_end == 1.5
+    assert timing.closed_at == 2.0
+    assert set(tracker.traces["c"]) == {3}
+
+    timing = tracker.take("c", 3, 400)
+    assert (timing.speech_start, timing.speech_end) == (3.0, 3.5)
+    assert tracker.take("c", 3, 400) is None
+
+
+def test_transcription_result_carries_timings_when_requested(monkeypatch):
+    monkeypatch.setattr(handlers, "manager", None)
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws?timings=1") as ws:
+            assert ws.receive_json()["type"] == "connection_established"
+            for _ in range(4):
+                ws.send_bytes(b"\x01\x00" * 4096)
+                ws.receive_json()
+
+            client.portal.call(handlers.drain_connections, 5.0)
+            assert ws.receive_json()["type"] == "server_draining"
+            result = ws.receive_json()
+
+    assert result["type"] == "transcription_result"
+    timings = result["timings"]
+    assert timings["speech_start"] == 0.0
+    assert timings["speech_end"] == 1.024  # 4パケット x 8フレーム x 32ms
+    for key in ("segment_close_ms", "merge_hold_ms", "queue_ms", "api_ms"):
+        assert timings[key] >= 0.0
+    assert timings["server_ms"] >= timings["segment_close_ms"]
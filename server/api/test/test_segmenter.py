@@ -0,0 +1,127 @@
+import numpy as np
+
+from app.adapters.vad import MockVADAdapter
+from app.services.segmenter import Segmenter, find_split_frame
+from app.services.vad_chunk import VADProcessor
+
+
+def test_find_split_frame_picks_lowest_probability_in_lookback():
+    probs = [0.9, 0.1, 0.9, 0.8, 0.4, 0.7, 0.9]
+    # 末尾4フレーム（0.8, 0.4, 0.7, 0.9）の中で最小の 0.4 の直後で区切る
+    assert find_split_frame(probs, 4) == 5
+
+
+def test_find_split_frame_lookback_longer_than_buffer():
+    assert find_split_frame([0.5, 0.2, 0.6], 10) == 2
+    assert find_split_frame([], 10) == 0
+
+
+def test_find_split_frame_prefers_later_frame_on_tie():
+    assert find_split_frame([0.8] * 10, 4) == 10
+
+
+FRAME_SIZE = 4
+
+
+def _frames(values):
+    """各フレームをサンプル値 value で埋めた音声と音声確率を返す"""
+    audio = np.repeat(np.arange(len(values), dtype=np.int16), FRAME_SIZE)
+    return audio, np.asarray(values, dtype=np.float32)
+
+
+def _segmenter(**kwargs) -> Segmenter:
+    params = dict(
+        frame_size=FRAME_SIZE,
+        onset_threshold=0.5,
+        offset_threshold=0.3,
+        min_speech_frames=1,
+        min_silence_frames=2,
+        pre_roll_frames=1,
+        max_segment_frames=100,
+        split_lookback_frames=4,
+    )
+    params.update(kwargs)
+    return Segmenter(**params)
+
+
+def test_segmenter_hysteresis_and_pre_roll():
+    # 0.4 は開始閾値未満だが終了閾値以上なので発話継続扱い
+    audio, probs = _frames([0.0, 0.1, 0.9, 0.4, 0.4, 0.1, 0.1, 0.0])
+    segments = _segmenter().process_array(audio, probs)
+
+    assert len(segments) == 1
+    segment = segments[0]
+    # プリロール1フレーム（フレーム1）から無音2フレーム目（フレーム6）まで
+    assert (segment.start_frame, segment.end_frame) == (1, 7)
+    samples = np.frombuffer(segment.audio, dtype=np.int16)
+    assert samples[0] == 1 and samples[-1] == 6
+    assert segment.speech_frames == 3
+
+
+def test_segmenter_drops_short_speech():
+    audio, probs = _frames([0.9, 0.1, 0.1, 0.0])
+    segmenter = _segmenter(min_speech_frames=2)
+
+    assert segmenter.process_array(audio, probs) == []
+    assert segmenter.dropped_segments == 1
+
+
+def test_segmenter_splits_at_max_duration_and_carries_over():
+    audio, probs = _frames([0.9, 0.9, 0.9, 0.6, 0.9, 0.9, 0.9, 0.9])
+    segmenter = _segmenter(pre_roll_frames=0, max_segment_frames=6)
+
+    segments = segmenter.process_array(audio, probs)
+
+    assert [s.forced for s in segments] == [True, False]
+    # 末尾4フレームで最も確率の低いフレーム3の直後で区切る
+    assert (segments[0].start_frame, segments[0].end_frame) == (0, 4)
+    assert (segments[1].start_frame, segments[1].end_frame) == (4, 8)
+    assert len(segments[1].audio) == 4 * FRAME_SIZE * 2
+
+
+def test_segmenter_grows_buffer_on_demand_and_releases_it():
+    segmenter = Segmenter(
+        frame_size=512, pre_roll_frames=4, max_segment_frames=937, min_silence_frames=1
+    )
+    silence = np.zeros(512, dtype=np.int16)
+    for _ in range(10):
+        segmenter.push_frame(silence, 0.0)
+    idle_bytes = segmenter.nbytes
+    assert idle_bytes == 4 * 512 * 2  # プリロールのみ
+
+    for _ in range(100):
+        segmenter.push_frame(silence, 0.9)
+    assert segmenter.buffered_bytes == 104 * 512 * 2
+    assert idle_bytes + segmenter.buffered_bytes < segmenter.nbytes
+    assert segmenter.nbytes < 937 * 512 * 2
+
+    segment = segmenter.push_frame(silence, 0.0)
+    assert len(segment.audio) == 105 * 512 * 2
+    assert segmenter.nbytes == idle_bytes
+
+
+class RecordingVADAdapter(MockVADAdapter):
+    def __init__(self, probabilities):
+        super().__init__()
+        self.probabilities = list(probabilities)
+        self.frame_lengths = []
+
+    def predict(self, audio_bytes, sample_rate=16000, threshold=0.5):
+        self.frame_lengths.append(len(audio_bytes))
+        prob = self.probabilities.pop(0)
+        return prob > threshold, prob
+
+
+def test_vad_processor_feeds_512_sample_frames():
+    # 発話 10 フレーム → 無音 4 フレーム（100ms = 3 フレームで終了）
+    adapter = RecordingVADAdapter([0.9] * 10 + [0.0] * 4)
+    processor = VADProcessor(adapter, pre_buffer_duration=0.0)
+
+    # フレーム境界に揃っていない入力もフレーム単位に分割する
+    audio = bytes(14 * 1024)
+    assert processor.process_audio_chunk(audio[:1500]) is None
+    speech = processor.process_audio_chunk(audio[1500:])
+
+    assert adapter.frame_lengths == [1024] * 14
+    assert speech is not None and len(speech) % 1024 == 0
+    assert not processor.is_speaking
@@ -0,0 +1,74 @@
+import asyncio
+
+from app.services.session_directory import (
+    InMemorySessionDirectory,
+    RespConnection,
+    SessionInfo,
+    new_session_id,
+)
+
+
+def test_in_memory_directory_register_expire_and_refresh(clock):
+    async def run():
+        directory = InMemorySessionDirectory(clock=clock)
+        info = SessionInfo(new_session_id(), "worker-0", "ws://w0/ws")
+
+        assert await directory.register(info, ttl=10)
+        assert not await directory.register(SessionInfo(info.session_id, "w1"), 10)
+        assert (await directory.lookup(info.session_id)).worker_id == "worker-0"
+
+        clock.now = 8
+        await directory.refresh([info.session_id], ttl=10)
+        clock.now = 15
+        assert await directory.lookup(info.session_id) is not None
+
+        clock.now = 30
+        assert await directory.lookup(info.session_id) is None
+        assert await directory.register(info, ttl=10)
+
+    asyncio.run(run())
+
+
+def test_session_ids_are_unique():
+    assert len({new_session_id() for _ in range(10000)}) == 10000
+
+
+def test_resp_encode_and_parse_replies():
+    assert RespConnection.encode("GET", "k") == b"*2\r\n$3\r\nGET\r\n$1\r\nk\r\n"
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"+OK\r\n$-1\r\n$5\r\nhello\r\n:3\r\n*2\r\n:1\r\n$1\r\nx\r\n")
+        replies = [await RespConnection.read_reply(reader) for _ in range(5)]
+        assert replies == ["OK", None, "hello", 3, [1, "x"]]
+
+    asyncio.run(run())
+
+
+def test_resp_connection_times_out_and_reconnects():
+    async def run():
+        connections = []
+
+        async def handle(reader, writer):
+            # 1本目の接続は応答せず、2本目からは応答する
+            connections.append(writer)
+            while await reader.readline():
+                if len(connections) > 1:
+                    await reader.readline()
+                    await reader.readline()
+                    writer.write(b"+PONG\r\n")
+                    await writer.drain()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        connection = RespConnection("127.0.0.1", port, timeout=0.2)
+        try:
+            assert await connection.execute("PING") == "PONG"
+            assert len(connections) == 2
+        finally:
+            await connection.close()
+            for writer in connections:
+                writer.close()
+            server.close()
+
+    asyncio.run(run())
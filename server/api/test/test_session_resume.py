@@ -0,0 +1,67 @@
+import asyncio
+
+from app.services.session_resume import SessionResumeRegistry
+from app.services.timer_scheduler import TimerScheduler
+
+
+def test_session_resume_replays_results_after_last_seq(clock):
+    async def scenario():
+        scheduler = TimerScheduler(clock=clock)
+        registry = SessionResumeRegistry(scheduler, grace_seconds=30, replay_size=2)
+        token = registry.create("s1")
+
+        sent = [
+            registry.stamp("s1", {"type": "audio_received"}),
+            registry.stamp("s1", {"type": "transcription_result", "text": "a"}),
+            registry.stamp("s1", {"type": "transcription_result", "text": "b"}),
+            registry.stamp("s1", {"type": "transcription_error", "error": "c"}),
+        ]
+        assert [m["seq"] for m in sent] == [1, 2, 3, 4]
+
+        assert registry.detach("s1", on_expire=lambda _: None)
+        assert registry.is_detached("s1")
+        assert registry.reattach("s1", "wrong-token", 0) is None
+
+        # 受信確認は再送せず、保持数を超えた古い結果も再送しない
+        replay = registry.reattach("s1", token, last_seq=2)
+        assert [m["seq"] for m in replay] == [3, 4]
+        assert not registry.is_detached("s1")
+        assert scheduler.pending_count == 0
+        await scheduler.close()
+
+    asyncio.run(scenario())
+
+
+def test_session_resume_expires_after_grace_period(clock):
+    async def scenario():
+        scheduler = TimerScheduler(clock=clock)
+        registry = SessionResumeRegistry(scheduler, grace_seconds=30)
+        token = registry.create("s1")
+        expired = []
+
+        async def on_expire(session_id):
+            expired.append(session_id)
+            registry.remove(session_id)
+
+        registry.detach("s1", on_expire)
+        clock.now = 29.0
+        assert await scheduler.run_due() == 0
+
+        clock.now = 30.0
+        assert await scheduler.run_due() == 1
+        await scheduler.wait_callbacks()
+        assert expired == ["s1"]
+        assert registry.reattach("s1", token) is None
+        await scheduler.close()
+
+    asyncio.run(scenario())
+
+
+def test_session_resume_disabled_without_grace_period(clock):
+    async def scenario():
+        registry = SessionResumeRegistry(TimerScheduler(clock=clock), grace_seconds=0)
+        registry.create("s1")
+        assert not registry.detach("s1", on_expire=lambda _: None)
+        assert not registry.is_detached("s1")
+
+    asyncio.run(scenario())
@@ -0,0 +1,27 @@
+import asyncio
+
+from simulate import build_parser, simulate
+
+
+def run(*argv):
+    args = build_parser().parse_args(list(argv))
+    return asyncio.run(simulate(args, log=lambda line: None))
+
+
+def test_simulation_accounts_for_every_segment_without_leftover_state():
+    summary = run("--sessions", "50", "--duration", "20", "--ramp", "2")
+    assert summary["problems"] == []
+    assert summary["virtual_seconds"] > 20
+    assert sum(summary["segments"].values()) > 50
+    assert summary["transcribed"] > 0
+    # 発話の終わりから確定までは無音の長さ（仮想時刻なので揺らがない）
+    close = summary["timings_ms"]["segment_close_ms"]
+    assert close["p50"] == close["max"]
+    assert summary["peak"]["session_bytes"] > 0
+
+
+def test_simulation_is_deterministic_for_a_seed():
+    first = run("--sessions", "20", "--duration", "10", "--seed", "3")
+    second = run("--sessions", "20", "--duration", "10", "--seed", "3")
+    assert first["segments"] == second["segments"]
+    assert first["merge"] == second["merge"]
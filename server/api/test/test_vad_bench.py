@@ -0,0 +1,34 @@
+import asyncio
+
+from app.adapters.vad import MockVADAdapter
+from vad_bench import find_regressions, run_case
+
+
+def test_cases_cover_every_frame_and_report_latency():
+    adapter = MockVADAdapter()
+    frames = [bytes(1024)] * 40
+    for case, calls in (("single", 40), ("batch-8", 5), ("streams-4", 40)):
+        measured = asyncio.run(run_case(adapter, case, frames, min_seconds=0))
+        assert measured["frames"] == 40
+        assert measured["latency_us"]["count"] == calls
+        assert measured["frames_per_second"] > 0
+
+
+def test_regression_is_reported_only_beyond_tolerance():
+    def result(case, fps):
+        return {
+            "backend": "silero",
+            "case": case,
+            "threads": 2,
+            "frames_per_second": fps,
+        }
+
+    baseline = {"results": [result("single", 1000.0), result("batch-8", 4000.0)]}
+    current = [
+        result("single", 900.0),  # -10%
+        result("batch-8", 3000.0),  # -25%
+        result("batch-32", 10.0),  # 基準値なし
+    ]
+    regressions = find_regressions(current, baseline, tolerance=0.15)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("silero/batch-8/threads=2")
@@ -0,0 +1,77 @@
+import asyncio
+import zlib
+
+import pytest
+
+from app.adapters.vad_pool import ProcessPoolVADAdapter
+
+FRAME = b"\x01\x00" * 512
+
+
+@pytest.fixture(scope="module")
+def pool():
+    adapter = ProcessPoolVADAdapter(
+        num_workers=2, ring_frames=16, model_kind="mock", fixed_probability=0.7
+    )
+    yield adapter
+    adapter.close()
+
+
+def test_vad_pool_predicts_through_shared_memory(pool):
+    async def run():
+        return await asyncio.gather(
+            *[pool.predict_frames([FRAME] * 3, key=f"client-{i}") for i in range(20)]
+        )
+
+    results = asyncio.run(run())
+    assert all(probs == pytest.approx([0.7] * 3) for probs in results)
+    assert pool.queue_depth == 0
+
+    is_speech, prob = pool.predict(FRAME)
+    assert is_speech and prob == pytest.approx(0.7)
+
+
+def test_vad_pool_splits_large_requests_and_validates_frames(pool):
+    probs = asyncio.run(pool.predict_frames([FRAME] * 10, key="long"))
+    assert len(probs) == 10
+    with pytest.raises(ValueError):
+        pool.submit([b"\x00" * 100])
+
+
+def test_ring_allocation_never_overlaps_in_flight_frames(pool):
+    worker = pool.workers[0]
+    assert worker.allocate(4) is not None
+    worker.in_flight.append((0, 2, 10, None))  # [2, 12) 処理中
+    worker.head = 12
+    assert worker.allocate(4) == 12
+    assert worker.allocate(5) is None  # 末尾に入らず、先頭 [0, 5) は処理中と重なる
+    worker.head = 16
+    assert worker.allocate(1) == 0  # 先頭に折り返す
+    assert worker.allocate(2) is None
+    worker.in_flight.clear()
+    worker.head = 0
+
+
+def test_full_ring_waits_without_blocking_the_event_loop(pool):
+    key = "same"
+    worker = pool.workers[zlib.crc32(key.encode()) % len(pool.workers)]
+    waits = pool.ring_full_waits
+
+    async def run():
+        with pool._lock:
+            worker.in_flight.append((0, 0, 16, None))  # リング全体が処理中
+            worker.head = 16
+        task = asyncio.create_task(pool.predict_frames([FRAME] * 4, key=key))
+        # 空きを待つ間もイベントループは動き続ける
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        assert pool.get_stats()["ring_full_waits"] == waits + 1
+
+        with pool._lock:
+            worker.in_flight.clear()
+            worker.head = 0
+            pool._wake_space_waiters()
+        return await task
+
+    assert asyncio.run(run()) == pytest.approx([0.7] * 4)
+    assert pool.queue_depth == 0